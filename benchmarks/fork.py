@@ -0,0 +1,49 @@
+"""Forks per second for GameState.fork against copy.deepcopy.
+
+Run from the repository root:
+
+    python -m benchmarks.fork [n_forks]
+"""
+
+import copy
+import random
+import sys
+import timeit
+
+from lib.game_sets.countries import COUNTRY_NAMES, InfluenceChange
+from lib.state_managers.deck import Deck
+from lib.state_managers.game_state import GameState
+
+
+def make_state(seed:int = 0) -> GameState:
+    rng = random.Random(seed)
+    gamestate = GameState(rng=rng, deck=Deck(rng))
+    gamestate._fill_hands()
+    gamestate._apply_influence_changes([
+        InfluenceChange(name, rng.randint(0, 3), rng.randint(0, 3)) for name in COUNTRY_NAMES
+    ])
+    return gamestate
+
+
+def main(n_forks:int = 20000):
+    gamestate = make_state()
+    # seeding a Mersenne Twister dominates a fork, so also time forks handed a ready rng
+    rng = random.Random(1)
+    cases = {
+        "copy.deepcopy": lambda: copy.deepcopy(gamestate),
+        "fork": lambda: gamestate.fork(),
+        "fork(exact_rng)": lambda: gamestate.fork(exact_rng=True),
+        "fork(rng)": lambda: gamestate.fork(rng=rng),
+        "fork(copy_on_write)": lambda: gamestate.fork(copy_on_write=True),
+        "fork(copy_on_write, rng)": lambda: gamestate.fork(copy_on_write=True, rng=rng),
+        # a rollout step: fork then touch the board
+        "fork(copy_on_write) + write": lambda: gamestate.fork(copy_on_write=True).board.change_influence(0, 1, 0),
+    }
+    for name, fn in cases.items():
+        n = n_forks // 20 if name == "copy.deepcopy" else n_forks
+        seconds = min(timeit.repeat(fn, number=n, repeat=3))
+        print(f"{name:<30} {n / seconds:>12,.0f} forks/sec")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,29 @@
+"""Legal-move generation throughput across early, mid and late war positions.
+
+Run from the repository root:
+
+    python -m benchmarks.move_generation [repeats]
+"""
+
+import sys
+import time
+
+from lib.actions.move_generator import MoveGenerator
+from benchmarks.positions import STAGES, make_position
+
+
+def main(repeats:int = 5):
+    generator = MoveGenerator()
+    for stage in STAGES:
+        gamestate = make_position(stage)
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            n_moves = sum(1 for _ in generator.legal_moves(gamestate))
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{stage:<6} {n_moves:>10,} moves  {n_moves / best:>14,.0f} moves/sec")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,32 @@
+"""Fixed-seed game positions shared by the benchmarks."""
+
+import random
+
+from lib.game_sets.constants import GamePhase, Superpower
+from lib.game_sets.countries import COUNTRY_NAMES, HOME_COUNTRY, InfluenceChange
+from lib.state_managers.deck import Deck
+from lib.state_managers.game_state import GameState
+
+# stage -> (eras in the deck, turn, DEFCON, max influence per side per country, fraction of countries touched)
+STAGES = {
+    "early": (("Early War",), 2, 4, 2, 0.25),
+    "mid": (("Early War", "Mid War"), 5, 3, 3, 0.5),
+    "late": (("Early War", "Mid War", "Late War"), 9, 2, 4, 0.75),
+}
+
+
+def make_position(stage:str = "early", seed:int = 0) -> GameState:
+    """Build a reproducible action-round position for a stage of the game."""
+    eras, turn, defcon, max_influence, density = STAGES[stage]
+    rng = random.Random(seed)
+    gamestate = GameState(turn=turn, phase=GamePhase.ACTION_ROUNDS, chooser=Superpower.USSR, defcon_level=defcon,
+                          rng=rng, deck=Deck(rng))
+    for era in eras[1:]:
+        gamestate.deck._add_era(era)
+    hand_size = 8 if turn <= 3 else 9
+    gamestate._fill_hands(hand_size)
+    gamestate._apply_influence_changes([
+        InfluenceChange(name, rng.randint(0, max_influence), rng.randint(0, max_influence))
+        for i, name in enumerate(COUNTRY_NAMES) if i not in HOME_COUNTRY.values() and rng.random() < density
+    ])
+    return gamestate
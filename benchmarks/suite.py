@@ -0,0 +1,227 @@
+"""Fixed-seed benchmarks of the engine's hot paths, with a regression check.
+
+Run from the repository root:
+
+    python -m benchmarks.suite                                  print results
+    python -m benchmarks.suite --save results.json              also save them
+    python -m benchmarks.suite --baseline benchmarks/baseline.json [--threshold 0.15]
+
+With --baseline every benchmark is compared against the stored rate and
+the run exits with status 1 if any is more than threshold slower. Rates
+are operations per second, the best of several timed repeats; baselines
+are only meaningful on the machine that recorded them, so refresh
+benchmarks/baseline.json with --save when the hardware changes.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+from lib.actions.actions_manager import GameAction
+from lib.bots.evaluator import evaluate
+from lib.bots.mcts import random_move
+from lib.game import apply_move, new_game
+from lib.game_sets.cards import card_array
+from lib.game_sets.constants import Superpower
+from lib.game_sets.countries import COUNTRY_NAMES, REGIONS, calculate_region_control, mask_indices
+from lib.state_managers.deck import Deck
+from lib.state_managers.game_state import GameState
+from lib.state_managers.observation import OBSERVATION_ENCODER
+from benchmarks.positions import make_position
+
+SEED = 0
+DEFAULT_THRESHOLD = 0.15
+
+# name -> (unit, setup returning the function to time and the operations per call)
+Benchmark = Callable[[], Tuple[Callable[[], object], int]]
+BENCHMARKS: Dict[str, Tuple[str, Benchmark]] = {}
+
+
+def benchmark(name:str, unit:str):
+    def register(setup:Benchmark) -> Benchmark:
+        BENCHMARKS[name] = (unit, setup)
+        return setup
+    return register
+
+
+@benchmark("gamestate_construction", "states/sec")
+def _gamestate_construction():
+    def construct():
+        rng = random.Random(SEED)
+        return GameState(rng=rng, deck=Deck(rng))
+    return construct, 1
+
+
+@benchmark("new_game", "games/sec")
+def _new_game():
+    return (lambda: new_game(SEED)), 1
+
+
+@benchmark("has_access", "checks/sec")
+def _has_access():
+    board = make_position("mid", SEED).board
+    countries = [board[name] for name in COUNTRY_NAMES]
+
+    def check():
+        for country in countries:
+            country._has_access(Superpower.USA)
+            country._has_access(Superpower.USSR)
+    return check, 2 * len(countries)
+
+
+@benchmark("influence_legality", "checks/sec")
+def _influence_legality():
+    gamestate = make_position("mid", SEED)
+    rng = random.Random(SEED)
+    action = GameAction()
+    accessible = [COUNTRY_NAMES[i] for i in mask_indices(gamestate.board.access_mask(Superpower.USSR))]
+    # a mix of legal and illegal 3-op placements
+    choices = [[rng.choice(accessible) for _ in range(rng.randint(2, 3))] for _ in range(100)]
+
+    def check():
+        for placement in choices:
+            action._influence_placements_legal(Superpower.USSR, gamestate, placement, 3)
+    return check, len(choices)
+
+
+@benchmark("region_control", "regions/sec")
+def _region_control():
+    board = make_position("mid", SEED).board
+
+    def score():
+        for region in REGIONS:
+            calculate_region_control(region, board)
+    return score, len(REGIONS)
+
+
+@benchmark("observation", "observations/sec")
+def _observation():
+    gamestate = make_position("mid", SEED)
+    out = OBSERVATION_ENCODER.new_buffer(1)
+    return (lambda: gamestate._to_obs(Superpower.USSR, out)), 1
+
+
+@benchmark("evaluate", "evaluations/sec")
+def _evaluate():
+    gamestate = make_position("mid", SEED)
+    return (lambda: evaluate(gamestate)), 1
+
+
+@benchmark("draw_card", "draws/sec")
+def _draw_card():
+    deck = Deck(random.Random(SEED))
+
+    # every drawn card is discarded, so the deck reshuffles as it runs dry
+    def draw():
+        for _ in range(100):
+            deck.discard(deck._draw_card())
+    return draw, 100
+
+
+@benchmark("fill_hand", "hands/sec")
+def _fill_hand():
+    deck = Deck(random.Random(SEED))
+    hand = card_array()
+
+    def fill():
+        deck.fill_hand(Superpower.USA, hand, 8)
+        for card in hand:
+            deck.discard(card)
+        del hand[:]
+    return fill, 1
+
+
+@benchmark("random_playout", "games/sec")
+def _random_playout():
+    # the same games on every call, so repeats time identical work
+    seeds = range(SEED, SEED + 10)
+
+    def playout():
+        for seed in seeds:
+            gamestate = new_game(seed)
+            rng = random.Random(seed)
+            while not gamestate.game_over:
+                apply_move(gamestate, random_move(gamestate, rng))
+    return playout, len(seeds)
+
+
+def measure(setup:Benchmark, repeat:int, min_time:float) -> float:
+    """Best rate over repeat runs of at least min_time seconds each."""
+    fn, ops = setup()
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    best = min([elapsed] + timer.repeat(repeat - 1, number)) if repeat > 1 else elapsed
+    return number * ops / best
+
+
+def run(names:List[str], repeat:int = 5, min_time:float = 0.2) -> Dict[str, float]:
+    results = {}
+    for name in names:
+        unit, setup = BENCHMARKS[name]
+        results[name] = rate = measure(setup, repeat, min_time)
+        print(f"{name:<24} {rate:>14,.0f} {unit}")
+    return results
+
+
+def compare(results:Dict[str, float], baseline:Dict[str, float], threshold:float) -> List[str]:
+    """Names of benchmarks more than threshold slower than the baseline."""
+    regressions = []
+    for name, rate in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        change = rate / base - 1
+        flag = "REGRESSION" if change < -threshold else ""
+        print(f"{name:<24} {base:>14,.0f} -> {rate:>14,.0f} {change:>+8.1%} {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv:List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved in this JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction of the baseline rate")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timed repeat")
+    args = parser.parse_args(argv)
+
+    names = args.names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error("unknown benchmarks: " + ", ".join(unknown))
+    results = run(names, args.repeat, args.min_time)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": results,
+            }, f, indent=2)
+            f.write("\n")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        print()
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
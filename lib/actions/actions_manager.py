@@ -3,11 +3,11 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
-from ..game_sets.countries import Country
+from ..game_sets.countries import Country, COUNTRY_INDEX
 from ..game_sets.constants import Superpower
 from ..state_managers.game_state import GameState
 from .selectors import Selectors
-from collections import Counter
+from collections import Counter, namedtuple
 class ActionType(Enum):
     INFLUENCE = "influence"
     COUP = "coup"
@@ -18,29 +18,37 @@ class ActionType(Enum):
     HEADLINE_CHOICE = "headline_choice"
 
 
+# a complete decision: card id played, how it is used and the target country indices (empty if none)
+Move = namedtuple("Move", ["action_type", "card", "targets"])
+
+
 @dataclass 
 class GameAction:
     
     # -- legality of specific actions -- 
 
     # legality of placing influence for ops. choices is list of country ids 
+    # placements are made inside a board transaction and always rolled back, so the state is left untouched
     def _influence_placements_legal(self, player:Superpower, gamestate:GameState, choices:List[str], ops_available:int):
         # track remaining ops 
         ops_remaining = ops_available
-        # get list of countries where influence can be placed 
-        
-        access_countries = {key: value for key, value in gamestate.countries.items() if value._has_access(player)}
+        board = gamestate.board
+        # countries where influence can be placed, fixed at the start of the action
+        access = board.access_mask(player)
 
-        
-
-        
-        for country_id in choices:
-            country = access_countries[country_id]
-            ops_remaining -= country.influence_cost(player)
-            if player == Superpower.USA:
-                country.us_influence += 1 
-            else:
-                country.ussr_influence += 1 
+        with board.transaction():
+            for country_id in choices:
+                index = COUNTRY_INDEX.get(country_id)
+                if index is None or not access >> index & 1:
+                    return False 
+                # cost drops to 1 as soon as opponent control is broken
+                ops_remaining -= board.country(index).influence_cost(player)
+                if ops_remaining < 0:
+                    return False 
+                if player == Superpower.USA:
+                    board.change_influence(index, 1, 0)
+                else:
+                    board.change_influence(index, 0, 1)
         return ops_remaining == 0
     
     # legality of coup. choices is list (size 1) of target ids
@@ -67,7 +75,7 @@ class GameAction:
         return gamestate.space_race.can_space(available_ops, player)
     
     # legality of headline choice
-    def _can_headline(self, player:Superpower, gamestate:GameState, headline_choice:str):
+    def _can_headline(self, player:Superpower, gamestate:GameState, headline_choice:int):
         player_hand = gamestate.usa_hand if player == Superpower.USA else gamestate.ussr_hand
         if headline_choice in player_hand:
             return True 
@@ -0,0 +1,127 @@
+"""Enumeration of legal moves for the player making the current decision."""
+
+import random
+from dataclasses import dataclass
+from itertools import batched
+from typing import Dict, Iterator, List, Tuple
+
+from ..game_sets.cards import CARD_OPS, CARD_SCORING
+from ..game_sets.constants import GamePhase, Superpower
+from ..game_sets.countries import COUNTRY_STABILITY, mask_indices
+from ..instrumentation import timed
+from ..state_managers.game_state import GameState
+from .actions_manager import ActionType, Move
+
+
+@dataclass
+class MoveGenerator:
+
+    # all legal moves for the chooser in the current phase
+    def legal_moves(self, gamestate:GameState) -> Iterator[Move]:
+        player = gamestate.chooser
+        hand = gamestate.usa_hand if player == Superpower.USA else gamestate.ussr_hand
+        if gamestate.phase == GamePhase.HEADLINE:
+            yield from self.headline_moves(gamestate, player)
+        elif gamestate.phase == GamePhase.ACTION_ROUNDS:
+            for card in hand:
+                yield from self.card_moves(gamestate, player, card)
+
+    # legal moves in chunks of batch_size, for callers that score moves in bulk
+    def legal_move_batches(self, gamestate:GameState, batch_size:int = 256) -> Iterator[Tuple[Move, ...]]:
+        return batched(self.legal_moves(gamestate), batch_size)
+
+    def headline_moves(self, gamestate:GameState, player:Superpower) -> Iterator[Move]:
+        hand = gamestate.usa_hand if player == Superpower.USA else gamestate.ussr_hand
+        for card in hand:
+            yield Move(ActionType.HEADLINE_CHOICE, card, ())
+
+    # every way of playing one card from hand during an action round
+    def card_moves(self, gamestate:GameState, player:Superpower, card:int) -> Iterator[Move]:
+        yield Move(ActionType.EVENT, card, ())
+        if CARD_SCORING[card]:
+            return
+        ops = CARD_OPS[card]
+        if gamestate.space_race.can_space(ops, player):
+            yield Move(ActionType.SPACE_RACE, card, ())
+        for index in self.coup_targets(gamestate, player):
+            yield Move(ActionType.COUP, card, (index,))
+        for index in self.coup_targets(gamestate, player):
+            yield Move(ActionType.REALIGNMENT, card, (index,))
+        for placement in self.influence_placements(gamestate, player, ops):
+            yield Move(ActionType.INFLUENCE, card, placement)
+
+    # coup and realignment share their target rules
+    @timed("movegen.coup_targets")
+    def coup_targets(self, gamestate:GameState, player:Superpower) -> List[int]:
+        return list(mask_indices(gamestate.board.coup_mask(gamestate.defcon_level, player)))
+
+    def influence_placements(self, gamestate:GameState, player:Superpower, ops:int) -> Iterator[Tuple[int, ...]]:
+        """Stream every placement that spends exactly ops, as sorted tuples of country indices.
+
+        Placements in different countries commute, so each multiset of
+        countries is emitted once, in non-decreasing index order. The cost of
+        k placements in one country is precomputed, including the drop from 2
+        to 1 once opponent control is broken.
+        """
+        board = gamestate.board
+        own = board.us_influence if player == Superpower.USA else board.ussr_influence
+        opp = board.ussr_influence if player == Superpower.USA else board.us_influence
+        countries = list(mask_indices(board.access_mask(player)))
+
+        # cumulative[k] = ops needed to place k influence in the country
+        costs = []
+        for i in countries:
+            stability, own_i, opp_i = COUNTRY_STABILITY[i], own[i], opp[i]
+            cumulative = [0]
+            total = 0
+            for k in range(ops):
+                total += 2 if opp_i - (own_i + k) >= stability else 1
+                if total > ops:
+                    break
+                cumulative.append(total)
+            costs.append(cumulative)
+
+        placement: List[int] = []
+
+        def extend(start:int, remaining:int) -> Iterator[Tuple[int, ...]]:
+            if remaining == 0:
+                yield tuple(placement)
+                return
+            for pos in range(start, len(countries)):
+                cumulative = costs[pos]
+                for k in range(1, len(cumulative)):
+                    if cumulative[k] > remaining:
+                        break
+                    placement.extend([countries[pos]] * k)
+                    yield from extend(pos + 1, remaining - cumulative[k])
+                    del placement[-k:]
+
+        if ops > 0:
+            yield from extend(0, ops)
+
+    @timed("movegen.random_placement")
+    def random_placement(self, gamestate:GameState, player:Superpower, ops:int, rng:random.Random) -> Tuple[int, ...]:
+        """One random placement of up to ops influence, as a sorted tuple of country indices.
+
+        Each op goes to a random accessible country that is still affordable;
+        placement stops early only if nothing affordable is left.
+        """
+        board = gamestate.board
+        own = board.us_influence if player == Superpower.USA else board.ussr_influence
+        opp = board.ussr_influence if player == Superpower.USA else board.us_influence
+        countries = list(mask_indices(board.access_mask(player)))
+        placed: Dict[int, int] = {}
+        targets: List[int] = []
+        while ops > 0 and countries:
+            i = rng.choice(countries)
+            k = placed.get(i, 0)
+            cost = 2 if opp[i] - (own[i] + k) >= COUNTRY_STABILITY[i] else 1
+            if cost > ops:
+                # only 1 op left and this country still costs 2
+                countries = [j for j in countries if opp[j] - (own[j] + placed.get(j, 0)) < COUNTRY_STABILITY[j]]
+                continue
+            placed[i] = k + 1
+            targets.append(i)
+            ops -= cost
+        targets.sort()
+        return tuple(targets)
@@ -0,0 +1,121 @@
+"""Best influence placements under a pluggable objective.
+
+An objective scores placing count influence in one country,
+objective(gamestate, player, index, count), and a placement scores the
+sum over its countries. Countries are independent once their costs are
+known (the cost of the k-th influence already accounts for opponent
+control breaking), so the best placements come from a dynamic program
+over (country position, ops remaining) instead of enumerating every
+placement as MoveGenerator.influence_placements does. Each subproblem
+keeps only its k best completions.
+
+Placements spend exactly ops, like influence_placements, and are sorted
+tuples of country indices.
+"""
+
+from collections import namedtuple
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Tuple
+
+from ..game_sets.constants import Superpower
+from ..game_sets.countries import COUNTRY_BATTLEGROUND, COUNTRY_REGION, COUNTRY_STABILITY, REGIONS, Region, mask_indices
+from ..state_managers.game_state import GameState
+
+# objective(gamestate, player, index, count) -> value of placing count influence in country index
+Objective = Callable[[GameState, Superpower, int, int], float]
+
+Placement = namedtuple("Placement", ["value", "targets"])
+
+
+def control_delta(gamestate:GameState, player:Superpower, index:int, count:int) -> float:
+    """+1 for taking control of the country, +1 for breaking the opponent's control."""
+    board = gamestate.board
+    own = board.us_influence[index] if player == Superpower.USA else board.ussr_influence[index]
+    opp = board.ussr_influence[index] if player == Superpower.USA else board.us_influence[index]
+    stability = COUNTRY_STABILITY[index]
+    value = 0.0
+    if own + count - opp >= stability > own - opp:
+        value += 1.0
+    if opp - own >= stability > opp - own - count:
+        value += 1.0
+    return value
+
+
+def battleground_delta(gamestate:GameState, player:Superpower, index:int, count:int) -> float:
+    """control_delta, counted in battleground countries only."""
+    return control_delta(gamestate, player, index, count) if COUNTRY_BATTLEGROUND[index] else 0.0
+
+
+@dataclass(frozen=True)
+class WeightedControl:
+    """control_delta scaled by a weight per region (indexed like REGIONS), with battlegrounds worth battleground_weight more.
+
+    A module-level class rather than a closure so objectives can be pickled
+    and sent to search worker processes.
+    """
+
+    weights: Tuple[float, ...]
+    battleground_weight: float = 1.0
+
+    def __call__(self, gamestate:GameState, player:Superpower, index:int, count:int) -> float:
+        weight = self.weights[COUNTRY_REGION[index]] + (self.battleground_weight if COUNTRY_BATTLEGROUND[index] else 0.0)
+        return weight * control_delta(gamestate, player, index, count) if weight else 0.0
+
+
+def weighted_control(region_weights:Mapping[Region, float], battleground_weight:float = 1.0) -> WeightedControl:
+    """A WeightedControl objective from a weight per region; missing regions weigh 0."""
+    return WeightedControl(tuple(region_weights.get(region, 0.0) for region in REGIONS), battleground_weight)
+
+
+def best_placements(gamestate:GameState, player:Superpower, ops:int, objective:Objective = control_delta,
+                    k:int = 1) -> List[Placement]:
+    """The k highest scoring placements of exactly ops ops, best first (ties in country order)."""
+    if ops <= 0 or k <= 0:
+        return []
+    board = gamestate.board
+    own = board.us_influence if player == Superpower.USA else board.ussr_influence
+    opp = board.ussr_influence if player == Superpower.USA else board.us_influence
+    countries = list(mask_indices(board.access_mask(player)))
+    n = len(countries)
+
+    # options[pos] = (ops spent, value, count) for each affordable count in countries[pos]
+    options: List[List[Tuple[int, float, int]]] = []
+    for index in countries:
+        stability, own_i, opp_i = COUNTRY_STABILITY[index], own[index], opp[index]
+        choices = []
+        total = 0
+        for count in range(1, ops + 1):
+            total += 2 if opp_i - (own_i + count - 1) >= stability else 1
+            if total > ops:
+                break
+            choices.append((total, objective(gamestate, player, index, count), count))
+        options.append(choices)
+
+    memo: Dict[Tuple[int, int], List[Placement]] = {}
+    complete = [Placement(0.0, ())]
+
+    def solve(pos:int, remaining:int) -> List[Placement]:
+        # the k best ways to spend exactly remaining ops on countries[pos:]
+        if remaining == 0:
+            return complete
+        if pos == n:
+            return []
+        key = (pos, remaining)
+        best = memo.get(key)
+        if best is not None:
+            return best
+        index = countries[pos]
+        candidates: List[Placement] = []
+        for spent, value, count in options[pos]:
+            if spent > remaining:
+                break
+            head = (index,) * count
+            for rest in solve(pos + 1, remaining - spent):
+                candidates.append(Placement(value + rest.value, head + rest.targets))
+        candidates += solve(pos + 1, remaining)
+        # stable sort: equal values keep lower country indices first
+        candidates.sort(key=lambda placement: -placement.value)
+        best = memo[key] = candidates[:k]
+        return best
+
+    return list(solve(0, ops))
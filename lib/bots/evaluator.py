@@ -0,0 +1,311 @@
+"""Heuristic position evaluation with an LRU cache and a shared disk tier.
+
+evaluate(gamestate) scores a position for the USA in [-1, 1], the same
+scale as mcts.rollout, from a weighted sum of:
+
+    vp          the vp track
+    regions     region control (calculate_region_control): countries and
+                battlegrounds held, weighted by the region's scoring values
+    defcon      vps each side would concede for missing military ops at
+                the current DEFCON, and the chooser's exposure at DEFCON 2
+    space       who is ahead in the space race (SpaceRace.player_ahead)
+    hand        ops in hand, with scoring cards counting for nothing
+
+CachedEvaluator puts an LRU cache in front of an evaluation function,
+keyed on GameState.zobrist_hash. With a path it also keeps a DiskCache,
+a fixed-size hash table in a memory-mapped file that any number of
+processes can open at once, so positions evaluated by one search worker
+are free for the others and for later runs. The file header carries a
+fingerprint of the evaluation function and RULES_VERSION, and a file
+written under a different one is refused instead of serving stale values.
+"""
+
+import functools
+import hashlib
+import math
+import mmap
+import struct
+from collections import OrderedDict
+from dataclasses import dataclass, field, is_dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+
+from ..game import REGION_SCORING, RULES_VERSION, VP_TO_WIN
+from ..game_sets.cards import CARD_OPS, CARD_SCORING
+from ..game_sets.constants import Superpower
+from ..game_sets.countries import calculate_region_control
+from ..state_managers.game_state import GameState
+
+# evaluator(gamestate) -> value for the USA in [-1, 1]
+Evaluator = Callable[[GameState], float]
+
+
+@dataclass
+class EvalWeights:
+    vp: float = 1.0
+    regions: float = 0.5
+    defcon: float = 0.5
+    space: float = 0.1
+    hand: float = 0.2
+    # evaluate returns tanh(scale * weighted sum)
+    scale: float = 1.0
+
+
+DEFAULT_WEIGHTS = EvalWeights()
+# the largest hand ops total, for normalizing
+_MAX_HAND_OPS = 9 * max(CARD_OPS)
+
+
+def evaluate(gamestate:GameState, weights:EvalWeights = DEFAULT_WEIGHTS) -> float:
+    """Heuristic value of the position for the USA, in [-1, 1]."""
+    if gamestate.game_over:
+        if gamestate.winner is None:
+            return 0.0
+        return 1.0 if gamestate.winner == Superpower.USA else -1.0
+    score = weights.vp * gamestate.vp_track / VP_TO_WIN
+    if weights.regions:
+        score += weights.regions * region_term(gamestate)
+    if weights.defcon:
+        score += weights.defcon * defcon_term(gamestate)
+    if weights.space:
+        score += weights.space * space_term(gamestate)
+    if weights.hand:
+        score += weights.hand * hand_term(gamestate)
+    return math.tanh(weights.scale * score)
+
+
+def region_term(gamestate:GameState) -> float:
+    """Region control for the USA, in vps at each region's domination value, over VP_TO_WIN."""
+    total = 0.0
+    board = gamestate.board
+    for region, (_, domination, _) in REGION_SCORING.items():
+        control = calculate_region_control(region, board)
+        countries = control["total_countries"] or 1
+        battlegrounds = control["total_battlegrounds"] or 1
+        share = ((control["us_countries"] - control["ussr_countries"]) / countries
+                 + (control["us_battlegrounds"] - control["ussr_battlegrounds"]) / battlegrounds) / 2
+        total += share * domination
+    return total / VP_TO_WIN
+
+
+def defcon_term(gamestate:GameState) -> float:
+    """Military ops shortfall at the current DEFCON, and the chooser's risk at DEFCON 2, for the USA."""
+    defcon = gamestate.defcon_level
+    usa_shortfall = max(0, defcon - gamestate.usa_milops)
+    ussr_shortfall = max(0, defcon - gamestate.ussr_milops)
+    term = (ussr_shortfall - usa_shortfall) / VP_TO_WIN
+    if defcon <= 2:
+        # one battleground coup from nuclear war
+        term += -0.5 if gamestate.chooser == Superpower.USA else 0.5
+    return term
+
+
+def space_term(gamestate:GameState) -> float:
+    space_race = gamestate.space_race
+    if space_race.player_ahead(Superpower.USA):
+        return 1.0
+    if space_race.player_ahead(Superpower.USSR):
+        return -1.0
+    return 0.0
+
+
+def hand_term(gamestate:GameState) -> float:
+    """Ops in the USA hand minus the USSR hand, over the largest possible hand."""
+    usa_ops = sum(0 if CARD_SCORING[card] else CARD_OPS[card] for card in gamestate.usa_hand)
+    ussr_ops = sum(0 if CARD_SCORING[card] else CARD_OPS[card] for card in gamestate.ussr_hand)
+    return (usa_ops - ussr_ops) / _MAX_HAND_OPS
+
+
+# -- caching --
+
+DISK_MAGIC = b"TSEV"
+DISK_VERSION = 2
+# magic, version, slots, evaluator fingerprint
+DISK_HEADER = struct.Struct("<4sHQQ")
+# key, value, check: the record is valid only if check == key ^ the value's bits
+DISK_SLOT = struct.Struct("<QdQ")
+# slots tried from a key's home slot before giving up
+DISK_PROBES = 8
+_DOUBLE = struct.Struct("<d")
+_KEY_MASK = (1 << 64) - 1
+
+
+def _check(key:int, value:float) -> int:
+    return key ^ int.from_bytes(_DOUBLE.pack(value), "little")
+
+
+def _describe(evaluator) -> str:
+    if isinstance(evaluator, functools.partial):
+        return "%s%r%r" % (_describe(evaluator.func), evaluator.args, sorted(evaluator.keywords.items()))
+    if is_dataclass(evaluator) and not isinstance(evaluator, type):
+        return "%s.%s%r" % (type(evaluator).__module__, type(evaluator).__qualname__, evaluator)
+    qualname = getattr(evaluator, "__qualname__", None)
+    if qualname is None or "<lambda>" in qualname or "<locals>" in qualname:
+        raise ValueError("Cannot fingerprint %r; pass an explicit fingerprint" % (evaluator,))
+    # default arguments (e.g. evaluate's weights) change the values too
+    return "%s.%s%r%r" % (evaluator.__module__, qualname, getattr(evaluator, "__defaults__", None),
+                          getattr(evaluator, "__kwdefaults__", None))
+
+
+def evaluator_fingerprint(evaluator:Evaluator) -> int:
+    """64-bit fingerprint of an evaluation function under this RULES_VERSION, for DiskCache files.
+
+    Module functions are identified by name and default arguments,
+    functools.partial objects also by their arguments and dataclass
+    instances by their repr. Lambdas and closures have no stable
+    description and raise ValueError.
+    """
+    text = "%d:%s" % (RULES_VERSION, _describe(evaluator))
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+
+class DiskCache:
+    """Open-addressing hash table of (64-bit key, float) in a memory-mapped file.
+
+    Any number of processes can open the same file. Writes go straight
+    into the shared mapping; each record carries a check word, so a
+    reader racing a writer sees either a whole record or a miss, never
+    a value for the wrong key. When all DISK_PROBES slots for a key are
+    taken the key's home slot is overwritten. Key 0 marks an empty slot,
+    so positions hashing to 0 are not stored.
+    """
+
+    def __init__(self, path:Union[str, Path], slots:int = 1 << 20, fingerprint:int = 0):
+        path = Path(path)
+        if not path.exists() or path.stat().st_size == 0:
+            slots = 1 << max(0, slots - 1).bit_length()
+            with open(path, "wb") as f:
+                f.write(DISK_HEADER.pack(DISK_MAGIC, DISK_VERSION, slots, fingerprint))
+                f.truncate(DISK_HEADER.size + slots * DISK_SLOT.size)
+        self.file = open(path, "r+b")
+        self.mmap = mmap.mmap(self.file.fileno(), 0)
+        try:
+            magic, version = DISK_HEADER.unpack_from(self.mmap, 0)[:2]
+            if magic != DISK_MAGIC:
+                raise ValueError("%s is not an evaluation cache file" % path)
+            if version != DISK_VERSION:
+                raise ValueError("Unsupported evaluation cache version %d" % version)
+            self.slots, self.fingerprint = DISK_HEADER.unpack_from(self.mmap, 0)[2:]
+            if self.fingerprint != fingerprint:
+                raise ValueError("%s was written by a different evaluator or rules version "
+                                 "(fingerprint %016x, expected %016x)" % (path, self.fingerprint, fingerprint))
+        except Exception:
+            self.close()
+            raise
+        self.mask = self.slots - 1
+
+    def _offset(self, slot:int) -> int:
+        return DISK_HEADER.size + (slot & self.mask) * DISK_SLOT.size
+
+    def get(self, key:int) -> Optional[float]:
+        key &= _KEY_MASK
+        for probe in range(DISK_PROBES):
+            stored, value, check = DISK_SLOT.unpack_from(self.mmap, self._offset(key + probe))
+            if stored == 0:
+                return None
+            if stored == key and check == _check(key, value):
+                return value
+        return None
+
+    def put(self, key:int, value:float):
+        key &= _KEY_MASK
+        if key == 0:
+            return
+        for probe in range(DISK_PROBES):
+            offset = self._offset(key + probe)
+            stored = DISK_SLOT.unpack_from(self.mmap, offset)[0]
+            if stored == 0 or stored == key:
+                break
+        else:
+            offset = self._offset(key)
+        DISK_SLOT.pack_into(self.mmap, offset, key, value, _check(key, value))
+
+    def flush(self):
+        self.mmap.flush()
+
+    def close(self):
+        self.mmap.close()
+        self.file.close()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    disk_hits: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def report(self) -> str:
+        return (f"{self.hits} hits, {self.disk_hits} disk hits, {self.misses} misses "
+                f"({self.hit_rate:.1%} hit rate), {self.evictions} evictions")
+
+
+@dataclass
+class CachedEvaluator:
+    """An evaluation function behind a bounded LRU cache and an optional DiskCache."""
+
+    evaluator: Evaluator = evaluate
+    capacity: int = 1 << 16
+    disk: Optional[DiskCache] = None
+    stats: CacheStats = field(default_factory=CacheStats)
+
+    def __post_init__(self):
+        self.cache: "OrderedDict[int, float]" = OrderedDict()
+
+    @classmethod
+    def with_disk(cls, path:Union[str, Path], evaluator:Evaluator = evaluate, capacity:int = 1 << 16,
+                  slots:int = 1 << 20, fingerprint:Optional[int] = None) -> "CachedEvaluator":
+        """Cache evaluator in memory and in the DiskCache at path.
+
+        fingerprint defaults to evaluator_fingerprint(evaluator); an existing
+        file with another fingerprint raises ValueError.
+        """
+        if fingerprint is None:
+            fingerprint = evaluator_fingerprint(evaluator)
+        return cls(evaluator, capacity, DiskCache(path, slots, fingerprint))
+
+    def __call__(self, gamestate:GameState) -> float:
+        key = gamestate.zobrist_hash
+        cache = self.cache
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+            self.stats.hits += 1
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.stats.disk_hits += 1
+                self._store(key, value)
+                return value
+        self.stats.misses += 1
+        value = self.evaluator(gamestate)
+        self._store(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+        return value
+
+    def _store(self, key:int, value:float):
+        cache = self.cache
+        cache[key] = value
+        if len(cache) > self.capacity:
+            cache.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self):
+        self.cache.clear()
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"size": len(self.cache), "capacity": self.capacity, "hits": self.stats.hits,
+                "disk_hits": self.stats.disk_hits, "misses": self.stats.misses,
+                "evictions": self.stats.evictions, "hit_rate": self.stats.hit_rate}
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
@@ -0,0 +1,419 @@
+"""Monte Carlo tree search agent.
+
+Hidden information is handled by determinization: every iteration deals
+the opponent's hidden hand again from the cards the searching player
+cannot see (see sampler.py), then searches the resulting
+perfect-information game. The tree
+is shared by all determinizations (single-observer information-set MCTS):
+a node stands for a sequence of moves, and each child also counts how
+often it was legal, since the opponent's moves depend on the cards dealt
+to them. Dice are not branched on; the tree is open loop.
+
+Selection is UCT, or PUCT when MCTSConfig.puct is set (with a pluggable
+prior, uniform by default). Leaves are valued by random playouts, or by
+an evaluator such as evaluator.CachedEvaluator when one is given.
+Root-parallel workers get the same prior and evaluator; over a process
+pool both are pickled into every task, so they must be picklable (a
+CachedEvaluator with a disk tier is not).
+Influence plays searched are the best placements under
+MCTSConfig.placement_objective plus a few random ones.
+
+Parallel modes:
+
+    none    one tree, searched in this thread
+    root    workers search independent trees from the root and their root
+            visit counts are summed
+    leaf    one tree; every leaf is valued by workers playouts at once
+
+Workers run in a thread or process pool. Process pools pickle the game
+state for every task, so they pay off for root parallelism and long
+budgets; leaf parallelism over processes is mostly useful with slow
+playout policies.
+"""
+
+import math
+import pickle
+import random
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..actions.actions_manager import ActionType, Move
+from ..actions.move_generator import MoveGenerator
+from ..actions.placement_solver import Objective, best_placements, control_delta
+from ..game import VP_TO_WIN, apply_move
+from ..game_sets.cards import CARD_OPS, CARD_SCORING
+from ..game_sets.constants import GamePhase, Superpower
+from ..state_managers.game_state import GameState
+from .evaluator import Evaluator
+from .sampler import WorldSampler
+
+# prior(gamestate, moves) -> one probability per move, for PUCT
+Prior = Callable[[GameState, List[Move]], Sequence[float]]
+
+MOVE_GENERATOR = MoveGenerator()
+
+# (board hash, player) -> ops -> best placements
+PlacementCache = Dict[Tuple[int, Superpower], Dict[int, List[Tuple[int, ...]]]]
+PLACEMENT_CACHE_SIZE = 4096
+
+
+@dataclass
+class MCTSConfig:
+    # UCT/PUCT exploration constant
+    exploration: float = 1.4
+    puct: bool = False
+    # per move budget; the search stops at whichever limit is reached first
+    time_limit: Optional[float] = 1.0
+    max_iterations: Optional[int] = None
+    # playouts stop after this many moves and score the vp track instead
+    rollout_depth: int = 400
+    # influence plays considered per card; the full placement space is far too wide
+    placements_per_card: int = 4
+    # plus this many best placements per ops value under placement_objective (see placement_solver).
+    # solutions are cached by board hash, so the objective should only look at the board
+    solved_placements: int = 1
+    placement_objective: Objective = control_delta
+    # "none", "root" or "leaf"
+    parallel: str = "none"
+    workers: int = 1
+    # "thread" or "process"
+    executor: str = "thread"
+    # keep the subtree under the chosen move for the next decision
+    reuse_tree: bool = True
+    # determinizations sampled at a time, see WorldSampler
+    sample_batch: int = 8
+
+
+class Node:
+    """Statistics for one move sequence from the root.
+
+    value is summed from the point of view of player, who made the move
+    leading here.
+    """
+
+    __slots__ = ("move", "player", "parent", "children", "visits", "value", "available", "position")
+
+    def __init__(self, move:Optional[Move], player:Optional[Superpower], parent:Optional["Node"]):
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children: Dict[Move, Node] = {}
+        self.visits = 0
+        self.value = 0.0
+        # how often this move was legal when its parent was visited
+        self.available = 0
+        # (turn, phase, action_round, chooser) where the children are played
+        self.position: Optional[Tuple] = None
+
+    def q(self) -> float:
+        return self.value / self.visits if self.visits else 0.0
+
+
+def position_key(gamestate:GameState) -> Tuple:
+    return (gamestate.turn, gamestate.phase, gamestate.action_round, gamestate.chooser)
+
+
+# -- move lists and playouts --
+
+def candidate_moves(gamestate:GameState, placements_per_card:int, solved_placements:int = 0,
+                    objective:Objective = control_delta, cache:Optional[PlacementCache] = None) -> List[Move]:
+    """Moves searched from this position.
+
+    Every event, space race, coup and realignment play, plus the
+    solved_placements best influence placements under objective and a few
+    random ones per card. The random placements are drawn from an rng
+    seeded by the board and card, so the same position offers the same
+    placements on every visit. Pass a cache to reuse solved placements
+    between calls.
+    """
+    player = gamestate.chooser
+    hand = gamestate.hand(player)
+    if gamestate.phase == GamePhase.HEADLINE:
+        return [Move(ActionType.HEADLINE_CHOICE, card, ()) for card in hand]
+    moves: List[Move] = []
+    coup_targets = MOVE_GENERATOR.coup_targets(gamestate, player)
+    board_hash = gamestate.board.hash
+    # best placements depend only on the ops value, not the card
+    solved: Dict[int, List[Tuple[int, ...]]] = {}
+    if cache is not None and solved_placements:
+        solved = cache.get((board_hash, player))
+        if solved is None:
+            if len(cache) >= PLACEMENT_CACHE_SIZE:
+                cache.clear()
+            solved = cache[board_hash, player] = {}
+    for card in hand:
+        moves.append(Move(ActionType.EVENT, card, ()))
+        ops = CARD_OPS[card]
+        if CARD_SCORING[card] or not ops:
+            continue
+        if gamestate.space_race.can_space(ops, player):
+            moves.append(Move(ActionType.SPACE_RACE, card, ()))
+        for index in coup_targets:
+            moves.append(Move(ActionType.COUP, card, (index,)))
+            moves.append(Move(ActionType.REALIGNMENT, card, (index,)))
+        if ops not in solved:
+            solved[ops] = [placement.targets for placement in best_placements(gamestate, player, ops, objective,
+                                                                                solved_placements)]
+        seen = set()
+        for targets in solved[ops]:
+            seen.add(targets)
+            moves.append(Move(ActionType.INFLUENCE, card, targets))
+        placement_rng = random.Random(board_hash ^ card)
+        for _ in range(placements_per_card):
+            targets = MOVE_GENERATOR.random_placement(gamestate, player, ops, placement_rng)
+            if targets and targets not in seen:
+                seen.add(targets)
+                moves.append(Move(ActionType.INFLUENCE, card, targets))
+    return moves
+
+
+def random_move(gamestate:GameState, rng:random.Random) -> Move:
+    """A random card played for a random use, for playouts."""
+    player = gamestate.chooser
+    card = rng.choice(gamestate.hand(player))
+    if gamestate.phase == GamePhase.HEADLINE:
+        return Move(ActionType.HEADLINE_CHOICE, card, ())
+    ops = CARD_OPS[card]
+    if CARD_SCORING[card] or not ops:
+        return Move(ActionType.EVENT, card, ())
+    use = rng.randrange(4)
+    if use == 1 and gamestate.space_race.can_space(ops, player):
+        return Move(ActionType.SPACE_RACE, card, ())
+    if use == 2:
+        targets = MOVE_GENERATOR.coup_targets(gamestate, player)
+        if targets:
+            action_type = ActionType.COUP if rng.random() < 0.5 else ActionType.REALIGNMENT
+            return Move(action_type, card, (rng.choice(targets),))
+    if use == 3:
+        targets = MOVE_GENERATOR.random_placement(gamestate, player, ops, rng)
+        if targets:
+            return Move(ActionType.INFLUENCE, card, targets)
+    return Move(ActionType.EVENT, card, ())
+
+
+def rollout(gamestate:GameState, rng:random.Random, depth:int) -> float:
+    """Play randomly to the end of the game (or depth moves). Returns the result for the USA in [-1, 1]."""
+    for _ in range(depth):
+        if gamestate.game_over:
+            break
+        apply_move(gamestate, random_move(gamestate, rng))
+    if gamestate.game_over:
+        if gamestate.winner is None:
+            return 0.0
+        return 1.0 if gamestate.winner == Superpower.USA else -1.0
+    return max(-1.0, min(1.0, gamestate.vp_track / VP_TO_WIN))
+
+
+def _rollout_task(gamestate:GameState, seed:int, depth:int) -> float:
+    return rollout(gamestate, random.Random(seed), depth)
+
+
+# -- search --
+
+class MCTS:
+    """One search tree and the loop that grows it."""
+
+    def __init__(self, config:MCTSConfig, rng:random.Random, prior:Optional[Prior] = None,
+                 pool:Optional[Executor] = None, evaluator:Optional[Evaluator] = None):
+        self.config = config
+        self.rng = rng
+        self.prior = prior
+        self.evaluator = evaluator
+        # set for leaf parallelism
+        self.pool = pool
+        self.root = Node(None, None, None)
+        self.iterations = 0
+        self.sampler = WorldSampler(config.sample_batch, rng.getrandbits(64))
+        self.placements: PlacementCache = {}
+
+    def search(self, gamestate:GameState, deadline:Optional[float], max_iterations:Optional[int]):
+        player = gamestate.chooser
+        n = 0
+        while True:
+            batch = self.config.sample_batch
+            if max_iterations is not None:
+                batch = min(batch, max_iterations - n)
+            if batch <= 0:
+                break
+            for world in self.sampler.sample(gamestate, player, batch):
+                if deadline is not None and time.perf_counter() >= deadline:
+                    self.iterations += n
+                    return
+                self._iterate(world)
+                n += 1
+        self.iterations += n
+
+    def _iterate(self, gs:GameState):
+        config = self.config
+        node = self.root
+        path = [node]
+        while not gs.game_over:
+            if node.position is None:
+                node.position = position_key(gs)
+            moves = candidate_moves(gs, config.placements_per_card, config.solved_placements,
+                                    config.placement_objective, self.placements)
+            child, expanded = self._select(node, gs, moves)
+            apply_move(gs, child.move)
+            node = child
+            path.append(node)
+            if expanded:
+                break
+        value = self._evaluate(gs)
+        for node in path:
+            node.visits += 1
+            if node.player is not None:
+                node.value += value if node.player == Superpower.USA else -value
+
+    def _select(self, node:Node, gs:GameState, moves:List[Move]) -> Tuple[Node, bool]:
+        player = gs.chooser
+        children = node.children
+        c = self.config.exploration
+        priors = self.prior(gs, moves) if self.config.puct and self.prior is not None else None
+        uniform = 1.0 / len(moves)
+        untried: List[Move] = []
+        best, best_score = None, -math.inf
+        for i, move in enumerate(moves):
+            child = children.get(move)
+            if child is None:
+                child = Node(move, player, node)
+                children[move] = child
+            child.available += 1
+            if self.config.puct:
+                p = priors[i] if priors is not None else uniform
+                score = child.q() + c * p * math.sqrt(child.available) / (1 + child.visits)
+            elif child.visits == 0:
+                untried.append(move)
+                continue
+            else:
+                score = child.q() + c * math.sqrt(math.log(child.available) / child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        if untried:
+            return children[self.rng.choice(untried)], True
+        return best, best.visits == 0
+
+    def _evaluate(self, gs:GameState) -> float:
+        if self.evaluator is not None:
+            return self.evaluator(gs)
+        depth = self.config.rollout_depth
+        if self.pool is None or self.config.workers <= 1:
+            return rollout(gs, self.rng, depth)
+        forks = [gs.fork(rng=random.Random(self.rng.getrandbits(64))) for _ in range(self.config.workers)]
+        seeds = [self.rng.getrandbits(63) for _ in forks]
+        values = list(self.pool.map(_rollout_task, forks, seeds, [depth] * len(forks)))
+        return sum(values) / len(values)
+
+    def root_stats(self) -> Dict[Move, Tuple[int, float]]:
+        return {move: (child.visits, child.value) for move, child in self.root.children.items()}
+
+
+def _root_search_task(gamestate:GameState, config:MCTSConfig, seed:int, time_limit:Optional[float],
+                      max_iterations:Optional[int], prior:Optional[Prior] = None,
+                      evaluator:Optional[Evaluator] = None) -> Dict[Move, Tuple[int, float]]:
+    # the deadline is taken here, after any pool start-up
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+    tree = MCTS(config, random.Random(seed), prior, evaluator=evaluator)
+    tree.search(gamestate, deadline, max_iterations)
+    return tree.root_stats()
+
+
+class MCTSAgent:
+    """Chooses moves for whichever side is to move by searching with MCTS.
+
+    Call observe(move) with every move applied to the game (the agent's own
+    included) to carry the tree over to the next decision.
+    """
+
+    def __init__(self, config:Optional[MCTSConfig] = None, seed:Optional[int] = None, prior:Optional[Prior] = None,
+                 evaluator:Optional[Evaluator] = None):
+        self.config = config if config is not None else MCTSConfig()
+        self.evaluator = evaluator
+        self.rng = random.Random(seed)
+        self.prior = prior
+        self.pool: Optional[Executor] = None
+        self.tree: Optional[MCTS] = None
+        # iterations run for the last decision, across all workers
+        self.last_iterations = 0
+
+    def __enter__(self) -> "MCTSAgent":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def _pool(self) -> Executor:
+        if self.pool is None:
+            if self.config.executor == "process":
+                self.pool = ProcessPoolExecutor(self.config.workers)
+            else:
+                self.pool = ThreadPoolExecutor(self.config.workers)
+        return self.pool
+
+    def choose_move(self, gamestate:GameState) -> Move:
+        config = self.config
+        deadline = time.perf_counter() + config.time_limit if config.time_limit is not None else None
+        if config.time_limit is None and config.max_iterations is None:
+            raise ValueError("MCTSConfig needs a time_limit or max_iterations")
+
+        if config.parallel == "root" and config.workers > 1:
+            stats = self._root_parallel(gamestate)
+        else:
+            tree = self.tree
+            if tree is None or not config.reuse_tree or tree.root.position not in (None, position_key(gamestate)):
+                pool = self._pool() if config.parallel == "leaf" and config.workers > 1 else None
+                tree = self.tree = MCTS(config, self.rng, self.prior, pool, self.evaluator)
+            before = tree.iterations
+            tree.search(gamestate, deadline, config.max_iterations)
+            self.last_iterations = tree.iterations - before
+            stats = tree.root_stats()
+
+        # most visited move that is actually legal in the real game
+        legal = set(candidate_moves(gamestate, config.placements_per_card, config.solved_placements,
+                                    config.placement_objective))
+        best = max((move for move in stats if move in legal), key=lambda move: stats[move][0], default=None)
+        if best is None:
+            best = random_move(gamestate, self.rng)
+        return best
+
+    def _root_parallel(self, gamestate:GameState) -> Dict[Move, Tuple[int, float]]:
+        config = self.config
+        pool = self._pool()
+        if config.executor == "process":
+            # fail here with a clear message rather than inside the pool
+            for name, part in (("prior", self.prior), ("evaluator", self.evaluator)):
+                try:
+                    pickle.dumps(part)
+                except Exception as e:
+                    raise ValueError("Root-parallel search over processes needs a picklable %s: %s" % (name, e)) from e
+        max_iterations = None if config.max_iterations is None else -(-config.max_iterations // config.workers)
+        futures = [pool.submit(_root_search_task, gamestate, config, self.rng.getrandbits(63), config.time_limit,
+                               max_iterations, self.prior, self.evaluator)
+                   for _ in range(config.workers)]
+        totals: Dict[Move, Tuple[int, float]] = {}
+        for future in futures:
+            for move, (visits, value) in future.result().items():
+                total_visits, total_value = totals.get(move, (0, 0.0))
+                totals[move] = (total_visits + visits, total_value + value)
+        self.last_iterations = sum(visits for visits, _ in totals.values())
+        self.tree = None
+        return totals
+
+    def observe(self, move:Move):
+        """Advance the tree past a move applied to the real game."""
+        tree = self.tree
+        if tree is None:
+            return
+        child = tree.root.children.get(move)
+        if child is None or not self.config.reuse_tree:
+            self.tree = None
+            return
+        child.parent = None
+        child.move = None
+        tree.root = child
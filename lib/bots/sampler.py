@@ -0,0 +1,102 @@
+"""Determinized worlds consistent with one player's view of the game.
+
+A player sees their own hand, the board, the discard and removed piles,
+and any opponent cards made visible. What they cannot see is the
+opponent's other cards, the draw pile order and a headline the opponent
+has already chosen face down. A determinization deals those unseen cards
+out again at random, keeping every size the player knows (hand size, draw
+pile size), so the result is a perfect-information game the player could
+be in.
+"""
+
+import random
+from array import array
+from typing import List, Optional
+
+from ..game import opponent
+from ..game_sets.cards import card_array
+from ..game_sets.constants import GamePhase, Superpower
+from ..state_managers.game_state import GameState
+
+
+class WorldSampler:
+    """Samples batches of determinized games into reusable buffers.
+
+    sample() overwrites the same k GameStates on every call (see
+    GameState.copy_from), so after the first batch only the shuffles cost
+    anything. The returned games are owned by the sampler: copy or fork
+    any that must outlive the next call.
+    """
+
+    def __init__(self, k:int, seed:Optional[int] = None):
+        self.k = k
+        self.rng = random.Random(seed)
+        self.worlds: List[GameState] = []
+        # unseen cards, shuffled in place for each world
+        self._unseen = card_array()
+        self._known = card_array()
+
+    def sample(self, gamestate:GameState, player:Superpower, k:Optional[int] = None) -> List[GameState]:
+        """k (default self.k) determinizations of gamestate from player's point of view."""
+        k = self.k if k is None else k
+        worlds = self.worlds
+        while len(worlds) < k:
+            world = gamestate.fork(rng=random.Random(self.rng.getrandbits(64)))
+            worlds.append(world)
+
+        opp = opponent(player)
+        hand = gamestate.hand(opp)
+        visible = gamestate.usa_hand_visible if opp == Superpower.USA else gamestate.ussr_hand_visible
+        headline = None
+        if gamestate.phase == GamePhase.HEADLINE:
+            headline = gamestate.usa_headline if opp == Superpower.USA else gamestate.ussr_headline
+        known, unseen = self._known, self._unseen
+        del known[:]
+        del unseen[:]
+        for card in hand:
+            (known if card in visible else unseen).append(card)
+        if headline is not None:
+            unseen.append(headline)
+        n_hidden = len(unseen)
+        unseen.extend(gamestate.deck.draw_pile)
+
+        shuffle = self.rng.shuffle
+        for world in worlds[:k]:
+            world.copy_from(gamestate)
+            shuffle(unseen)
+            _deal(world, opp, known, unseen, n_hidden, headline is not None)
+        return worlds[:k]
+
+    def sample_one(self, gamestate:GameState, player:Superpower) -> GameState:
+        """A single determinization in a new GameState, independent of the sampler's buffers."""
+        world = gamestate.fork(copy_on_write=True, rng=random.Random(self.rng.getrandbits(64)))
+        opp = opponent(player)
+        hand = world.hand(opp)
+        visible = world.usa_hand_visible if opp == Superpower.USA else world.ussr_hand_visible
+        headline = None
+        if world.phase == GamePhase.HEADLINE:
+            headline = world.usa_headline if opp == Superpower.USA else world.ussr_headline
+        known = card_array(card for card in hand if card in visible)
+        unseen = card_array(card for card in hand if card not in visible)
+        if headline is not None:
+            unseen.append(headline)
+        n_hidden = len(unseen)
+        unseen.extend(world.deck.draw_pile)
+        self.rng.shuffle(unseen)
+        _deal(world, opp, known, unseen, n_hidden, headline is not None)
+        return world
+
+
+def _deal(world:GameState, opp:Superpower, known:array, unseen:array, n_hidden:int, headline:bool):
+    # the first n_hidden unseen cards go to opp, the rest become the draw pile
+    world.deck.redeal(opp, unseen[:n_hidden], unseen[n_hidden:])
+    hand = world.hand(opp)
+    hand[:] = known
+    if headline:
+        # the headline card stays in the hand zone, but not the hand, until it resolves
+        n_hidden -= 1
+        if opp == Superpower.USA:
+            world.usa_headline = unseen[n_hidden]
+        else:
+            world.ussr_headline = unseen[n_hidden]
+    hand.extend(unseen[:n_hidden])
@@ -0,0 +1,121 @@
+"""Headless game loop: plays complete games between two agents.
+
+An agent is any callable taking the GameState and returning a Move for
+gamestate.chooser; apply_move does the rest (resolution, game over checks,
+action round and turn advance). The driver never copies the game or
+checks moves, so agents must only return legal moves (see MoveGenerator).
+
+In throughput mode (the default for run_games) the loop is nothing but
+agent calls and apply_move: no move descriptions are formatted and
+nothing is written. With a log function every move is described as it is
+played, for watching or debugging games.
+
+    stats = run_games(random_agent(1), random_agent(2), games=1000)
+    print(stats.report())
+"""
+
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+from .actions.actions_manager import ActionType, Move
+from .bots.mcts import random_move
+from .game import apply_move, new_game
+from .game_sets.cards import card_name
+from .game_sets.constants import Superpower
+from .game_sets.countries import COUNTRY_NAMES
+from .records import GameRecordWriter
+from .state_managers.game_state import GameState
+
+# agent(gamestate) -> move for gamestate.chooser
+Agent = Callable[[GameState], Move]
+# observer(move) is called after every move, e.g. MCTSAgent.observe
+Observer = Callable[[Move], None]
+
+
+def random_agent(seed:Optional[int] = None) -> Agent:
+    """An agent playing random_move with its own rng."""
+    rng = random.Random(seed)
+    return lambda gamestate: random_move(gamestate, rng)
+
+
+def describe_move(gamestate:GameState, move:Move) -> str:
+    targets = ", ".join(COUNTRY_NAMES[index] for index in move.targets)
+    text = f"T{gamestate.turn} AR{gamestate.action_round} {gamestate.chooser.name}: "
+    text += f"{move.action_type.name.lower()} {card_name(move.card)}"
+    if move.action_type != ActionType.HEADLINE_CHOICE and targets:
+        text += f" -> {targets}"
+    return text
+
+
+def play_game(usa:Agent, ussr:Agent, seed:Optional[int] = None, observers:Sequence[Observer] = (),
+              log:Optional[Callable[[str], None]] = None, writer:Optional[GameRecordWriter] = None) -> GameState:
+    """Play one game from setup to game over and return the final state.
+
+    Recorded games need a seed to be replayable, so with a writer and no
+    seed one is drawn first.
+    """
+    if writer is not None and seed is None:
+        seed = random.getrandbits(64)
+    gamestate = new_game(seed)
+    if writer is not None:
+        writer.begin_game(seed)
+    if log is None and writer is None and not observers:
+        # throughput mode
+        while not gamestate.game_over:
+            agent = usa if gamestate.chooser == Superpower.USA else ussr
+            apply_move(gamestate, agent(gamestate))
+        return gamestate
+
+    while not gamestate.game_over:
+        agent = usa if gamestate.chooser == Superpower.USA else ussr
+        move = agent(gamestate)
+        if log is not None:
+            log(describe_move(gamestate, move))
+        rolls = apply_move(gamestate, move)
+        if writer is not None:
+            writer.record(move, rolls)
+        for observe in observers:
+            observe(move)
+    if writer is not None:
+        writer.end_game(gamestate)
+    if log is not None:
+        winner = gamestate.winner.name if gamestate.winner is not None else "nobody"
+        log(f"game over on turn {gamestate.turn}: {winner} wins, vp {gamestate.vp_track:+d}")
+    return gamestate
+
+
+@dataclass
+class DriverStats:
+    seconds: float = 0.0
+    games: int = 0
+    usa_wins: int = 0
+    ussr_wins: int = 0
+    draws: int = 0
+
+    @property
+    def games_per_sec(self) -> float:
+        return self.games / self.seconds if self.seconds else 0.0
+
+    def report(self) -> str:
+        return (f"{self.games} games in {self.seconds:.1f}s: {self.games_per_sec:,.1f} games/sec "
+                f"(usa {self.usa_wins}, ussr {self.ussr_wins}, draws {self.draws})")
+
+
+def run_games(usa:Agent, ussr:Agent, games:int, seed:int = 0, observers:Sequence[Observer] = (),
+              log:Optional[Callable[[str], None]] = None, writer:Optional[GameRecordWriter] = None) -> DriverStats:
+    """Play games with seeds seed, seed + 1, ... and count the results."""
+    stats = DriverStats()
+    start = time.perf_counter()
+    for i in range(games):
+        winner = play_game(usa, ussr, seed + i, observers, log, writer).winner
+        if winner is None:
+            stats.draws += 1
+        elif winner == Superpower.USA:
+            stats.usa_wins += 1
+        else:
+            stats.ussr_wins += 1
+    stats.games = games
+    stats.seconds = time.perf_counter() - start
+    return stats
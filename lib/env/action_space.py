@@ -0,0 +1,121 @@
+"""Fixed-size discrete action space for learning agents.
+
+A turn's card play is split into a card/use choice followed by one target
+choice per op (influence) or a single target choice (coup, realignment):
+
+    offset              size                contents
+    HEADLINE_OFFSET     N_CARDS             choose a headline card
+    PLAY_OFFSET         N_CARDS * N_USES    play a card for a use, index card * N_USES + use
+    TARGET_OFFSET       N_COUNTRIES         choose a target country for the pending use
+
+An influence play of n placements is the play action followed by n
+target actions, one op decision each; coups and realignments take one
+target action. move_actions gives the actions for a whole Move.
+
+write_legal_mask fills the mask for a card play decision and
+write_target_mask the mask for a pending target choice. Both write into
+a caller's buffer from the board's frontier and coup masks, so building a
+mask allocates nothing per card or country.
+"""
+
+from typing import Tuple
+
+from ..actions.actions_manager import ActionType, Move
+from ..game_sets.cards import CARD_OPS, CARD_SCORING, N_CARDS
+from ..game_sets.constants import GamePhase, Superpower
+from ..game_sets.countries import Board, N_COUNTRIES
+from ..state_managers.game_state import GameState
+
+USES: Tuple[ActionType, ...] = (
+    ActionType.EVENT,
+    ActionType.SPACE_RACE,
+    ActionType.INFLUENCE,
+    ActionType.COUP,
+    ActionType.REALIGNMENT,
+)
+USE_INDEX = {use: i for i, use in enumerate(USES)}
+N_USES = len(USES)
+
+HEADLINE_OFFSET = 0
+PLAY_OFFSET = HEADLINE_OFFSET + N_CARDS
+TARGET_OFFSET = PLAY_OFFSET + N_CARDS * N_USES
+ACTION_SIZE = TARGET_OFFSET + N_COUNTRIES
+
+EVENT_USE, SPACE_USE, INFLUENCE_USE, COUP_USE, REALIGNMENT_USE = range(N_USES)
+
+_NO_ACTIONS = bytes(ACTION_SIZE)
+
+
+def headline_action(card:int) -> int:
+    return HEADLINE_OFFSET + card
+
+
+def play_action(card:int, use:ActionType) -> int:
+    return PLAY_OFFSET + card * N_USES + USE_INDEX[use]
+
+
+def target_action(country:int) -> int:
+    return TARGET_OFFSET + country
+
+
+def move_actions(move:Move) -> Tuple[int, ...]:
+    """The action indices that make up a move, in order."""
+    if move.action_type == ActionType.HEADLINE_CHOICE:
+        return (headline_action(move.card),)
+    return (play_action(move.card, move.action_type),) + tuple(TARGET_OFFSET + country for country in move.targets)
+
+
+def influence_target_mask(board:Board, player:Superpower, access:int, ops_left:int) -> int:
+    """Countries in access where the next influence can still be placed with ops_left ops."""
+    return access if ops_left >= 2 else board.cheap_mask(access, player)
+
+
+def write_target_mask(out, targets:int, offset:int = 0):
+    """Write a 0/1 mask with only the target actions in targets (a country bitmask) set."""
+    out[offset:offset + ACTION_SIZE] = _NO_ACTIONS
+    base = offset + TARGET_OFFSET
+    while targets:
+        low = targets & -targets
+        out[base + low.bit_length() - 1] = 1
+        targets ^= low
+
+
+def write_legal_mask(gamestate:GameState, out, offset:int = 0):
+    """Write the 0/1 legal-action mask for the chooser's card play (or headline) into out at offset."""
+    out[offset:offset + ACTION_SIZE] = _NO_ACTIONS
+    if gamestate.game_over:
+        return
+    player = gamestate.chooser
+    hand = gamestate.hand(player)
+    if gamestate.phase == GamePhase.HEADLINE:
+        for card in hand:
+            out[offset + HEADLINE_OFFSET + card] = 1
+        return
+    board = gamestate.board
+    coup_targets = board.coup_mask(gamestate.defcon_level, player)
+    access = board.access_mask(player)
+    cheap_access = access and board.cheap_mask(access, player)
+    space_race = gamestate.space_race
+    for card in hand:
+        base = offset + PLAY_OFFSET + card * N_USES
+        out[base + EVENT_USE] = 1
+        ops = CARD_OPS[card]
+        if CARD_SCORING[card] or ops == 0:
+            continue
+        if space_race.can_space(ops, player):
+            out[base + SPACE_USE] = 1
+        if access and (ops >= 2 or cheap_access):
+            out[base + INFLUENCE_USE] = 1
+        if coup_targets:
+            out[base + COUP_USE] = 1
+            out[base + REALIGNMENT_USE] = 1
+
+
+def decode(action:int) -> Tuple[int, int, int]:
+    """Split an action index into (block offset, card or country index, use index or -1)."""
+    if action < PLAY_OFFSET:
+        return HEADLINE_OFFSET, action - HEADLINE_OFFSET, -1
+    if action < TARGET_OFFSET:
+        card, use = divmod(action - PLAY_OFFSET, N_USES)
+        return PLAY_OFFSET, card, use
+    return TARGET_OFFSET, action - TARGET_OFFSET, -1
@@ -0,0 +1,223 @@
+"""Multi-process self-play with shared-memory ring buffers.
+
+Each worker process plays complete games with GameEnv and writes every
+position into its own ring buffer in multiprocessing.shared_memory:
+
+    header      4 x int64                   head, tail, games finished, positions written
+    obs         capacity x ENV_OBS_SIZE     float32 observation before the action
+    actions     capacity                    int32 action index taken
+    rewards     capacity                    float32 reward for the player who acted
+    dones       capacity                    uint8 1 if the action ended the game
+
+The worker only advances head and the parent only advances tail, so no
+locks are needed. A worker whose buffer is full waits for the parent to
+drain it. Nothing is pickled on the way back; the parent reads positions
+in place.
+"""
+
+import multiprocessing as mp
+import random
+import time
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .action_space import ACTION_SIZE
+from .vector_env import ENV_OBS_SIZE, GameEnv
+
+HEAD, TAIL, GAMES, POSITIONS = range(4)
+_HEADER_BYTES = 4 * 8
+
+# policy(env, mask, rng) -> action index. must be picklable (a module-level function)
+Policy = Callable[[GameEnv, bytearray, random.Random], int]
+
+
+def random_policy(env:GameEnv, mask:bytearray, rng:random.Random) -> int:
+    """Uniformly random legal action."""
+    legal = [i for i, legal in enumerate(mask) if legal]
+    return rng.choice(legal)
+
+
+class RingBuffer:
+    """Views over one worker's shared memory block."""
+
+    def __init__(self, shm:shared_memory.SharedMemory, capacity:int):
+        self.shm = shm
+        self.capacity = capacity
+        buf = shm.buf
+        offset = _HEADER_BYTES
+        self.header = buf[:offset].cast("q")
+        size = capacity * ENV_OBS_SIZE * 4
+        self.obs = buf[offset:offset + size].cast("f")
+        offset += size
+        self.actions = buf[offset:offset + capacity * 4].cast("i")
+        offset += capacity * 4
+        self.rewards = buf[offset:offset + capacity * 4].cast("f")
+        offset += capacity * 4
+        self.dones = buf[offset:offset + capacity]
+
+    @staticmethod
+    def nbytes(capacity:int) -> int:
+        return _HEADER_BYTES + capacity * (ENV_OBS_SIZE * 4 + 4 + 4 + 1)
+
+    def release(self):
+        # memoryviews must be released before the block can be closed
+        for view in (self.header, self.obs, self.actions, self.rewards, self.dones):
+            view.release()
+
+
+def _worker(worker_id:int, shm_name:str, capacity:int, seed:int, stop:mp.Event, policy:Policy):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = RingBuffer(shm, capacity)
+    # farm seed plus worker id, so every worker plays different games
+    rng = random.Random(seed + worker_id)
+    env = GameEnv(rng.getrandbits(63))
+    mask = bytearray(ACTION_SIZE)
+    obs = ring.obs
+    try:
+        while not stop.is_set():
+            header = ring.header
+            # wait for the parent to make room
+            while header[HEAD] - header[TAIL] >= capacity:
+                if stop.is_set():
+                    return
+                time.sleep(0.001)
+            slot = header[HEAD] % capacity
+            env.write_mask(mask)
+            env.write_observation(obs, slot * ENV_OBS_SIZE)
+            action = policy(env, mask, rng)
+            reward, done = env.step(action)
+            ring.actions[slot] = action
+            ring.rewards[slot] = reward
+            ring.dones[slot] = done
+            header[POSITIONS] += 1
+            if done:
+                header[GAMES] += 1
+                env.reset(rng.getrandbits(63))
+            # publish the slot last
+            header[HEAD] += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.release()
+        shm.close()
+
+
+@dataclass
+class FarmStats:
+    seconds: float = 0.0
+    games: int = 0
+    positions: int = 0
+    per_worker_games: List[int] = field(default_factory=list)
+
+    @property
+    def games_per_sec(self) -> float:
+        return self.games / self.seconds if self.seconds else 0.0
+
+    @property
+    def positions_per_sec(self) -> float:
+        return self.positions / self.seconds if self.seconds else 0.0
+
+    def report(self) -> str:
+        return (f"{self.games} games, {self.positions} positions in {self.seconds:.1f}s: "
+                f"{self.games_per_sec:,.1f} games/sec, {self.positions_per_sec:,.0f} positions/sec")
+
+
+class SelfPlayFarm:
+    """Runs self-play games on n_workers processes.
+
+    Worker i is seeded with seed + i. Use as a context manager so the
+    workers are stopped and the shared memory unlinked on exit.
+    """
+
+    def __init__(self, n_workers:Optional[int] = None, seed:int = 0, capacity:int = 4096,
+                 policy:Policy = random_policy):
+        self.n_workers = n_workers or mp.cpu_count()
+        self.seed = seed
+        self.capacity = capacity
+        self.policy = policy
+        self._ctx = mp.get_context()
+        self._stop = self._ctx.Event()
+        self._shms: List[shared_memory.SharedMemory] = []
+        self.rings: List[RingBuffer] = []
+        self._procs: List[mp.Process] = []
+        self._started = 0.0
+
+    def __enter__(self) -> "SelfPlayFarm":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        for i in range(self.n_workers):
+            shm = shared_memory.SharedMemory(create=True, size=RingBuffer.nbytes(self.capacity))
+            self._shms.append(shm)
+            self.rings.append(RingBuffer(shm, self.capacity))
+            proc = self._ctx.Process(target=_worker, args=(i, shm.name, self.capacity, self.seed, self._stop, self.policy),
+                                     daemon=True)
+            proc.start()
+            self._procs.append(proc)
+        self._started = time.perf_counter()
+
+    def drain(self) -> Iterator[Tuple[int, int]]:
+        """Yield (worker, slot) for each unread position, then mark them read.
+
+        Read rings[worker].obs/actions/rewards/dones at the slot before
+        advancing the generator; the slot may be reused afterwards.
+        """
+        for worker, ring in enumerate(self.rings):
+            header = ring.header
+            head, tail = header[HEAD], header[TAIL]
+            for position in range(tail, head):
+                yield worker, position % self.capacity
+                header[TAIL] = position + 1
+
+    def run(self, seconds:float, consumer:Optional[Callable[["SelfPlayFarm", int, int], None]] = None) -> FarmStats:
+        """Drain positions for a number of seconds, passing each to consumer(farm, worker, slot)."""
+        deadline = time.perf_counter() + seconds
+        try:
+            while time.perf_counter() < deadline:
+                drained = 0
+                for worker, slot in self.drain():
+                    if consumer is not None:
+                        consumer(self, worker, slot)
+                    drained += 1
+                if not drained:
+                    time.sleep(0.001)
+        except KeyboardInterrupt:
+            pass
+        return self.stats()
+
+    def stats(self) -> FarmStats:
+        games = [ring.header[GAMES] for ring in self.rings]
+        return FarmStats(
+            seconds=time.perf_counter() - self._started,
+            games=sum(games),
+            positions=sum(ring.header[POSITIONS] for ring in self.rings),
+            per_worker_games=games,
+        )
+
+    def close(self, timeout:float = 5.0):
+        """Stop the workers, then release and unlink the shared memory."""
+        self._stop.set()
+        for proc in self._procs:
+            proc.join(timeout)
+            if proc.is_alive():
+                proc.terminate()
+                proc.join()
+        for ring in self.rings:
+            ring.release()
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
+        self._procs, self.rings, self._shms = [], [], []
+
+
+if __name__ == "__main__":
+    import sys
+
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    with SelfPlayFarm() as farm:
+        print(farm.run(seconds).report())
@@ -0,0 +1,156 @@
+"""Environment wrappers for training agents on the rules engine.
+
+GameEnv turns one game into a sequence of discrete decisions from
+action_space. VectorEnv steps N of them in lockstep and writes stacked
+observations, rewards, done flags and legal-action masks into buffers it
+allocates once; the same buffers are returned (and overwritten) on every
+step.
+
+Observations are the ObservationEncoder layout from the chooser's point of
+view, followed by DECISION_SIZE values describing the pending card play:
+a one-hot of the use being resolved and the ops left to place. Influence
+placed during a pending play is already on the board in the observation.
+"""
+
+import random
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+from ..actions.actions_manager import ActionType, Move
+from ..game import apply_move, new_game
+from ..game_sets.cards import CARD_OPS
+from ..game_sets.constants import Superpower
+from ..game_sets.countries import BoardTransaction
+from ..state_managers.game_state import GameState
+from ..state_managers.observation import OBSERVATION_ENCODER, OBS_SIZE
+from .action_space import (ACTION_SIZE, HEADLINE_OFFSET, N_USES, PLAY_OFFSET, USES, decode, influence_target_mask,
+                           write_legal_mask, write_target_mask)
+
+DECISION_SIZE = N_USES + 1
+ENV_OBS_SIZE = OBS_SIZE + DECISION_SIZE
+
+
+class GameEnv:
+    """One game driven by action_space indices, for the player to move."""
+
+    def __init__(self, seed:Optional[int] = None):
+        self.reset(seed)
+
+    def reset(self, seed:Optional[int] = None) -> GameState:
+        self.gamestate = new_game(seed)
+        self._clear_pending()
+        return self.gamestate
+
+    def _clear_pending(self):
+        self.pending_card: Optional[int] = None
+        self.pending_use: Optional[ActionType] = None
+        self.ops_left = 0
+        self.targets: List[int] = []
+        self.access = 0
+        self.transaction: Optional[BoardTransaction] = None
+
+    def step(self, action:int) -> Tuple[float, bool]:
+        """Apply one decision. Returns (reward for the player who acted, done)."""
+        gamestate = self.gamestate
+        player = gamestate.chooser
+        block, index, use = decode(action)
+        if block == HEADLINE_OFFSET:
+            apply_move(gamestate, Move(ActionType.HEADLINE_CHOICE, index, ()))
+        elif block == PLAY_OFFSET:
+            card = index
+            if USES[use] in (ActionType.EVENT, ActionType.SPACE_RACE):
+                apply_move(gamestate, Move(USES[use], card, ()))
+            else:
+                self.pending_card = card
+                self.pending_use = USES[use]
+                self.ops_left = CARD_OPS[card]
+                self.access = gamestate.board.access_mask(player)
+                if self.pending_use == ActionType.INFLUENCE:
+                    self.transaction = gamestate.board.transaction()
+        else:
+            self._choose_target(player, index)
+        if not gamestate.game_over:
+            return 0.0, False
+        if gamestate.winner is None:
+            return 0.0, True
+        return (1.0 if gamestate.winner == player else -1.0), True
+
+    def _choose_target(self, player:Superpower, country:int):
+        gamestate = self.gamestate
+        self.targets.append(country)
+        if self.pending_use == ActionType.INFLUENCE:
+            board = gamestate.board
+            self.ops_left -= board.influence_cost(country, player)
+            if player == Superpower.USA:
+                board.change_influence(country, 1, 0)
+            else:
+                board.change_influence(country, 0, 1)
+            # keep placing while some accessible country is still affordable
+            if self.ops_left > 0 and self._influence_targets(player):
+                return
+            # undo the provisional placements so the engine applies the whole move
+            self.transaction.rollback()
+        move = Move(self.pending_use, self.pending_card, tuple(self.targets))
+        self._clear_pending()
+        apply_move(gamestate, move)
+
+    def _influence_targets(self, player:Superpower) -> int:
+        return influence_target_mask(self.gamestate.board, player, self.access, self.ops_left)
+
+    def write_mask(self, out:bytearray, offset:int = 0):
+        """Write the 0/1 legal-action mask for the current decision into out at offset."""
+        gamestate = self.gamestate
+        if self.pending_use is None or gamestate.game_over:
+            write_legal_mask(gamestate, out, offset)
+        elif self.pending_use == ActionType.INFLUENCE:
+            write_target_mask(out, self._influence_targets(gamestate.chooser), offset)
+        else:
+            write_target_mask(out, gamestate.board.coup_mask(gamestate.defcon_level, gamestate.chooser), offset)
+
+    def write_observation(self, out:array, offset:int = 0):
+        gamestate = self.gamestate
+        OBSERVATION_ENCODER.encode(gamestate, gamestate.chooser, out, offset)
+        decision = offset + OBS_SIZE
+        for i in range(DECISION_SIZE):
+            out[decision + i] = 0.0
+        if self.pending_use is not None:
+            out[decision + USES.index(self.pending_use)] = 1.0
+            out[decision + N_USES] = self.ops_left
+
+
+class VectorEnv:
+    """N independent games stepped in lockstep, with auto-reset of finished games."""
+
+    def __init__(self, n_envs:int, seed:Optional[int] = None):
+        self.n_envs = n_envs
+        self._seeds = random.Random(seed)
+        self.envs = [GameEnv(self._next_seed()) for _ in range(n_envs)]
+        self.observations = array("f", bytes(4 * ENV_OBS_SIZE * n_envs))
+        self.masks = bytearray(ACTION_SIZE * n_envs)
+        self.rewards = array("f", bytes(4 * n_envs))
+        self.dones = bytearray(n_envs)
+
+    def _next_seed(self) -> int:
+        return self._seeds.getrandbits(63)
+
+    def reset(self) -> Tuple[array, bytearray]:
+        for i, env in enumerate(self.envs):
+            env.reset(self._next_seed())
+            self._write(i)
+        return self.observations, self.masks
+
+    def step(self, actions:Sequence[int]) -> Tuple[array, array, bytearray, bytearray]:
+        """Step every game with its action. Returns (observations, rewards, dones, masks)."""
+        for i, env in enumerate(self.envs):
+            reward, done = env.step(actions[i])
+            self.rewards[i] = reward
+            self.dones[i] = done
+            if done:
+                env.reset(self._next_seed())
+            self._write(i)
+        return self.observations, self.rewards, self.dones, self.masks
+
+    def _write(self, i:int):
+        env = self.envs[i]
+        env.write_observation(self.observations, i * ENV_OBS_SIZE)
+        env.write_mask(self.masks, i * ACTION_SIZE)
@@ -0,0 +1,399 @@
+"""Rules engine: takes a GameState from setup to game over one Move at a time.
+
+Event text is not modelled yet. Playing a card for its event resolves
+scoring cards; any other event just sends the card to the discard pile (or
+the removed pile for cards removed after their event).
+"""
+
+import random
+from time import perf_counter
+from typing import Dict, Optional, Tuple
+
+from .actions.actions_manager import ActionType, Move
+from .game_sets.cards import CARD_OPS, CARD_REMOVED, card_id
+from .game_sets.constants import GamePhase, Superpower
+from .game_sets.countries import (COUNTRY_INDEX, COUNTRY_STABILITY, COUNTRY_BATTLEGROUND, HOME_COUNTRY, REGION_TOTALS,
+                                  REGION_INDEX, US_CONTROL, USSR_CONTROL, Board, InfluenceChange, Region)
+from .game_sets.tables import NEIGHBOURS, SCORING_CARD_IDS
+from .state_managers.deck import USA_HAND, USSR_HAND, Deck
+from .instrumentation import STATS, timed
+from .state_managers.game_state import GameState
+
+# bump when a rule change makes recorded games replay differently
+RULES_VERSION = 1
+
+LAST_TURN = 10
+VP_TO_WIN = 20
+
+# turn -> era shuffled into the draw pile at the start of that turn
+ERA_TURNS: Dict[int, str] = {4: "Mid War", 8: "Late War"}
+
+# fixed setup, including a fixed choice for each side's free placements
+SETUP_INFLUENCE = [
+    # USSR
+    InfluenceChange("Syria", 0, 1),
+    InfluenceChange("Iraq", 0, 1),
+    InfluenceChange("North Korea", 0, 3),
+    InfluenceChange("East Germany", 0, 4),
+    InfluenceChange("Finland", 0, 1),
+    InfluenceChange("Poland", 0, 4),
+    InfluenceChange("Yugoslavia", 0, 1),
+    # USA
+    InfluenceChange("Canada", 2, 0),
+    InfluenceChange("Iran", 1, 0),
+    InfluenceChange("Israel", 1, 0),
+    InfluenceChange("Japan", 1, 0),
+    InfluenceChange("Australia", 4, 0),
+    InfluenceChange("Philippines", 1, 0),
+    InfluenceChange("South Korea", 1, 0),
+    InfluenceChange("Panama", 1, 0),
+    InfluenceChange("South Africa", 1, 0),
+    InfluenceChange("UK", 5, 0),
+    InfluenceChange("West Germany", 4, 0),
+    InfluenceChange("Italy", 3, 0),
+]
+
+# (presence, domination, control) vps per region. control of Europe wins the game
+REGION_SCORING: Dict[Region, Tuple[int, int, int]] = {
+    Region.EUROPE: (3, 7, VP_TO_WIN),
+    Region.ASIA: (3, 7, 9),
+    Region.MIDDLE_EAST: (3, 5, 7),
+    Region.AFRICA: (1, 4, 6),
+    Region.CENTRAL_AMERICA: (1, 3, 5),
+    Region.SOUTH_AMERICA: (2, 5, 6),
+}
+
+SCORING_CARD_REGION: Dict[int, Region] = {
+    card_id("Europe Scoring"): Region.EUROPE,
+    card_id("Asia Scoring"): Region.ASIA,
+    card_id("Middle East Scoring"): Region.MIDDLE_EAST,
+    card_id("Africa Scoring"): Region.AFRICA,
+    card_id("Central America Scoring"): Region.CENTRAL_AMERICA,
+    card_id("South America Scoring"): Region.SOUTH_AMERICA,
+}
+SOUTHEAST_ASIA_SCORING = card_id("Southeast Asia Scoring")
+SCORING_CARD_MASK = sum(1 << card for card in SCORING_CARD_IDS)
+
+# southeast asia scoring: vps per controlled country
+SOUTHEAST_ASIA_VPS: Dict[int, int] = {
+    COUNTRY_INDEX[name]: vps for name, vps in [
+        ("Myanmar", 1), ("Laos/Cambodia", 1), ("Thailand", 2), ("Vietnam", 1),
+        ("Malaysia", 1), ("Indonesia", 1), ("Philippines", 1),
+    ]
+}
+
+
+# per phase stats, see instrumentation.py
+_PHASE_STATS = {phase: STATS.stat("phase." + phase.value) for phase in GamePhase}
+_TRANSITION_STATS = {phase: STATS.stat("transition." + phase.value) for phase in GamePhase}
+
+
+def opponent(player:Superpower) -> Superpower:
+    return Superpower.USSR if player == Superpower.USA else Superpower.USA
+
+
+def action_rounds(turn:int) -> int:
+    return 6 if turn <= 3 else 7
+
+
+def hand_size(turn:int) -> int:
+    return 8 if turn <= 3 else 9
+
+
+# by turn, so the turn loop does no calls for them
+ACTION_ROUNDS: Tuple[int, ...] = tuple(action_rounds(turn) for turn in range(LAST_TURN + 1))
+HAND_SIZES: Tuple[int, ...] = tuple(hand_size(turn) for turn in range(LAST_TURN + 1))
+
+
+def new_game(seed:Optional[int] = None) -> GameState:
+    """Create a game, set it up and advance it to the first headline."""
+    rng = random.Random(seed)
+    gamestate = GameState(rng=rng, deck=Deck(rng))
+    setup(gamestate)
+    return gamestate
+
+
+def setup(gamestate:GameState):
+    gamestate.defcon_level = 5
+    gamestate._apply_influence_changes(SETUP_INFLUENCE)
+    _start_turn(gamestate)
+
+
+def apply_move(gamestate:GameState, move:Move) -> Tuple[int, ...]:
+    """Play a move for the chooser and advance the game to the next decision.
+
+    Moves are trusted to be legal (see MoveGenerator). Returns the dice rolled.
+    """
+    if STATS.enabled:
+        stat = _PHASE_STATS[gamestate.phase]
+        start = perf_counter()
+        rolls = _apply_move(gamestate, move)
+        stat.record(perf_counter() - start)
+        return rolls
+    return _apply_move(gamestate, move)
+
+
+def _apply_move(gamestate:GameState, move:Move) -> Tuple[int, ...]:
+    player = gamestate.chooser
+    gamestate.hand(player).remove(move.card)
+
+    if move.action_type == ActionType.HEADLINE_CHOICE:
+        if player == Superpower.USSR:
+            gamestate.ussr_headline = move.card
+            gamestate.chooser = Superpower.USA
+        else:
+            gamestate.usa_headline = move.card
+            _resolve_headlines(gamestate)
+        return ()
+
+    card = move.card
+    rolls: Tuple[int, ...] = ()
+    if move.action_type == ActionType.INFLUENCE:
+        board = gamestate.board
+        for index in move.targets:
+            if player == Superpower.USA:
+                board.change_influence(index, 1, 0)
+            else:
+                board.change_influence(index, 0, 1)
+    elif move.action_type == ActionType.COUP:
+        rolls = _coup(gamestate, player, move.targets[0], CARD_OPS[card])
+    elif move.action_type == ActionType.REALIGNMENT:
+        rolls = _realign(gamestate, player, move.targets[0])
+    elif move.action_type == ActionType.SPACE_RACE:
+        roll = gamestate.rng.randint(1, 6)
+        _gain_vps(gamestate, player, gamestate.space_race.attempt(player, roll))
+        rolls = (roll,)
+    elif move.action_type == ActionType.EVENT:
+        _resolve_event(gamestate, card)
+
+    if move.action_type == ActionType.EVENT and CARD_REMOVED[card]:
+        gamestate.deck.remove(card)
+    else:
+        gamestate.deck.discard(card)
+
+    if not gamestate.game_over:
+        _next_action_round(gamestate)
+    return rolls
+
+
+# -- card uses --
+
+def _coup(gamestate:GameState, player:Superpower, index:int, ops:int) -> Tuple[int, ...]:
+    roll = gamestate.rng.randint(1, 6)
+    board = gamestate.board
+    result = roll + ops - 2 * COUNTRY_STABILITY[index]
+    if result > 0:
+        opp_influence = board.ussr_influence[index] if player == Superpower.USA else board.us_influence[index]
+        removed = min(result, opp_influence)
+        added = result - removed
+        if player == Superpower.USA:
+            board.change_influence(index, added, -removed)
+        else:
+            board.change_influence(index, -removed, added)
+    if player == Superpower.USA:
+        gamestate.usa_milops += ops
+    else:
+        gamestate.ussr_milops += ops
+    if COUNTRY_BATTLEGROUND[index]:
+        gamestate.defcon_level -= 1
+        # the phasing player loses if their coup sets off nuclear war
+        if gamestate.defcon_level <= 1:
+            _end_game(gamestate, opponent(player))
+    return (roll,)
+
+
+# one realignment roll per card
+def _realign(gamestate:GameState, player:Superpower, index:int) -> Tuple[int, ...]:
+    board = gamestate.board
+    us_roll = gamestate.rng.randint(1, 6)
+    ussr_roll = gamestate.rng.randint(1, 6)
+    us_total = us_roll + realign_modifier(board, Superpower.USA, index)
+    ussr_total = ussr_roll + realign_modifier(board, Superpower.USSR, index)
+    if us_total > ussr_total:
+        board.change_influence(index, 0, -min(us_total - ussr_total, board.ussr_influence[index]))
+    elif ussr_total > us_total:
+        board.change_influence(index, -min(ussr_total - us_total, board.us_influence[index]), 0)
+    return (us_roll, ussr_roll)
+
+
+def realign_modifier(board:Board, player:Superpower, index:int) -> int:
+    """A player's realignment roll modifier: +1 per adjacent controlled country (or home) and +1 for more influence."""
+    control = US_CONTROL if player == Superpower.USA else USSR_CONTROL
+    home = HOME_COUNTRY[player]
+    modifier = 0
+    for a in NEIGHBOURS[index]:
+        if board.control[a] == control or a == home:
+            modifier += 1
+    own, opp = board.us_influence[index], board.ussr_influence[index]
+    if player == Superpower.USSR:
+        own, opp = opp, own
+    if own > opp:
+        modifier += 1
+    return modifier
+
+
+def _resolve_event(gamestate:GameState, card:int):
+    if card in SCORING_CARD_REGION:
+        _gain_vps(gamestate, Superpower.USA, score_region(gamestate, SCORING_CARD_REGION[card]))
+    elif card == SOUTHEAST_ASIA_SCORING:
+        _gain_vps(gamestate, Superpower.USA, score_southeast_asia(gamestate))
+
+
+# -- scoring --
+
+@timed("scoring.region")
+def score_region(gamestate:GameState, region:Region) -> int:
+    """VP swing for scoring a region, positive for the USA."""
+    us_countries, ussr_countries, us_battlegrounds, ussr_battlegrounds = gamestate.board.region_control(region)
+    total_battlegrounds = REGION_TOTALS[REGION_INDEX[region]][1]
+    table = REGION_SCORING[region]
+    return (_side_score(table, total_battlegrounds, us_countries, us_battlegrounds, ussr_countries, ussr_battlegrounds)
+            - _side_score(table, total_battlegrounds, ussr_countries, ussr_battlegrounds, us_countries, us_battlegrounds))
+
+
+def _side_score(table:Tuple[int, int, int], total_battlegrounds:int, countries:int, battlegrounds:int,
+                opp_countries:int, opp_battlegrounds:int) -> int:
+    if countries == 0:
+        return 0
+    presence, domination, control = table
+    if battlegrounds == total_battlegrounds and countries > opp_countries:
+        level = control
+    elif countries > opp_countries and battlegrounds > opp_battlegrounds and countries > battlegrounds:
+        level = domination
+    else:
+        level = presence
+    return level + battlegrounds
+
+
+@timed("scoring.southeast_asia")
+def score_southeast_asia(gamestate:GameState) -> int:
+    control = gamestate.board.control
+    vps = 0
+    for index, country_vps in SOUTHEAST_ASIA_VPS.items():
+        if control[index] == US_CONTROL:
+            vps += country_vps
+        elif control[index] == USSR_CONTROL:
+            vps -= country_vps
+    return vps
+
+
+def _gain_vps(gamestate:GameState, player:Superpower, vps:int):
+    if not vps:
+        return
+    gamestate.vp_track += vps if player == Superpower.USA else -vps
+    if gamestate.vp_track >= VP_TO_WIN:
+        _end_game(gamestate, Superpower.USA)
+    elif gamestate.vp_track <= -VP_TO_WIN:
+        _end_game(gamestate, Superpower.USSR)
+
+
+def _end_game(gamestate:GameState, winner:Optional[Superpower]):
+    if gamestate.game_over:
+        return
+    gamestate.winner = winner
+    _set_phase(gamestate, GamePhase.GAME_OVER)
+
+
+# -- phase and turn management --
+
+def _set_phase(gamestate:GameState, phase:GamePhase):
+    gamestate.phase = phase
+    if STATS.enabled:
+        _TRANSITION_STATS[phase].calls += 1
+
+
+def _start_turn(gamestate:GameState):
+    era = ERA_TURNS.get(gamestate.turn)
+    if era:
+        gamestate.deck._add_era(era)
+    gamestate._fill_hands(HAND_SIZES[gamestate.turn])
+    _set_phase(gamestate, GamePhase.HEADLINE)
+    gamestate.action_round = 1
+    gamestate.player_ar = None
+    gamestate.usa_headline = gamestate.ussr_headline = None
+    gamestate.chooser = Superpower.USSR
+
+
+def _resolve_headlines(gamestate:GameState):
+    # higher ops goes first, the USA on ties
+    usa_card, ussr_card = gamestate.usa_headline, gamestate.ussr_headline
+    headlines = (usa_card, ussr_card) if CARD_OPS[usa_card] >= CARD_OPS[ussr_card] else (ussr_card, usa_card)
+    for card in headlines:
+        _resolve_event(gamestate, card)
+        if CARD_REMOVED[card]:
+            gamestate.deck.remove(card)
+        else:
+            gamestate.deck.discard(card)
+    if gamestate.game_over:
+        return
+    _set_phase(gamestate, GamePhase.ACTION_ROUNDS)
+    gamestate.player_ar = gamestate.chooser = Superpower.USSR
+    if not gamestate.ussr_hand:
+        _next_action_round(gamestate)
+
+
+def _next_action_round(gamestate:GameState):
+    # USSR then USA each action round; a player with no cards left passes
+    last_round = ACTION_ROUNDS[gamestate.turn]
+    usa_hand, ussr_hand = gamestate.usa_hand, gamestate.ussr_hand
+    while True:
+        if gamestate.player_ar == Superpower.USSR:
+            player, hand = Superpower.USA, usa_hand
+        else:
+            player, hand = Superpower.USSR, ussr_hand
+            gamestate.action_round += 1
+        gamestate.player_ar = player
+        if gamestate.action_round > last_round or not (usa_hand or ussr_hand):
+            _end_turn(gamestate)
+            return
+        if hand:
+            gamestate.chooser = player
+            return
+
+
+def _end_turn(gamestate:GameState):
+    _set_phase(gamestate, GamePhase.MILITARY_OPS_CHECK)
+    # a player short of required military ops gives the shortfall to their opponent as vps
+    usa_shortfall = max(0, gamestate.defcon_level - gamestate.usa_milops)
+    ussr_shortfall = max(0, gamestate.defcon_level - gamestate.ussr_milops)
+    _gain_vps(gamestate, Superpower.USSR, usa_shortfall)
+    _gain_vps(gamestate, Superpower.USA, ussr_shortfall)
+    if gamestate.game_over:
+        return
+
+    # holding a scoring card at the end of the turn loses the game. the hand
+    # zones match the hands once the headlines are resolved
+    zones = gamestate.deck.zones
+    usa_held = bool(zones[USA_HAND] & SCORING_CARD_MASK)
+    ussr_held = bool(zones[USSR_HAND] & SCORING_CARD_MASK)
+    if usa_held or ussr_held:
+        _end_game(gamestate, None if usa_held and ussr_held else (Superpower.USSR if usa_held else Superpower.USA))
+        return
+
+    _set_phase(gamestate, GamePhase.CLEANUP)
+    gamestate.defcon_level = min(5, gamestate.defcon_level + 1)
+    gamestate.usa_milops = gamestate.ussr_milops = 0
+    gamestate.space_race._end_turn()
+    del gamestate.usa_hand_visible[:]
+    del gamestate.ussr_hand_visible[:]
+
+    if gamestate.turn >= LAST_TURN:
+        _final_scoring(gamestate)
+        return
+    gamestate.turn += 1
+    _start_turn(gamestate)
+
+
+@timed("scoring.final")
+def _final_scoring(gamestate:GameState):
+    _set_phase(gamestate, GamePhase.SCORING)
+    for region in REGION_SCORING:
+        _gain_vps(gamestate, Superpower.USA, score_region(gamestate, region))
+        if gamestate.game_over:
+            return
+    if gamestate.vp_track > 0:
+        _end_game(gamestate, Superpower.USA)
+    elif gamestate.vp_track < 0:
+        _end_game(gamestate, Superpower.USSR)
+    else:
+        _end_game(gamestate, None)
@@ -1,7 +1,8 @@
 """Card definitions and effects for Twilight Struggle."""
 
+from array import array
 from enum import Enum
-from typing import Dict, List, Optional, Callable, Any
+from typing import Dict, Iterable, List, Optional, Callable, Any, Tuple
 from dataclasses import dataclass
 
 
@@ -253,25 +254,69 @@ CARDS: Dict[str, Card] = {
 }
 
 
-def get_cards_by_era(early_war: bool = False, mid_war: bool = False, late_war: bool = False) -> List[Card]:
+# -- interned card table --
+# a card's id is its position in CARDS. hands, piles and moves hold ids;
+# names are only needed at the CLI and serialization boundary
+
+CARD_NAMES: Tuple[str, ...] = tuple(CARDS)
+CARD_IDS: Dict[str, int] = {name: i for i, name in enumerate(CARD_NAMES)}
+N_CARDS = len(CARD_NAMES)
+
+ERAS: Tuple[str, ...] = ("Early War", "Mid War", "Late War")
+SIDES: Tuple[Side, ...] = tuple(Side)
+
+# parallel columns indexed by card id
+CARD_OPS = array("B", [card.ops for card in CARDS.values()])
+CARD_SIDE = array("B", [SIDES.index(card.side) for card in CARDS.values()])
+CARD_ERA = array("B", [ERAS.index(card.era) for card in CARDS.values()])
+CARD_REMOVED = array("B", [card.removed_after_event for card in CARDS.values()])
+CARD_SCORING = array("B", [card.card_type == CardType.SCORING for card in CARDS.values()])
+
+# era name -> ids of the cards it adds to the deck
+ERA_CARDS: Dict[str, Tuple[int, ...]] = {era: tuple(i for i in range(N_CARDS) if CARD_ERA[i] == e) for e, era in enumerate(ERAS)}
+
+
+def card_id(name:str) -> int:
+    return CARD_IDS[name]
+
+
+def card_name(card:int) -> str:
+    return CARD_NAMES[card]
+
+
+def card_array(cards:Iterable[int] = ()) -> array:
+    """Compact array of card ids, used for hands and piles."""
+    return array("B", cards)
+
+
+# card lookups are static, so every answer is built once here
+_CARDS_BY_ERA: Dict[Tuple[bool, bool, bool], Tuple[Card, ...]] = {
+    (early_war, mid_war, late_war): tuple(
+        card for card in CARDS.values()
+        if (early_war and card.early_war) or (mid_war and card.mid_war) or (late_war and card.late_war)
+    )
+    for early_war in (False, True) for mid_war in (False, True) for late_war in (False, True)
+}
+_SCORING_CARDS: Tuple[Card, ...] = tuple(card for card in CARDS.values() if card.card_type == CardType.SCORING)
+_EVENT_CARDS: Tuple[Card, ...] = tuple(card for card in CARDS.values() if card.card_type == CardType.EVENT)
+_CARDS_BY_SIDE: Dict[Side, Tuple[Card, ...]] = {side: tuple(card for card in CARDS.values() if card.side == side) for side in Side}
+
+
+def get_cards_by_era(early_war: bool = False, mid_war: bool = False, late_war: bool = False) -> Tuple[Card, ...]:
     """Get cards by era."""
-    cards = []
-    for card in CARDS.values():
-        if (early_war and card.early_war) or (mid_war and card.mid_war) or (late_war and card.late_war):
-            cards.append(card)
-    return cards
+    return _CARDS_BY_ERA[bool(early_war), bool(mid_war), bool(late_war)]
 
 
-def get_scoring_cards() -> List[Card]:
+def get_scoring_cards() -> Tuple[Card, ...]:
     """Get all scoring cards."""
-    return [card for card in CARDS.values() if card.card_type == CardType.SCORING]
+    return _SCORING_CARDS
 
 
-def get_event_cards() -> List[Card]:
+def get_event_cards() -> Tuple[Card, ...]:
     """Get all event cards."""
-    return [card for card in CARDS.values() if card.card_type == CardType.EVENT]
+    return _EVENT_CARDS
 
 
-def get_cards_by_side(side: Side) -> List[Card]:
+def get_cards_by_side(side: Side) -> Tuple[Card, ...]:
     """Get cards by side."""
-    return [card for card in CARDS.values() if card.side == side]
\ No newline at end of file
+    return _CARDS_BY_SIDE[side]
\ No newline at end of file
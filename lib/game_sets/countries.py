@@ -1,10 +1,13 @@
 """Country definitions and board representation for Twilight Struggle."""
 
+from array import array
+from collections.abc import Mapping
 from enum import Enum
-from typing import Any, Dict, List, Optional
-from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, field
 
 from .constants import Superpower
+from .zobrist import INFLUENCE_MASK, INFLUENCE_VALUES, zobrist_keys
 from collections import namedtuple
 class Region(Enum):
     EUROPE = "Europe"
@@ -15,27 +18,262 @@ class Region(Enum):
     SOUTH_AMERICA = "South America"
 
 
-
-
-
-@dataclass
-class Country:
+# static definition of a country. live influence is kept on a Board
+@dataclass(frozen=True)
+class CountryInfo:
     name: str
     region: Region
     stability: int
     battleground: bool = False
-    adjacent_countries: List[str] = []
-    us_influence: int = 0
-    ussr_influence: int = 0
-    
-    def __post_init__(self):
-        if self.adjacent_countries is None:
-            self.adjacent_countries = []
+    adjacent_countries: List[str] = field(default_factory=list)
 
+
+# TODO Fix this shit 
+COUNTRY_INFO: Dict[str, CountryInfo] = {
+    # Europe
+    "Canada": CountryInfo("Canada", Region.EUROPE, 4, battleground=True, adjacent_countries=["USA"]),
+    "UK": CountryInfo("UK", Region.EUROPE, 5, battleground=True, adjacent_countries=["Norway", "Benelux", "France"]),
+    "Norway": CountryInfo("Norway", Region.EUROPE, 4, adjacent_countries=["UK", "Sweden", "Finland"]),
+    "Sweden": CountryInfo("Sweden", Region.EUROPE, 4, adjacent_countries=["Norway", "Finland", "Denmark"]),
+    "Finland": CountryInfo("Finland", Region.EUROPE, 4, adjacent_countries=["Norway", "Sweden", "USSR"]),
+    "Denmark": CountryInfo("Denmark", Region.EUROPE, 3, adjacent_countries=["Sweden", "West Germany", "Benelux"]),
+    "Benelux": CountryInfo("Benelux", Region.EUROPE, 3, adjacent_countries=["UK", "Denmark", "West Germany", "France"]),
+    "France": CountryInfo("France", Region.EUROPE, 3, battleground=True, adjacent_countries=["UK", "Benelux", "West Germany", "Spain/Portugal", "Italy", "Algeria"]),
+    "Spain/Portugal": CountryInfo("Spain/Portugal", Region.EUROPE, 2, adjacent_countries=["France", "Italy", "Morocco"]),
+    "Italy": CountryInfo("Italy", Region.EUROPE, 2, battleground=True, adjacent_countries=["France", "Spain/Portugal", "West Germany", "Austria", "Yugoslavia", "Greece"]),
+    "West Germany": CountryInfo("West Germany", Region.EUROPE, 4, battleground=True, adjacent_countries=["Benelux", "Denmark", "France", "Italy", "Austria", "East Germany"]),
+    "East Germany": CountryInfo("East Germany", Region.EUROPE, 3, battleground=True, adjacent_countries=["West Germany", "Austria", "Czechoslovakia", "Poland"]),
+    "Austria": CountryInfo("Austria", Region.EUROPE, 4, adjacent_countries=["Italy", "West Germany", "East Germany", "Czechoslovakia", "Hungary"]),
+    "Czechoslovakia": CountryInfo("Czechoslovakia", Region.EUROPE, 3, adjacent_countries=["East Germany", "Austria", "Hungary", "Poland"]),
+    "Hungary": CountryInfo("Hungary", Region.EUROPE, 3, adjacent_countries=["Austria", "Czechoslovakia", "Romania", "Yugoslavia"]),
+    "Poland": CountryInfo("Poland", Region.EUROPE, 3, battleground=True, adjacent_countries=["East Germany", "Czechoslovakia", "USSR"]),
+    "Yugoslavia": CountryInfo("Yugoslavia", Region.EUROPE, 3, adjacent_countries=["Italy", "Hungary", "Romania", "Bulgaria", "Greece"]),
+    "Romania": CountryInfo("Romania", Region.EUROPE, 3, adjacent_countries=["Hungary", "Yugoslavia", "Bulgaria", "Turkey", "USSR"]),
+    "Bulgaria": CountryInfo("Bulgaria", Region.EUROPE, 3, adjacent_countries=["Yugoslavia", "Romania", "Greece", "Turkey"]),
+    "Greece": CountryInfo("Greece", Region.EUROPE, 2, adjacent_countries=["Italy", "Yugoslavia", "Bulgaria", "Turkey"]),
+    "Turkey": CountryInfo("Turkey", Region.EUROPE, 2, battleground=True, adjacent_countries=["Bulgaria", "Greece", "Romania", "Syria", "Lebanon", "Israel"]),
     
+    # Asia  
+    "USSR": CountryInfo("USSR", Region.ASIA, 6, battleground=True, adjacent_countries=["Finland", "Poland", "Romania", "Afghanistan", "China", "Mongolia", "North Korea"]),
+    "China": CountryInfo("China", Region.ASIA, 5, battleground=True, adjacent_countries=["USSR", "Mongolia", "North Korea", "South Korea", "Japan", "Laos/Cambodia", "Vietnam", "Myanmar", "India", "Pakistan", "Afghanistan"]),
+    "Mongolia": CountryInfo("Mongolia", Region.ASIA, 4, adjacent_countries=["USSR", "China"]),
+    "North Korea": CountryInfo("North Korea", Region.ASIA, 3, battleground=True, adjacent_countries=["USSR", "China", "South Korea"]),
+    "South Korea": CountryInfo("South Korea", Region.ASIA, 3, battleground=True, adjacent_countries=["China", "North Korea", "Japan"]),
+    "Japan": CountryInfo("Japan", Region.ASIA, 4, battleground=True, adjacent_countries=["China", "South Korea", "Philippines", "Taiwan"]),
+    "Taiwan": CountryInfo("Taiwan", Region.ASIA, 3, adjacent_countries=["Japan", "Philippines", "South Korea"]),
+    "Philippines": CountryInfo("Philippines", Region.ASIA, 2, adjacent_countries=["Japan", "Taiwan", "Malaysia", "Indonesia", "Australia"]),
+    "Australia": CountryInfo("Australia", Region.ASIA, 4, adjacent_countries=["Philippines", "Indonesia"]),
+    "Indonesia": CountryInfo("Indonesia", Region.ASIA, 1, adjacent_countries=["Philippines", "Australia", "Malaysia"]),
+    "Malaysia": CountryInfo("Malaysia", Region.ASIA, 2, adjacent_countries=["Philippines", "Indonesia", "Thailand"]),
+    "Thailand": CountryInfo("Thailand", Region.ASIA, 2, battleground=True, adjacent_countries=["Malaysia", "Myanmar", "Laos/Cambodia", "Vietnam"]),
+    "Laos/Cambodia": CountryInfo("Laos/Cambodia", Region.ASIA, 1, adjacent_countries=["China", "Thailand", "Vietnam"]),
+    "Vietnam": CountryInfo("Vietnam", Region.ASIA, 1, adjacent_countries=["China", "Thailand", "Laos/Cambodia"]),
+    "Myanmar": CountryInfo("Myanmar", Region.ASIA, 2, adjacent_countries=["China", "Thailand", "India", "Bangladesh"]),
+    "India": CountryInfo("India", Region.ASIA, 3, battleground=True, adjacent_countries=["China", "Myanmar", "Bangladesh", "Pakistan"]),
+    "Bangladesh": CountryInfo("Bangladesh", Region.ASIA, 2, adjacent_countries=["Myanmar", "India"]),
+    "Pakistan": CountryInfo("Pakistan", Region.ASIA, 2, battleground=True, adjacent_countries=["China", "India", "Afghanistan", "Iran"]),
+    "Afghanistan": CountryInfo("Afghanistan", Region.ASIA, 2, adjacent_countries=["USSR", "China", "Pakistan", "Iran"]),
+    
+    # Middle East
+    "Iran": CountryInfo("Iran", Region.MIDDLE_EAST, 2, battleground=True, adjacent_countries=["Pakistan", "Afghanistan", "Iraq", "Gulf States", "Saudi Arabia"]),
+    "Iraq": CountryInfo("Iraq", Region.MIDDLE_EAST, 3, battleground=True, adjacent_countries=["Iran", "Gulf States", "Saudi Arabia", "Jordan", "Syria", "Turkey"]),
+    "Gulf States": CountryInfo("Gulf States", Region.MIDDLE_EAST, 3, adjacent_countries=["Iran", "Iraq", "Saudi Arabia"]),
+    "Saudi Arabia": CountryInfo("Saudi Arabia", Region.MIDDLE_EAST, 3, battleground=True, adjacent_countries=["Iran", "Iraq", "Gulf States", "Jordan", "Egypt"]),
+    "Jordan": CountryInfo("Jordan", Region.MIDDLE_EAST, 2, adjacent_countries=["Iraq", "Saudi Arabia", "Israel", "Syria", "Lebanon"]),
+    "Syria": CountryInfo("Syria", Region.MIDDLE_EAST, 2, adjacent_countries=["Turkey", "Iraq", "Jordan", "Lebanon", "Israel"]),
+    "Lebanon": CountryInfo("Lebanon", Region.MIDDLE_EAST, 1, adjacent_countries=["Turkey", "Jordan", "Syria", "Israel"]),
+    "Israel": CountryInfo("Israel", Region.MIDDLE_EAST, 4, battleground=True, adjacent_countries=["Turkey", "Jordan", "Syria", "Lebanon", "Egypt"]),
+    "Egypt": CountryInfo("Egypt", Region.MIDDLE_EAST, 2, battleground=True, adjacent_countries=["Saudi Arabia", "Israel", "Sudan", "Libya"]),
+    "Libya": CountryInfo("Libya", Region.MIDDLE_EAST, 2, adjacent_countries=["Egypt", "Sudan", "Chad", "Tunisia", "Algeria"]),
+    
+    # Africa
+    "Morocco": CountryInfo("Morocco", Region.AFRICA, 3, adjacent_countries=["Spain/Portugal", "Algeria", "West African States"]),
+    "Algeria": CountryInfo("Algeria", Region.AFRICA, 2, battleground=True, adjacent_countries=["France", "Morocco", "Tunisia", "Libya", "West African States", "Saharan States"]),
+    "Tunisia": CountryInfo("Tunisia", Region.AFRICA, 2, adjacent_countries=["Algeria", "Libya"]),
+    "West African States": CountryInfo("West African States", Region.AFRICA, 2, adjacent_countries=["Morocco", "Algeria", "Saharan States", "Ivory Coast"]),
+    "Saharan States": CountryInfo("Saharan States", Region.AFRICA, 1, adjacent_countries=["Algeria", "Libya", "West African States", "Nigeria", "Chad"]),
+    "Ivory Coast": CountryInfo("Ivory Coast", Region.AFRICA, 2, adjacent_countries=["West African States", "Nigeria"]),
+    "Nigeria": CountryInfo("Nigeria", Region.AFRICA, 1, battleground=True, adjacent_countries=["Saharan States", "Ivory Coast", "Cameroon"]),
+    "Cameroon": CountryInfo("Cameroon", Region.AFRICA, 1, adjacent_countries=["Nigeria", "Chad", "Zaire"]),
+    "Chad": CountryInfo("Chad", Region.AFRICA, 1, adjacent_countries=["Libya", "Saharan States", "Nigeria", "Cameroon", "Sudan"]),
+    "Sudan": CountryInfo("Sudan", Region.AFRICA, 1, adjacent_countries=["Egypt", "Libya", "Chad", "Ethiopia", "Somalia", "Kenya"]),
+    "Ethiopia": CountryInfo("Ethiopia", Region.AFRICA, 1, adjacent_countries=["Sudan", "Somalia", "Kenya"]),
+    "Somalia": CountryInfo("Somalia", Region.AFRICA, 2, adjacent_countries=["Sudan", "Ethiopia", "Kenya"]),
+    "Kenya": CountryInfo("Kenya", Region.AFRICA, 2, adjacent_countries=["Sudan", "Ethiopia", "Somalia", "Southeast African States"]),
+    "Zaire": CountryInfo("Zaire", Region.AFRICA, 1, battleground=True, adjacent_countries=["Cameroon", "Angola", "Zimbabwe", "Southeast African States"]),
+    "Angola": CountryInfo("Angola", Region.AFRICA, 1, battleground=True, adjacent_countries=["Zaire", "Zimbabwe", "South Africa", "Botswana"]),
+    "Zimbabwe": CountryInfo("Zimbabwe", Region.AFRICA, 1, adjacent_countries=["Zaire", "Angola", "Botswana", "South Africa", "Southeast African States"]),
+    "Botswana": CountryInfo("Botswana", Region.AFRICA, 2, adjacent_countries=["Angola", "Zimbabwe", "South Africa"]),
+    "South Africa": CountryInfo("South Africa", Region.AFRICA, 3, battleground=True, adjacent_countries=["Angola", "Zimbabwe", "Botswana"]),
+    "Southeast African States": CountryInfo("Southeast African States", Region.AFRICA, 1, adjacent_countries=["Kenya", "Zaire", "Zimbabwe"]),
+    
+    # Central America
+    "USA": CountryInfo("USA", Region.CENTRAL_AMERICA, 6, battleground=True, adjacent_countries=["Canada", "Mexico", "Cuba"]),
+    "Mexico": CountryInfo("Mexico", Region.CENTRAL_AMERICA, 2, battleground=True, adjacent_countries=["USA", "Guatemala"]),
+    "Guatemala": CountryInfo("Guatemala", Region.CENTRAL_AMERICA, 1, adjacent_countries=["Mexico", "El Salvador", "Honduras", "Nicaragua"]),
+    "El Salvador": CountryInfo("El Salvador", Region.CENTRAL_AMERICA, 1, adjacent_countries=["Guatemala", "Honduras"]),
+    "Honduras": CountryInfo("Honduras", Region.CENTRAL_AMERICA, 2, adjacent_countries=["Guatemala", "El Salvador", "Nicaragua", "Costa Rica"]),
+    "Nicaragua": CountryInfo("Nicaragua", Region.CENTRAL_AMERICA, 1, adjacent_countries=["Guatemala", "Honduras", "Costa Rica"]),
+    "Costa Rica": CountryInfo("Costa Rica", Region.CENTRAL_AMERICA, 3, adjacent_countries=["Honduras", "Nicaragua", "Panama"]), 
+    "Panama": CountryInfo("Panama", Region.CENTRAL_AMERICA, 2, battleground=True, adjacent_countries=["Costa Rica", "Colombia"]),
+    "Cuba": CountryInfo("Cuba", Region.CENTRAL_AMERICA, 3, battleground=True, adjacent_countries=["USA", "Haiti", "Dominican Republic"]),
+    "Haiti": CountryInfo("Haiti", Region.CENTRAL_AMERICA, 1, adjacent_countries=["Cuba", "Dominican Republic"]),
+    "Dominican Republic": CountryInfo("Dominican Republic", Region.CENTRAL_AMERICA, 1, adjacent_countries=["Cuba", "Haiti"]),
+    
+    # South America
+    "Colombia": CountryInfo("Colombia", Region.SOUTH_AMERICA, 1, adjacent_countries=["Panama", "Venezuela", "Ecuador"]),
+    "Venezuela": CountryInfo("Venezuela", Region.SOUTH_AMERICA, 2, battleground=True, adjacent_countries=["Colombia", "Brazil", "Ecuador"]),
+    "Ecuador": CountryInfo("Ecuador", Region.SOUTH_AMERICA, 2, adjacent_countries=["Colombia", "Venezuela", "Peru"]),
+    "Peru": CountryInfo("Peru", Region.SOUTH_AMERICA, 2, adjacent_countries=["Ecuador", "Bolivia", "Brazil"]),
+    "Bolivia": CountryInfo("Bolivia", Region.SOUTH_AMERICA, 2, adjacent_countries=["Peru", "Paraguay", "Chile", "Argentina", "Brazil"]),
+    "Paraguay": CountryInfo("Paraguay", Region.SOUTH_AMERICA, 2, adjacent_countries=["Bolivia", "Brazil", "Argentina", "Uruguay"]),
+    "Uruguay": CountryInfo("Uruguay", Region.SOUTH_AMERICA, 2, adjacent_countries=["Paraguay", "Brazil", "Argentina"]),
+    "Brazil": CountryInfo("Brazil", Region.SOUTH_AMERICA, 2, battleground=True, adjacent_countries=["Venezuela", "Peru", "Bolivia", "Paraguay", "Uruguay", "Argentina"]),
+    "Argentina": CountryInfo("Argentina", Region.SOUTH_AMERICA, 2, battleground=True, adjacent_countries=["Bolivia", "Paraguay", "Uruguay", "Brazil", "Chile"]),
+    "Chile": CountryInfo("Chile", Region.SOUTH_AMERICA, 3, battleground=True, adjacent_countries=["Bolivia", "Argentina"]),
+}
+
+# -- static board tables, indexed by country index --
+
+COUNTRY_NAMES: Tuple[str, ...] = tuple(COUNTRY_INFO)
+COUNTRY_INDEX: Dict[str, int] = {name: i for i, name in enumerate(COUNTRY_NAMES)}
+N_COUNTRIES = len(COUNTRY_NAMES)
+
+# zobrist keys, index with country * INFLUENCE_VALUES + (influence & INFLUENCE_MASK)
+US_INFLUENCE_KEYS = zobrist_keys("us_influence", N_COUNTRIES * INFLUENCE_VALUES, INFLUENCE_VALUES)
+USSR_INFLUENCE_KEYS = zobrist_keys("ussr_influence", N_COUNTRIES * INFLUENCE_VALUES, INFLUENCE_VALUES)
+
+REGIONS: Tuple[Region, ...] = tuple(Region)
+REGION_INDEX: Dict[Region, int] = {region: i for i, region in enumerate(REGIONS)}
+
+COUNTRY_REGION = array("B", [REGION_INDEX[info.region] for info in COUNTRY_INFO.values()])
+COUNTRY_STABILITY = array("B", [info.stability for info in COUNTRY_INFO.values()])
+COUNTRY_BATTLEGROUND = array("B", [info.battleground for info in COUNTRY_INFO.values()])
+
+# adjacency in CSR form: neighbours of country i are ADJ_INDICES[ADJ_OFFSETS[i]:ADJ_OFFSETS[i + 1]]
+ADJ_OFFSETS = array("H", [0])
+ADJ_INDICES = array("H")
+for _info in COUNTRY_INFO.values():
+    ADJ_INDICES.extend(COUNTRY_INDEX[a] for a in _info.adjacent_countries)
+    ADJ_OFFSETS.append(len(ADJ_INDICES))
+del _info
+
+
+def adjacent_indices(index:int) -> array:
+    """Get the indices of the countries adjacent to a country."""
+    return ADJ_INDICES[ADJ_OFFSETS[index]:ADJ_OFFSETS[index + 1]]
+
+
+# reverse adjacency in CSR form: the countries whose access depends on influence in country j,
+# which is j itself plus every country that lists j as adjacent
+_dependents: List[List[int]] = [[j] for j in range(N_COUNTRIES)]
+for _i in range(N_COUNTRIES):
+    for _j in adjacent_indices(_i):
+        _dependents[_j].append(_i)
+ACCESS_OFFSETS = array("H", [0])
+ACCESS_INDICES = array("H")
+for _deps in _dependents:
+    ACCESS_INDICES.extend(_deps)
+    ACCESS_OFFSETS.append(len(ACCESS_INDICES))
+del _dependents, _deps, _i, _j
+
+# superpower home nodes give access to their neighbours but never take influence
+HOME_COUNTRY: Dict[Superpower, int] = {Superpower.USA: COUNTRY_INDEX["USA"], Superpower.USSR: COUNTRY_INDEX["USSR"]}
+PLACEABLE_MASK = ((1 << N_COUNTRIES) - 1) & ~sum(1 << i for i in HOME_COUNTRY.values())
+
+
+def _restricted_mask(defcon_level:int) -> int:
+    restricted = set()
+    if defcon_level < 5: restricted.add(Region.EUROPE)
+    if defcon_level < 4: restricted.add(Region.ASIA)
+    if defcon_level < 3: restricted.add(Region.MIDDLE_EAST)
+    return sum(1 << i for i in range(N_COUNTRIES) if REGIONS[COUNTRY_REGION[i]] in restricted)
+
+
+# countries closed to coups and realignments at each DEFCON level (index 0-5)
+DEFCON_RESTRICTED_MASK: Tuple[int, ...] = tuple(_restricted_mask(level) for level in range(6))
+
+
+# _byte_mask translation: influence byte -> 1 if positive (see also _CONTROL_BYTES)
+_POSITIVE_BYTES = bytes(1 if 0 < b < 128 else 0 for b in range(256))
+
+
+def _byte_mask(table:array, translation:bytes) -> int:
+    """Bitmask of the indices whose byte in table translates to 1."""
+    # one 0/1 byte per index, then each 8 bytes packed into 8 bits with a
+    # multiply instead of a python loop over the countries
+    flags = int.from_bytes(table.tobytes().translate(translation), "little")
+    mask = 0
+    shift = 0
+    while flags:
+        mask |= ((flags & 0xFFFFFFFFFFFFFFFF) * 0x0102040810204080 >> 56 & 0xFF) << shift
+        flags >>= 64
+        shift += 8
+    return mask
+
+
+def mask_indices(mask:int) -> Iterator[int]:
+    """Yield the country indices set in a bitmask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class Country:
+    """View of a single country on a Board.
+
+    Static data comes from the shared tables and influence is read from and
+    written to the board's arrays, so a view holds no state of its own.
+    """
+
+    __slots__ = ("board", "index")
+
+    def __init__(self, board:"Board", index:int):
+        self.board = board
+        self.index = index
+
+    def __repr__(self):
+        return f"Country({self.name!r}, us_influence={self.us_influence}, ussr_influence={self.ussr_influence})"
+
+    @property
+    def name(self) -> str:
+        return COUNTRY_NAMES[self.index]
+
+    @property
+    def region(self) -> Region:
+        return REGIONS[COUNTRY_REGION[self.index]]
+
+    @property
+    def stability(self) -> int:
+        return COUNTRY_STABILITY[self.index]
+
+    @property
+    def battleground(self) -> bool:
+        return bool(COUNTRY_BATTLEGROUND[self.index])
+
+    @property
+    def adjacent_countries(self) -> List[str]:
+        return [COUNTRY_NAMES[a] for a in adjacent_indices(self.index)]
+
+    @property
+    def us_influence(self) -> int:
+        return self.board.us_influence[self.index]
+
+    @us_influence.setter
+    def us_influence(self, value:int):
+        self.board.set_influence(self.index, value, self.ussr_influence)
+
+    @property
+    def ussr_influence(self) -> int:
+        return self.board.ussr_influence[self.index]
+
+    @ussr_influence.setter
+    def ussr_influence(self, value:int):
+        self.board.set_influence(self.index, self.us_influence, value)
+
     def _change_influence(self, usa_change:int, ussr_change:int):
-        self.us_influence += usa_change 
-        self.ussr_influence += ussr_change 
+        self.board.change_influence(self.index, usa_change, ussr_change)
 
     def to_dict(self) -> Dict[str, Any]:
         """Serialize the country to a JSON-compatible dictionary."""
@@ -51,31 +289,20 @@ class Country:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Country":
-        """Rehydrate a country instance from serialized data."""
-        return cls(
-            name=data["name"],
-            region=Region(data["region"]),
-            stability=data["stability"],
-            battleground=data.get("battleground", False),
-            adjacent_countries=list(data.get("adjacent_countries", [])),
-            us_influence=data.get("us_influence", 0),
-            ussr_influence=data.get("ussr_influence", 0),
-        )
+        """Rehydrate a country instance from serialized data.
+
+        Static fields come from the board tables; the view is backed by a
+        fresh board holding only this country's influence.
+        """
+        country = Board()[data["name"]]
+        country.us_influence = data.get("us_influence", 0)
+        country.ussr_influence = data.get("ussr_influence", 0)
+        return country
 
     @property
     def controlled_by(self) -> Optional[Superpower]:
         """Determine which superpower controls this country."""
-        if self.us_influence == 0 and self.ussr_influence == 0:
-            return None
-        
-        required_influence = self.stability + max(self.us_influence, self.ussr_influence)
-        
-        if self.us_influence >= required_influence and self.us_influence > self.ussr_influence:
-            return Superpower.USA
-        elif self.ussr_influence >= required_influence and self.ussr_influence > self.us_influence:
-            return Superpower.USSR
-        
-        return None
+        return self.board.controlled_by(self.index)
     
     @property 
     def has_us_influence(self):
@@ -103,13 +330,7 @@ class Country:
 
     # for using ops, not event triggered
     def _has_access(self, player:Superpower):
-        if self._has_influence(player):
-            return True 
-        for a in self.adjacent_countries:
-            adj_country = COUNTRIES[a]
-            if adj_country._has_influence(player):
-                return True 
-        return False 
+        return self.board.has_access(self.index, player)
     # get influence cost 
     def influence_cost(self, player:Superpower):
         opp_controlled = self.us_control if player == Superpower.USSR else self.ussr_control 
@@ -130,144 +351,342 @@ class Country:
         if defcon_level < 3 and self.region == Region.MIDDLE_EAST: return True 
         return False  
 
-# TODO Fix this shit 
-COUNTRIES: Dict[str, Country] = {
-    # Europe
-    "Canada": Country("Canada", Region.EUROPE, 4, battleground=True, adjacent_countries=["USA"]),
-    "UK": Country("UK", Region.EUROPE, 5, battleground=True, adjacent_countries=["Norway", "Benelux", "France"]),
-    "Norway": Country("Norway", Region.EUROPE, 4, adjacent_countries=["UK", "Sweden", "Finland"]),
-    "Sweden": Country("Sweden", Region.EUROPE, 4, adjacent_countries=["Norway", "Finland", "Denmark"]),
-    "Finland": Country("Finland", Region.EUROPE, 4, adjacent_countries=["Norway", "Sweden", "USSR"]),
-    "Denmark": Country("Denmark", Region.EUROPE, 3, adjacent_countries=["Sweden", "West Germany", "Benelux"]),
-    "Benelux": Country("Benelux", Region.EUROPE, 3, adjacent_countries=["UK", "Denmark", "West Germany", "France"]),
-    "France": Country("France", Region.EUROPE, 3, battleground=True, adjacent_countries=["UK", "Benelux", "West Germany", "Spain/Portugal", "Italy", "Algeria"]),
-    "Spain/Portugal": Country("Spain/Portugal", Region.EUROPE, 2, adjacent_countries=["France", "Italy", "Morocco"]),
-    "Italy": Country("Italy", Region.EUROPE, 2, battleground=True, adjacent_countries=["France", "Spain/Portugal", "West Germany", "Austria", "Yugoslavia", "Greece"]),
-    "West Germany": Country("West Germany", Region.EUROPE, 4, battleground=True, adjacent_countries=["Benelux", "Denmark", "France", "Italy", "Austria", "East Germany"]),
-    "East Germany": Country("East Germany", Region.EUROPE, 3, battleground=True, adjacent_countries=["West Germany", "Austria", "Czechoslovakia", "Poland"]),
-    "Austria": Country("Austria", Region.EUROPE, 4, adjacent_countries=["Italy", "West Germany", "East Germany", "Czechoslovakia", "Hungary"]),
-    "Czechoslovakia": Country("Czechoslovakia", Region.EUROPE, 3, adjacent_countries=["East Germany", "Austria", "Hungary", "Poland"]),
-    "Hungary": Country("Hungary", Region.EUROPE, 3, adjacent_countries=["Austria", "Czechoslovakia", "Romania", "Yugoslavia"]),
-    "Poland": Country("Poland", Region.EUROPE, 3, battleground=True, adjacent_countries=["East Germany", "Czechoslovakia", "USSR"]),
-    "Yugoslavia": Country("Yugoslavia", Region.EUROPE, 3, adjacent_countries=["Italy", "Hungary", "Romania", "Bulgaria", "Greece"]),
-    "Romania": Country("Romania", Region.EUROPE, 3, adjacent_countries=["Hungary", "Yugoslavia", "Bulgaria", "Turkey", "USSR"]),
-    "Bulgaria": Country("Bulgaria", Region.EUROPE, 3, adjacent_countries=["Yugoslavia", "Romania", "Greece", "Turkey"]),
-    "Greece": Country("Greece", Region.EUROPE, 2, adjacent_countries=["Italy", "Yugoslavia", "Bulgaria", "Turkey"]),
-    "Turkey": Country("Turkey", Region.EUROPE, 2, battleground=True, adjacent_countries=["Bulgaria", "Greece", "Romania", "Syria", "Lebanon", "Israel"]),
-    
-    # Asia  
-    "USSR": Country("USSR", Region.ASIA, 6, battleground=True, adjacent_countries=["Finland", "Poland", "Romania", "Afghanistan", "China", "Mongolia", "North Korea"]),
-    "China": Country("China", Region.ASIA, 5, battleground=True, adjacent_countries=["USSR", "Mongolia", "North Korea", "South Korea", "Japan", "Laos/Cambodia", "Vietnam", "Myanmar", "India", "Pakistan", "Afghanistan"]),
-    "Mongolia": Country("Mongolia", Region.ASIA, 4, adjacent_countries=["USSR", "China"]),
-    "North Korea": Country("North Korea", Region.ASIA, 3, battleground=True, adjacent_countries=["USSR", "China", "South Korea"]),
-    "South Korea": Country("South Korea", Region.ASIA, 3, battleground=True, adjacent_countries=["China", "North Korea", "Japan"]),
-    "Japan": Country("Japan", Region.ASIA, 4, battleground=True, adjacent_countries=["China", "South Korea", "Philippines", "Taiwan"]),
-    "Taiwan": Country("Taiwan", Region.ASIA, 3, adjacent_countries=["Japan", "Philippines", "South Korea"]),
-    "Philippines": Country("Philippines", Region.ASIA, 2, adjacent_countries=["Japan", "Taiwan", "Malaysia", "Indonesia", "Australia"]),
-    "Australia": Country("Australia", Region.ASIA, 4, adjacent_countries=["Philippines", "Indonesia"]),
-    "Indonesia": Country("Indonesia", Region.ASIA, 1, adjacent_countries=["Philippines", "Australia", "Malaysia"]),
-    "Malaysia": Country("Malaysia", Region.ASIA, 2, adjacent_countries=["Philippines", "Indonesia", "Thailand"]),
-    "Thailand": Country("Thailand", Region.ASIA, 2, battleground=True, adjacent_countries=["Malaysia", "Myanmar", "Laos/Cambodia", "Vietnam"]),
-    "Laos/Cambodia": Country("Laos/Cambodia", Region.ASIA, 1, adjacent_countries=["China", "Thailand", "Vietnam"]),
-    "Vietnam": Country("Vietnam", Region.ASIA, 1, adjacent_countries=["China", "Thailand", "Laos/Cambodia"]),
-    "Myanmar": Country("Myanmar", Region.ASIA, 2, adjacent_countries=["China", "Thailand", "India", "Bangladesh"]),
-    "India": Country("India", Region.ASIA, 3, battleground=True, adjacent_countries=["China", "Myanmar", "Bangladesh", "Pakistan"]),
-    "Bangladesh": Country("Bangladesh", Region.ASIA, 2, adjacent_countries=["Myanmar", "India"]),
-    "Pakistan": Country("Pakistan", Region.ASIA, 2, battleground=True, adjacent_countries=["China", "India", "Afghanistan", "Iran"]),
-    "Afghanistan": Country("Afghanistan", Region.ASIA, 2, adjacent_countries=["USSR", "China", "Pakistan", "Iran"]),
-    
-    # Middle East
-    "Iran": Country("Iran", Region.MIDDLE_EAST, 2, battleground=True, adjacent_countries=["Pakistan", "Afghanistan", "Iraq", "Gulf States", "Saudi Arabia"]),
-    "Iraq": Country("Iraq", Region.MIDDLE_EAST, 3, battleground=True, adjacent_countries=["Iran", "Gulf States", "Saudi Arabia", "Jordan", "Syria", "Turkey"]),
-    "Gulf States": Country("Gulf States", Region.MIDDLE_EAST, 3, adjacent_countries=["Iran", "Iraq", "Saudi Arabia"]),
-    "Saudi Arabia": Country("Saudi Arabia", Region.MIDDLE_EAST, 3, battleground=True, adjacent_countries=["Iran", "Iraq", "Gulf States", "Jordan", "Egypt"]),
-    "Jordan": Country("Jordan", Region.MIDDLE_EAST, 2, adjacent_countries=["Iraq", "Saudi Arabia", "Israel", "Syria", "Lebanon"]),
-    "Syria": Country("Syria", Region.MIDDLE_EAST, 2, adjacent_countries=["Turkey", "Iraq", "Jordan", "Lebanon", "Israel"]),
-    "Lebanon": Country("Lebanon", Region.MIDDLE_EAST, 1, adjacent_countries=["Turkey", "Jordan", "Syria", "Israel"]),
-    "Israel": Country("Israel", Region.MIDDLE_EAST, 4, battleground=True, adjacent_countries=["Turkey", "Jordan", "Syria", "Lebanon", "Egypt"]),
-    "Egypt": Country("Egypt", Region.MIDDLE_EAST, 2, battleground=True, adjacent_countries=["Saudi Arabia", "Israel", "Sudan", "Libya"]),
-    "Libya": Country("Libya", Region.MIDDLE_EAST, 2, adjacent_countries=["Egypt", "Sudan", "Chad", "Tunisia", "Algeria"]),
-    
-    # Africa
-    "Morocco": Country("Morocco", Region.AFRICA, 3, adjacent_countries=["Spain/Portugal", "Algeria", "West African States"]),
-    "Algeria": Country("Algeria", Region.AFRICA, 2, battleground=True, adjacent_countries=["France", "Morocco", "Tunisia", "Libya", "West African States", "Saharan States"]),
-    "Tunisia": Country("Tunisia", Region.AFRICA, 2, adjacent_countries=["Algeria", "Libya"]),
-    "West African States": Country("West African States", Region.AFRICA, 2, adjacent_countries=["Morocco", "Algeria", "Saharan States", "Ivory Coast"]),
-    "Saharan States": Country("Saharan States", Region.AFRICA, 1, adjacent_countries=["Algeria", "Libya", "West African States", "Nigeria", "Chad"]),
-    "Ivory Coast": Country("Ivory Coast", Region.AFRICA, 2, adjacent_countries=["West African States", "Nigeria"]),
-    "Nigeria": Country("Nigeria", Region.AFRICA, 1, battleground=True, adjacent_countries=["Saharan States", "Ivory Coast", "Cameroon"]),
-    "Cameroon": Country("Cameroon", Region.AFRICA, 1, adjacent_countries=["Nigeria", "Chad", "Zaire"]),
-    "Chad": Country("Chad", Region.AFRICA, 1, adjacent_countries=["Libya", "Saharan States", "Nigeria", "Cameroon", "Sudan"]),
-    "Sudan": Country("Sudan", Region.AFRICA, 1, adjacent_countries=["Egypt", "Libya", "Chad", "Ethiopia", "Somalia", "Kenya"]),
-    "Ethiopia": Country("Ethiopia", Region.AFRICA, 1, adjacent_countries=["Sudan", "Somalia", "Kenya"]),
-    "Somalia": Country("Somalia", Region.AFRICA, 2, adjacent_countries=["Sudan", "Ethiopia", "Kenya"]),
-    "Kenya": Country("Kenya", Region.AFRICA, 2, adjacent_countries=["Sudan", "Ethiopia", "Somalia", "Southeast African States"]),
-    "Zaire": Country("Zaire", Region.AFRICA, 1, battleground=True, adjacent_countries=["Cameroon", "Angola", "Zimbabwe", "Southeast African States"]),
-    "Angola": Country("Angola", Region.AFRICA, 1, battleground=True, adjacent_countries=["Zaire", "Zimbabwe", "South Africa", "Botswana"]),
-    "Zimbabwe": Country("Zimbabwe", Region.AFRICA, 1, adjacent_countries=["Zaire", "Angola", "Botswana", "South Africa", "Southeast African States"]),
-    "Botswana": Country("Botswana", Region.AFRICA, 2, adjacent_countries=["Angola", "Zimbabwe", "South Africa"]),
-    "South Africa": Country("South Africa", Region.AFRICA, 3, battleground=True, adjacent_countries=["Angola", "Zimbabwe", "Botswana"]),
-    "Southeast African States": Country("Southeast African States", Region.AFRICA, 1, adjacent_countries=["Kenya", "Zaire", "Zimbabwe"]),
-    
-    # Central America
-    "USA": Country("USA", Region.CENTRAL_AMERICA, 6, battleground=True, adjacent_countries=["Canada", "Mexico", "Cuba"]),
-    "Mexico": Country("Mexico", Region.CENTRAL_AMERICA, 2, battleground=True, adjacent_countries=["USA", "Guatemala"]),
-    "Guatemala": Country("Guatemala", Region.CENTRAL_AMERICA, 1, adjacent_countries=["Mexico", "El Salvador", "Honduras", "Nicaragua"]),
-    "El Salvador": Country("El Salvador", Region.CENTRAL_AMERICA, 1, adjacent_countries=["Guatemala", "Honduras"]),
-    "Honduras": Country("Honduras", Region.CENTRAL_AMERICA, 2, adjacent_countries=["Guatemala", "El Salvador", "Nicaragua", "Costa Rica"]),
-    "Nicaragua": Country("Nicaragua", Region.CENTRAL_AMERICA, 1, adjacent_countries=["Guatemala", "Honduras", "Costa Rica"]),
-    "Costa Rica": Country("Costa Rica", Region.CENTRAL_AMERICA, 3, adjacent_countries=["Honduras", "Nicaragua", "Panama"]), 
-    "Panama": Country("Panama", Region.CENTRAL_AMERICA, 2, battleground=True, adjacent_countries=["Costa Rica", "Colombia"]),
-    "Cuba": Country("Cuba", Region.CENTRAL_AMERICA, 3, battleground=True, adjacent_countries=["USA", "Haiti", "Dominican Republic"]),
-    "Haiti": Country("Haiti", Region.CENTRAL_AMERICA, 1, adjacent_countries=["Cuba", "Dominican Republic"]),
-    "Dominican Republic": Country("Dominican Republic", Region.CENTRAL_AMERICA, 1, adjacent_countries=["Cuba", "Haiti"]),
-    
-    # South America
-    "Colombia": Country("Colombia", Region.SOUTH_AMERICA, 1, adjacent_countries=["Panama", "Venezuela", "Ecuador"]),
-    "Venezuela": Country("Venezuela", Region.SOUTH_AMERICA, 2, battleground=True, adjacent_countries=["Colombia", "Brazil", "Ecuador"]),
-    "Ecuador": Country("Ecuador", Region.SOUTH_AMERICA, 2, adjacent_countries=["Colombia", "Venezuela", "Peru"]),
-    "Peru": Country("Peru", Region.SOUTH_AMERICA, 2, adjacent_countries=["Ecuador", "Bolivia", "Brazil"]),
-    "Bolivia": Country("Bolivia", Region.SOUTH_AMERICA, 2, adjacent_countries=["Peru", "Paraguay", "Chile", "Argentina", "Brazil"]),
-    "Paraguay": Country("Paraguay", Region.SOUTH_AMERICA, 2, adjacent_countries=["Bolivia", "Brazil", "Argentina", "Uruguay"]),
-    "Uruguay": Country("Uruguay", Region.SOUTH_AMERICA, 2, adjacent_countries=["Paraguay", "Brazil", "Argentina"]),
-    "Brazil": Country("Brazil", Region.SOUTH_AMERICA, 2, battleground=True, adjacent_countries=["Venezuela", "Peru", "Bolivia", "Paraguay", "Uruguay", "Argentina"]),
-    "Argentina": Country("Argentina", Region.SOUTH_AMERICA, 2, battleground=True, adjacent_countries=["Bolivia", "Paraguay", "Uruguay", "Brazil", "Chile"]),
-    "Chile": Country("Chile", Region.SOUTH_AMERICA, 3, battleground=True, adjacent_countries=["Bolivia", "Argentina"]),
+
+# control codes stored in Board.control
+NO_CONTROL, US_CONTROL, USSR_CONTROL = 0, 1, 2
+_CONTROL_BYTES: Dict[Superpower, bytes] = {
+    Superpower.USA: bytes(b == US_CONTROL for b in range(256)),
+    Superpower.USSR: bytes(b == USSR_CONTROL for b in range(256)),
+}
+CONTROL_SIDES: Tuple[Optional[Superpower], ...] = (None, Superpower.USA, Superpower.USSR)
+
+# superpower home nodes are on the map for adjacency but are not scored
+REGION_TOTALS: Tuple[Tuple[int, int], ...] = tuple(
+    (sum(1 for i in range(N_COUNTRIES) if COUNTRY_REGION[i] == r and PLACEABLE_MASK >> i & 1),
+     sum(1 for i in range(N_COUNTRIES) if COUNTRY_REGION[i] == r and PLACEABLE_MASK >> i & 1 and COUNTRY_BATTLEGROUND[i]))
+    for r in range(len(REGIONS))
+)
+
+
+class Board(Mapping):
+    """Per-game influence store.
+
+    Influence is held in two parallel int8 arrays indexed by country index.
+    The board is also a read-only mapping of country name to Country view,
+    so it can stand in for the old dict of countries.
+
+    Control of every country and the per-region control counts are kept up
+    to date on each write, so control checks and region scoring never
+    rescan the map.
+
+    Each side also keeps its access frontier: a count per country of
+    influenced countries in its neighbourhood (home nodes count as always
+    influenced for their owner) and a bitmask of countries where that
+    count is non-zero. Both only change when influence goes from zero to
+    non-zero or back.
+
+    Boards forked with copy_on_write share their arrays until one side
+    writes, so all writes must go through the board (or a Country view).
+
+    Influence changes made inside a transaction() are journaled and undone
+    when the transaction exits without commit(), so speculative placements
+    need no copy of the board.
+
+    hash is the zobrist hash of the influence on the board, updated with
+    every change; an empty board hashes to 0.
+    """
+
+    __slots__ = ("us_influence", "ussr_influence", "control", "region_counts",
+                 "us_access", "ussr_access", "us_frontier", "ussr_frontier", "hash",
+                 "_shared", "_journal", "_depth")
+
+    def __init__(self):
+        self.us_influence = array("b", bytes(N_COUNTRIES))
+        self.ussr_influence = array("b", bytes(N_COUNTRIES))
+        self.control = array("b", bytes(N_COUNTRIES))
+        self.region_counts = array("H", [0]) * (4 * len(REGIONS))
+        self.us_access = _HOME_ACCESS[Superpower.USA][:]
+        self.ussr_access = _HOME_ACCESS[Superpower.USSR][:]
+        self.us_frontier = _HOME_FRONTIER[Superpower.USA]
+        self.ussr_frontier = _HOME_FRONTIER[Superpower.USSR]
+        self.hash = 0
+        self._shared = False
+        self._journal = None
+        self._depth = 0
+
+    def fork(self, copy_on_write:bool = False) -> "Board":
+        """Copy the board, or share its arrays until the next write."""
+        board = Board.__new__(Board)
+        if copy_on_write:
+            board.us_influence = self.us_influence
+            board.ussr_influence = self.ussr_influence
+            board.control = self.control
+            board.region_counts = self.region_counts
+            board.us_access = self.us_access
+            board.ussr_access = self.ussr_access
+            board._shared = self._shared = True
+        else:
+            board.us_influence = self.us_influence[:]
+            board.ussr_influence = self.ussr_influence[:]
+            board.control = self.control[:]
+            board.region_counts = self.region_counts[:]
+            board.us_access = self.us_access[:]
+            board.ussr_access = self.ussr_access[:]
+            board._shared = False
+        board.us_frontier = self.us_frontier
+        board.ussr_frontier = self.ussr_frontier
+        board.hash = self.hash
+        board._journal = None
+        board._depth = 0
+        return board
+
+    def copy_from(self, other:"Board"):
+        """Overwrite this board with other, reusing this board's arrays."""
+        if self._shared:
+            self.us_influence = other.us_influence[:]
+            self.ussr_influence = other.ussr_influence[:]
+            self.control = other.control[:]
+            self.region_counts = other.region_counts[:]
+            self.us_access = other.us_access[:]
+            self.ussr_access = other.ussr_access[:]
+            self._shared = False
+        else:
+            self.us_influence[:] = other.us_influence
+            self.ussr_influence[:] = other.ussr_influence
+            self.control[:] = other.control
+            self.region_counts[:] = other.region_counts
+            self.us_access[:] = other.us_access
+            self.ussr_access[:] = other.ussr_access
+        self.us_frontier = other.us_frontier
+        self.ussr_frontier = other.ussr_frontier
+        self.hash = other.hash
+        self._journal = None
+        self._depth = 0
+
+    def _own(self):
+        # take private copies of shared arrays before the first write
+        if self._shared:
+            self.us_influence = self.us_influence[:]
+            self.ussr_influence = self.ussr_influence[:]
+            self.control = self.control[:]
+            self.region_counts = self.region_counts[:]
+            self.us_access = self.us_access[:]
+            self.ussr_access = self.ussr_access[:]
+            self._shared = False
+
+    def __getitem__(self, name:str) -> Country:
+        return Country(self, COUNTRY_INDEX[name])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(COUNTRY_NAMES)
+
+    def __len__(self) -> int:
+        return N_COUNTRIES
+
+    def __contains__(self, name) -> bool:
+        return name in COUNTRY_INDEX
+
+    def country(self, index:int) -> Country:
+        return Country(self, index)
+
+    def set_influence(self, index:int, us_influence:int, ussr_influence:int):
+        self.change_influence(index, us_influence - self.us_influence[index], ussr_influence - self.ussr_influence[index])
+
+    def change_influence(self, index:int, usa_change:int, ussr_change:int):
+        if self._journal is not None:
+            self._journal.append((index, usa_change, ussr_change))
+        self._apply(index, usa_change, ussr_change)
+
+    def _apply(self, index:int, usa_change:int, ussr_change:int):
+        self._own()
+        key = index * INFLUENCE_VALUES
+        if usa_change:
+            old = self.us_influence[index]
+            self.us_influence[index] = new = old + usa_change
+            self.hash ^= US_INFLUENCE_KEYS[key + (old & INFLUENCE_MASK)] ^ US_INFLUENCE_KEYS[key + (new & INFLUENCE_MASK)]
+            if (old > 0) != (new > 0):
+                self.us_frontier = _update_access(self.us_access, self.us_frontier, index, 1 if new > 0 else -1)
+        if ussr_change:
+            old = self.ussr_influence[index]
+            self.ussr_influence[index] = new = old + ussr_change
+            self.hash ^= USSR_INFLUENCE_KEYS[key + (old & INFLUENCE_MASK)] ^ USSR_INFLUENCE_KEYS[key + (new & INFLUENCE_MASK)]
+            if (old > 0) != (new > 0):
+                self.ussr_frontier = _update_access(self.ussr_access, self.ussr_frontier, index, 1 if new > 0 else -1)
+        self._update_control(index)
+
+    # -- transactions --
+
+    def transaction(self) -> "BoardTransaction":
+        """Open a (possibly nested) transaction over influence changes."""
+        if self._journal is None:
+            self._journal = []
+        self._depth += 1
+        return BoardTransaction(self, len(self._journal))
+
+    def _rollback(self, mark:int):
+        journal = self._journal
+        while len(journal) > mark:
+            index, usa_change, ussr_change = journal.pop()
+            self._apply(index, -usa_change, -ussr_change)
+
+    def _close(self):
+        self._depth -= 1
+        if self._depth == 0:
+            self._journal = None
+
+    def _update_control(self, index:int):
+        margin = self.us_influence[index] - self.ussr_influence[index]
+        stability = COUNTRY_STABILITY[index]
+        if margin >= stability:
+            new = US_CONTROL
+        elif -margin >= stability:
+            new = USSR_CONTROL
+        else:
+            new = NO_CONTROL
+        old = self.control[index]
+        if new == old:
+            return
+        self.control[index] = new
+        base = 4 * COUNTRY_REGION[index]
+        battleground = COUNTRY_BATTLEGROUND[index]
+        if old:
+            self.region_counts[base + old - 1] -= 1
+            if battleground:
+                self.region_counts[base + old + 1] -= 1
+        if new:
+            self.region_counts[base + new - 1] += 1
+            if battleground:
+                self.region_counts[base + new + 1] += 1
+
+    def controlled_by(self, index:int) -> Optional[Superpower]:
+        """Determine which superpower controls a country."""
+        return CONTROL_SIDES[self.control[index]]
+
+    def access_mask(self, player:Superpower) -> int:
+        """Bitmask of the countries where a player can place influence with ops."""
+        return (self.us_frontier if player == Superpower.USA else self.ussr_frontier) & PLACEABLE_MASK
+
+    def has_access(self, index:int, player:Superpower) -> bool:
+        return bool(self.access_mask(player) >> index & 1)
+
+    def influence_cost(self, index:int, player:Superpower) -> int:
+        """Ops to place one influence: 2 in a country the opponent controls (see Country.influence_cost)."""
+        return 2 if self.control[index] == (USSR_CONTROL if player == Superpower.USA else US_CONTROL) else 1
+
+    def controlled_mask(self, player:Superpower) -> int:
+        """Bitmask of the countries a player controls."""
+        return _byte_mask(self.control, _CONTROL_BYTES[player])
+
+    def cheap_mask(self, mask:int, player:Superpower) -> int:
+        """The countries in mask where one influence costs a single op."""
+        return mask & ~self.controlled_mask(Superpower.USSR if player == Superpower.USA else Superpower.USA)
+
+    def coup_mask(self, defcon_level:int, player:Superpower) -> int:
+        """Bitmask of the countries a player may coup or realign (see Country.can_coup_or_realign)."""
+        opp = self.ussr_influence if player == Superpower.USA else self.us_influence
+        return _byte_mask(opp, _POSITIVE_BYTES) & ~DEFCON_RESTRICTED_MASK[max(0, min(defcon_level, 5))]
+
+    def region_control(self, region:Region) -> Tuple[int, int, int, int]:
+        """Get (us_countries, ussr_countries, us_battlegrounds, ussr_battlegrounds) for a region."""
+        base = 4 * REGION_INDEX[region]
+        return tuple(self.region_counts[base:base + 4])
+
+
+class BoardTransaction:
+    """Undo scope for influence changes on a Board.
+
+    Used as a context manager: changes are rolled back on exit unless
+    commit() was called. Committing a nested transaction hands its changes
+    to the enclosing one.
+    """
+
+    __slots__ = ("board", "mark", "closed")
+
+    def __init__(self, board:Board, mark:int):
+        self.board = board
+        self.mark = mark
+        self.closed = False
+
+    def __enter__(self) -> "BoardTransaction":
+        return self
+
+    def __exit__(self, *exc_info):
+        if not self.closed:
+            self.rollback()
+
+    def commit(self):
+        self.closed = True
+        self.board._close()
+
+    def rollback(self):
+        self.closed = True
+        self.board._rollback(self.mark)
+        self.board._close()
+
+
+def _update_access(access:array, frontier:int, index:int, delta:int) -> int:
+    # influence in country index appeared (delta=1) or vanished (delta=-1) for one side
+    for i in ACCESS_INDICES[ACCESS_OFFSETS[index]:ACCESS_OFFSETS[index + 1]]:
+        access[i] += delta
+        if delta > 0 and access[i] == 1:
+            frontier |= 1 << i
+        elif delta < 0 and access[i] == 0:
+            frontier &= ~(1 << i)
+    return frontier
+
+
+def _home_access(player:Superpower):
+    access = array("B", bytes(N_COUNTRIES))
+    return access, _update_access(access, 0, HOME_COUNTRY[player], 1)
+
+
+_HOME_ACCESS: Dict[Superpower, array] = {}
+_HOME_FRONTIER: Dict[Superpower, int] = {}
+for _player in Superpower:
+    _HOME_ACCESS[_player], _HOME_FRONTIER[_player] = _home_access(_player)
+del _player
+
+
+# zero-influence template board, kept for callers that want static country data by name
+TEMPLATE_BOARD = Board()
+COUNTRIES: Dict[str, Country] = dict(TEMPLATE_BOARD.items())
+
+
+# static lookups on the template board, built once
+_COUNTRIES_BY_REGION: Dict[Region, Tuple[Country, ...]] = {
+    region: tuple(country for country in COUNTRIES.values() if country.region == region) for region in REGIONS
 }
+_BATTLEGROUND_COUNTRIES: Tuple[Country, ...] = tuple(country for country in COUNTRIES.values() if country.battleground)
 
 
-def get_countries_by_region(region: Region) -> List[Country]:
+def get_countries_by_region(region: Region) -> Tuple[Country, ...]:
     """Get all countries in a specific region."""
-    return [country for country in COUNTRIES.values() if country.region == region]
+    return _COUNTRIES_BY_REGION[region]
 
 
-def get_battleground_countries() -> List[Country]:
+def get_battleground_countries() -> Tuple[Country, ...]:
     """Get all battleground countries."""
-    return [country for country in COUNTRIES.values() if country.battleground]
+    return _BATTLEGROUND_COUNTRIES
 
 
-def get_controlled_countries(superpower: Superpower) -> List[Country]:
-    """Get all countries controlled by a superpower."""
-    return [country for country in COUNTRIES.values() if country.controlled_by == superpower]
+def get_controlled_countries(superpower: Superpower, board:Board) -> List[Country]:
+    """Get all countries controlled by a superpower on board."""
+    control = US_CONTROL if superpower == Superpower.USA else USSR_CONTROL
+    return [board.country(i) for i in range(N_COUNTRIES) if board.control[i] == control]
 
 
-def calculate_region_control(region: Region) -> Dict[str, int]:
-    """Calculate regional control scoring for a region."""
-    countries = get_countries_by_region(region)
-    battlegrounds = [c for c in countries if c.battleground]
-    
-    us_controlled = sum(1 for c in countries if c.us_control)
-    ussr_controlled = sum(1 for c in countries if c.ussr_control)
-    us_battlegrounds = sum(1 for c in battlegrounds if c.us_control)
-    ussr_battlegrounds = sum(1 for c in battlegrounds if c.ussr_control)
+def calculate_region_control(region: Region, board:Board) -> Dict[str, int]:
+    """Calculate regional control scoring for a region from a board's running counts."""
+    us_controlled, ussr_controlled, us_battlegrounds, ussr_battlegrounds = board.region_control(region)
+    total_countries, total_battlegrounds = REGION_TOTALS[REGION_INDEX[region]]
     
     return {
         "us_countries": us_controlled,
         "ussr_countries": ussr_controlled,
         "us_battlegrounds": us_battlegrounds,
         "ussr_battlegrounds": ussr_battlegrounds,
-        "total_countries": len(countries),
-        "total_battlegrounds": len(battlegrounds)
+        "total_countries": total_countries,
+        "total_battlegrounds": total_battlegrounds
     }
 
 # utility for influence change 
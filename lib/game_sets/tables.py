@@ -0,0 +1,68 @@
+"""Frozen rules tables, computed once at import.
+
+Everything here is derived from COUNTRY_INFO, CARDS and the space race
+squares and never changes during a game, so hot paths can index into
+these instead of scanning the dicts. All tables are tuples, bytes or
+ints (bitmasks over country or card indices). Where cards.py, countries.py
+or space_race.py already hold a column (ERA_CARDS, CARD_OPS, the space
+race squares) the table is built from it rather than from the raw data,
+so the two can never disagree.
+
+    REGION_COUNTRIES[r]         country indices in REGIONS[r]
+    REGION_MASKS[r]             the same as a bitmask
+    REGION_BATTLEGROUNDS[r]     battleground indices in REGIONS[r]
+    BATTLEGROUND_INDICES        every battleground country
+    BATTLEGROUND_MASK           the same as a bitmask
+    NEIGHBOURS[i]               adjacent country indices of country i
+    NEIGHBOUR_MASKS[i]          the same as a bitmask
+    ADJACENCY                   flat N_COUNTRIES x N_COUNTRIES 0/1 matrix, ADJACENCY[i * N_COUNTRIES + j]
+    ERA_CARD_IDS[e]             card ids of ERAS[e]
+    SCORING_CARD_IDS            scoring cards
+    EVENT_CARD_IDS              event (non scoring) cards
+    SIDE_CARD_IDS[s]            card ids of SIDES[s]
+    CARD_OPS_TABLE              ops value by card id
+    SPACE_OPS_REQUIRED          minimum card ops per space race square
+    SPACE_ROLL_MAX              highest successful roll per square
+    SPACE_VPS                   (first, second) vps per square
+"""
+
+from typing import Tuple
+
+from ..state_managers.space_race import SPACE_OPS_REQUIRED, SPACE_ROLL_MAX, SPACE_VPS, N_SPACE_SQUARES
+from .cards import CARD_OPS, CARD_SCORING, CARD_SIDE, ERA_CARDS, ERAS, N_CARDS, SIDES
+from .countries import ADJ_INDICES, ADJ_OFFSETS, COUNTRY_BATTLEGROUND, COUNTRY_REGION, N_COUNTRIES, REGIONS
+
+
+def _mask(indices) -> int:
+    mask = 0
+    for i in indices:
+        mask |= 1 << i
+    return mask
+
+
+REGION_COUNTRIES: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(i for i in range(N_COUNTRIES) if COUNTRY_REGION[i] == r) for r in range(len(REGIONS))
+)
+REGION_MASKS: Tuple[int, ...] = tuple(_mask(indices) for indices in REGION_COUNTRIES)
+REGION_BATTLEGROUNDS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(i for i in indices if COUNTRY_BATTLEGROUND[i]) for indices in REGION_COUNTRIES
+)
+BATTLEGROUND_INDICES: Tuple[int, ...] = tuple(i for i in range(N_COUNTRIES) if COUNTRY_BATTLEGROUND[i])
+BATTLEGROUND_MASK: int = _mask(BATTLEGROUND_INDICES)
+
+NEIGHBOURS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(ADJ_INDICES[ADJ_OFFSETS[i]:ADJ_OFFSETS[i + 1]]) for i in range(N_COUNTRIES)
+)
+NEIGHBOUR_MASKS: Tuple[int, ...] = tuple(_mask(neighbours) for neighbours in NEIGHBOURS)
+ADJACENCY: bytes = bytes(
+    1 if j in neighbours else 0 for neighbours in map(frozenset, NEIGHBOURS) for j in range(N_COUNTRIES)
+)
+
+ERA_CARD_IDS: Tuple[Tuple[int, ...], ...] = tuple(ERA_CARDS[era] for era in ERAS)
+SCORING_CARD_IDS: Tuple[int, ...] = tuple(card for card in range(N_CARDS) if CARD_SCORING[card])
+EVENT_CARD_IDS: Tuple[int, ...] = tuple(card for card in range(N_CARDS) if not CARD_SCORING[card])
+SIDE_CARD_IDS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(card for card in range(N_CARDS) if CARD_SIDE[card] == s) for s in range(len(SIDES))
+)
+# a frozen copy of cards.CARD_OPS
+CARD_OPS_TABLE: bytes = bytes(CARD_OPS)
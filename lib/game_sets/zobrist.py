@@ -0,0 +1,75 @@
+"""Zobrist key tables for hashing game states.
+
+A state's hash is the XOR of one 64-bit key per (feature, value) it has.
+Changing a feature XORs its old key out and its new key in, so the board,
+deck and space race keep their part of the hash up to date as they change
+and GameState.zobrist_hash only folds in the handful of scalars.
+
+Keys for the starting value of each feature (no influence, card not in the
+game, space race square 0) are zero, so a fresh Board, an empty deck and a
+new SpaceRace all hash to 0 without any setup.
+
+Influence keys live next to the Board in countries.py; they are built with
+zobrist_keys like the tables here.
+"""
+
+import random
+from array import array
+
+from .cards import N_CARDS
+from .constants import GamePhase, Superpower
+
+
+def zobrist_keys(name:str, n:int, zero_every:int = 0) -> array:
+    """n random 64-bit keys, zeroing every zero_every-th one from 0.
+
+    Each table is seeded from its name, so hashes agree across processes
+    and runs whatever order the tables are built in.
+    """
+    rng = random.Random("zobrist:" + name)
+    keys = array("Q", (rng.getrandbits(64) for _ in range(n)))
+    if zero_every:
+        for i in range(0, n, zero_every):
+            keys[i] = 0
+    return keys
+
+
+def _enum_keys(name:str, members) -> dict:
+    return dict(zip(members, zobrist_keys(name, len(members))))
+
+
+# influence above this wraps around; real games stay far below it
+INFLUENCE_VALUES = 64
+INFLUENCE_MASK = INFLUENCE_VALUES - 1
+
+# index with card * N_CARD_ZONES + zone, see deck.py for the zone codes
+N_CARD_ZONES = 6
+CARD_ZONE_KEYS = zobrist_keys("card_zone", N_CARDS * N_CARD_ZONES, N_CARD_ZONES)
+
+# index with token * SPACE_MISSIONS + missions this turn
+SPACE_SQUARES = 9
+SPACE_MISSIONS = 3
+US_SPACE_KEYS = zobrist_keys("us_space", SPACE_SQUARES * SPACE_MISSIONS, SPACE_SQUARES * SPACE_MISSIONS)
+USSR_SPACE_KEYS = zobrist_keys("ussr_space", SPACE_SQUARES * SPACE_MISSIONS, SPACE_SQUARES * SPACE_MISSIONS)
+
+# scalars are folded in by GameState.zobrist_hash
+DEFCON_KEYS = zobrist_keys("defcon", 6)
+# index with vp_track + VP_OFFSET, the track runs -20..20 but scoring can overshoot
+VP_OFFSET = 64
+VP_KEYS = zobrist_keys("vp", 2 * VP_OFFSET)
+TURN_KEYS = zobrist_keys("turn", 12)
+AR_KEYS = zobrist_keys("action_round", 10)
+# index with milops (clamped to MILOPS_MAX), us keys first
+MILOPS_MAX = 7
+MILOPS_KEYS = zobrist_keys("milops", 2 * (MILOPS_MAX + 1))
+PHASE_KEYS = _enum_keys("phase", list(GamePhase))
+CHOOSER_KEYS = _enum_keys("chooser", list(Superpower))
+PLAYER_AR_KEYS = {None: 0, **_enum_keys("player_ar", list(Superpower))}
+# headline choices, index with card; the last slot is "no headline"
+US_HEADLINE_KEYS = zobrist_keys("us_headline", N_CARDS + 1)
+USSR_HEADLINE_KEYS = zobrist_keys("ussr_headline", N_CARDS + 1)
+US_HEADLINE_KEYS[N_CARDS] = USSR_HEADLINE_KEYS[N_CARDS] = 0
+
+
+def space_key(keys:array, token:int, missions:int) -> int:
+    return keys[min(token, SPACE_SQUARES - 1) * SPACE_MISSIONS + min(missions, SPACE_MISSIONS - 1)]
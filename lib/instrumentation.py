@@ -0,0 +1,136 @@
+"""Opt-in call counts and timings for the engine's hot paths.
+
+Instrumented code records into the module-level STATS object, under
+dotted names:
+
+    phase.<phase>           apply_move calls, by the phase the move was made in
+    transition.<phase>      phase changes into <phase> (count only)
+    movegen.<method>        MoveGenerator coup targets and random placements,
+                            which search and playouts build their moves from
+    scoring.<kind>          region, southeast asia and final scoring
+    deck.<operation>        draws, hand fills, reshuffles, era shuffles
+    observation.encode      ObservationEncoder.encode
+
+Recording is off by default. While it is off, inline checks cost one
+test of STATS.enabled and @timed functions cost nothing: the decorator
+returns the function unchanged and enable() swaps timing wrappers onto
+their module or class, which disable() removes again. Callers that
+imported a @timed function by name keep the raw function and are not
+timed.
+
+    from lib.instrumentation import STATS
+    STATS.enable()
+    ...
+    print(STATS.to_prometheus())
+"""
+
+import functools
+import json
+import sys
+from dataclasses import asdict, dataclass
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+
+@dataclass
+class Stat:
+    calls: int = 0
+    seconds: float = 0.0
+
+    def record(self, seconds:float):
+        self.calls += 1
+        self.seconds += seconds
+
+
+class EngineStats:
+    """Named call counters and cumulative timers."""
+
+    def __init__(self):
+        self.enabled = False
+        self.stats: Dict[str, Stat] = {}
+        # (raw function, its stat) for every @timed function
+        self.timed: List[Tuple[Callable, Stat]] = []
+
+    def enable(self):
+        self.enabled = True
+        for fn, stat in self.timed:
+            _install(fn, _timing_wrapper(fn, stat))
+
+    def disable(self):
+        self.enabled = False
+        for fn, _ in self.timed:
+            _install(fn, fn)
+
+    def reset(self):
+        # zero in place: instrumented functions hold on to their Stat
+        for stat in self.stats.values():
+            stat.calls = 0
+            stat.seconds = 0.0
+
+    def stat(self, name:str) -> Stat:
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = Stat()
+        return stat
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(sorted(self.stats))
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        return {name: asdict(self.stats[name]) for name in self if self.stats[name].calls}
+
+    def to_json(self, indent:Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self, prefix:str = "twilight_engine") -> str:
+        """Prometheus text exposition format, one calls and one seconds counter per name."""
+        lines = [
+            f"# HELP {prefix}_calls_total Instrumented engine calls.",
+            f"# TYPE {prefix}_calls_total counter",
+        ]
+        stats = self.to_dict()
+        for name, stat in stats.items():
+            lines.append(f'{prefix}_calls_total{{name="{name}"}} {stat["calls"]}')
+        lines += [
+            f"# HELP {prefix}_seconds_total Time spent in instrumented engine calls.",
+            f"# TYPE {prefix}_seconds_total counter",
+        ]
+        for name, stat in stats.items():
+            lines.append(f'{prefix}_seconds_total{{name="{name}"}} {stat["seconds"]!r}')
+        return "\n".join(lines) + "\n"
+
+
+STATS = EngineStats()
+
+
+def timed(name:str) -> Callable[[F], F]:
+    """Decorator recording calls to a module function or method under name while STATS is enabled."""
+    def decorate(fn:F) -> F:
+        STATS.timed.append((fn, STATS.stat(name)))
+        if STATS.enabled:
+            # enabled before this module was imported: time it from the start
+            return _timing_wrapper(fn, STATS.stats[name])
+        return fn
+    return decorate
+
+
+def _timing_wrapper(fn:Callable, stat:Stat) -> Callable:
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            stat.record(perf_counter() - start)
+    return wrapper
+
+
+def _install(fn:Callable, replacement:Callable):
+    # put replacement where fn is looked up: its module, or its class for methods
+    owner = sys.modules[fn.__module__]
+    *path, attr = fn.__qualname__.split(".")
+    for part in path:
+        owner = getattr(owner, part)
+    setattr(owner, attr, replacement)
@@ -0,0 +1,193 @@
+"""Exact coup and realignment outcome distributions, and batched dice.
+
+A coup depends only on the card's ops, the target's stability, the
+opponent's influence there and one d6; a realignment only on the two
+roll modifiers (see game.realign_modifier), the influence of both sides
+and two d6. Every outcome is therefore a table lookup:
+
+    COUP_OUTCOMES[ops][stability][opp_influence]    (probability, removed, added) per distinct result
+    REALIGN_MARGINS[modifier_diff + MAX_MODIFIER]   (margin, rolls out of 36) per usa - ussr total
+
+Influence beyond the largest possible result behaves the same as at that
+cap, so the coup table is complete; realignment outcomes are folded from
+REALIGN_MARGINS and memoized per parameter set. Evaluators can take
+expectations from these instead of simulating rolls.
+
+The resolve_* functions roll many coups or realignments at once, drawing
+all the dice from one randbytes call, for sampling-based search. They
+return results and do not touch any GameState; apply_move still rolls
+with the game's own rng so games stay reproducible.
+"""
+
+import random
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+from .game import realign_modifier
+from .game_sets.cards import CARD_OPS
+from .game_sets.constants import Superpower
+from .game_sets.countries import COUNTRY_BATTLEGROUND, COUNTRY_STABILITY
+from .game_sets.tables import NEIGHBOURS
+from .state_managers.game_state import GameState
+
+DIE_FACES = 6
+# card ops plus room for ops bonuses
+MAX_OPS = max(CARD_OPS) + 2
+MAX_STABILITY = max(COUNTRY_STABILITY)
+# largest coup result; more opponent influence than this changes nothing
+MAX_COUP_RESULT = DIE_FACES + MAX_OPS - 2
+# every adjacent country plus more influence
+MAX_MODIFIER = max(len(neighbours) for neighbours in NEIGHBOURS) + 1
+
+# removed: opponent influence removed, added: own influence added
+CoupOutcome = namedtuple("CoupOutcome", ["probability", "removed", "added"])
+# influence lost by each side
+RealignOutcome = namedtuple("RealignOutcome", ["probability", "usa_removed", "ussr_removed"])
+CoupDistribution = namedtuple("CoupDistribution", ["outcomes", "milops", "defcon_change", "nuclear_war"])
+
+
+def _coup_outcomes(ops:int, stability:int, opp_influence:int) -> Tuple[CoupOutcome, ...]:
+    counts = {}
+    for roll in range(1, DIE_FACES + 1):
+        result = max(0, roll + ops - 2 * stability)
+        removed = min(result, opp_influence)
+        key = (removed, result - removed)
+        counts[key] = counts.get(key, 0) + 1
+    return tuple(CoupOutcome(count / DIE_FACES, removed, added) for (removed, added), count in sorted(counts.items()))
+
+
+COUP_OUTCOMES: Tuple[Tuple[Tuple[Tuple[CoupOutcome, ...], ...], ...], ...] = tuple(
+    tuple(
+        tuple(_coup_outcomes(ops, stability, opp_influence) for opp_influence in range(MAX_COUP_RESULT + 1))
+        for stability in range(MAX_STABILITY + 1)
+    )
+    for ops in range(MAX_OPS + 1)
+)
+
+# COUP_SUCCESS[ops][stability]: chance the coup has any effect
+COUP_SUCCESS: Tuple[Tuple[float, ...], ...] = tuple(
+    tuple(sum(1 for roll in range(1, DIE_FACES + 1) if roll + ops > 2 * stability) / DIE_FACES
+          for stability in range(MAX_STABILITY + 1))
+    for ops in range(MAX_OPS + 1)
+)
+
+
+def _realign_margins(modifier_diff:int) -> Tuple[Tuple[int, int], ...]:
+    counts = {}
+    for us_roll in range(1, DIE_FACES + 1):
+        for ussr_roll in range(1, DIE_FACES + 1):
+            margin = us_roll - ussr_roll + modifier_diff
+            counts[margin] = counts.get(margin, 0) + 1
+    return tuple(sorted(counts.items()))
+
+
+REALIGN_MARGINS: Tuple[Tuple[Tuple[int, int], ...], ...] = tuple(
+    _realign_margins(diff) for diff in range(-MAX_MODIFIER, MAX_MODIFIER + 1)
+)
+
+
+def coup_outcomes(ops:int, stability:int, opp_influence:int) -> Tuple[CoupOutcome, ...]:
+    """The distinct results of a coup and their probabilities."""
+    return COUP_OUTCOMES[min(ops, MAX_OPS)][stability][min(opp_influence, MAX_COUP_RESULT)]
+
+
+def expected_coup(ops:int, stability:int, opp_influence:int) -> Tuple[float, float]:
+    """Expected (opponent influence removed, own influence added) for a coup."""
+    return _EXPECTED_COUP[min(ops, MAX_OPS)][stability][min(opp_influence, MAX_COUP_RESULT)]
+
+
+_EXPECTED_COUP = tuple(
+    tuple(
+        tuple((sum(o.probability * o.removed for o in outcomes), sum(o.probability * o.added for o in outcomes))
+              for outcomes in by_influence)
+        for by_influence in by_stability
+    )
+    for by_stability in COUP_OUTCOMES
+)
+
+
+@lru_cache(maxsize=None)
+def realign_outcomes(us_modifier:int, ussr_modifier:int, us_influence:int, ussr_influence:int) -> Tuple[RealignOutcome, ...]:
+    """The distinct results of a realignment and their probabilities."""
+    counts = {}
+    for margin, count in REALIGN_MARGINS[us_modifier - ussr_modifier + MAX_MODIFIER]:
+        if margin > 0:
+            key = (0, min(margin, ussr_influence))
+        elif margin < 0:
+            key = (min(-margin, us_influence), 0)
+        else:
+            key = (0, 0)
+        counts[key] = counts.get(key, 0) + count
+    total = DIE_FACES * DIE_FACES
+    return tuple(RealignOutcome(count / total, usa_removed, ussr_removed)
+                 for (usa_removed, ussr_removed), count in sorted(counts.items()))
+
+
+def expected_realign(us_modifier:int, ussr_modifier:int, us_influence:int, ussr_influence:int) -> Tuple[float, float]:
+    """Expected (usa influence removed, ussr influence removed) for a realignment."""
+    outcomes = realign_outcomes(us_modifier, ussr_modifier, us_influence, ussr_influence)
+    return (sum(o.probability * o.usa_removed for o in outcomes), sum(o.probability * o.ussr_removed for o in outcomes))
+
+
+def coup_distribution(gamestate:GameState, player:Superpower, index:int, ops:int) -> CoupDistribution:
+    """Everything a coup in gamestate can do: influence outcomes plus its fixed milops and defcon effects."""
+    board = gamestate.board
+    opp_influence = board.ussr_influence[index] if player == Superpower.USA else board.us_influence[index]
+    defcon_change = -1 if COUNTRY_BATTLEGROUND[index] else 0
+    return CoupDistribution(coup_outcomes(ops, COUNTRY_STABILITY[index], opp_influence), ops, defcon_change,
+                            gamestate.defcon_level + defcon_change <= 1)
+
+
+def realign_distribution(gamestate:GameState, index:int) -> Tuple[RealignOutcome, ...]:
+    board = gamestate.board
+    return realign_outcomes(realign_modifier(board, Superpower.USA, index), realign_modifier(board, Superpower.USSR, index),
+                            board.us_influence[index], board.ussr_influence[index])
+
+
+# -- batched dice --
+
+# randbytes byte -> d6 roll; bytes 252 and up are dropped so every face is equally likely
+_D6_BYTES = bytes(b % DIE_FACES + 1 for b in range(256))
+_D6_REJECTED = bytes(range(256 - 256 % DIE_FACES, 256))
+
+
+def roll_dice(rng:random.Random, n:int) -> bytearray:
+    """n d6 rolls, drawn in bulk from rng.randbytes."""
+    rolls = bytearray()
+    while len(rolls) < n:
+        missing = n - len(rolls)
+        rolls += rng.randbytes(missing + missing // 32 + 4).translate(_D6_BYTES, _D6_REJECTED)
+    del rolls[n:]
+    return rolls
+
+
+def resolve_coups(ops:Sequence[int], stability:Sequence[int], opp_influence:Sequence[int],
+                  rng:random.Random) -> Tuple[bytearray, array, array]:
+    """Roll len(ops) coups at once. Returns (rolls, removed, added)."""
+    rolls = roll_dice(rng, len(ops))
+    removed = array("B", bytes(len(ops)))
+    added = array("B", bytes(len(ops)))
+    for i, roll in enumerate(rolls):
+        result = roll + ops[i] - 2 * stability[i]
+        if result > 0:
+            removed[i] = r = min(result, opp_influence[i])
+            added[i] = result - r
+    return rolls, removed, added
+
+
+def resolve_realignments(us_modifier:Sequence[int], ussr_modifier:Sequence[int], us_influence:Sequence[int],
+                         ussr_influence:Sequence[int], rng:random.Random) -> Tuple[bytearray, array, array]:
+    """Roll len(us_modifier) realignments at once. Returns (rolls, usa_removed, ussr_removed); rolls alternate usa, ussr."""
+    n = len(us_modifier)
+    rolls = roll_dice(rng, 2 * n)
+    usa_removed = array("B", bytes(n))
+    ussr_removed = array("B", bytes(n))
+    for i in range(n):
+        margin = rolls[2 * i] + us_modifier[i] - rolls[2 * i + 1] - ussr_modifier[i]
+        if margin > 0:
+            ussr_removed[i] = min(margin, ussr_influence[i])
+        elif margin < 0:
+            usa_removed[i] = min(-margin, us_influence[i])
+    return rolls, usa_removed, ussr_removed
@@ -0,0 +1,227 @@
+"""Compact binary game records.
+
+A record file holds any number of games back to back:
+
+    file header     FILE_HEADER     magic b"TSGR", format version
+    per game:
+      game header   GAME_HEADER     seed, rules version, action count, result, final vp
+      actions       ACTION_RECORD   one fixed-width record per move, in order
+
+An action record is 10 bytes:
+
+    action type     uint8           index into ActionType
+    card            uint8           card id
+    targets         6 x uint8       country indices, padded with NO_TARGET
+    dice            2 x uint8       dice rolled by the move, 0 if not rolled
+
+A game is replayed by calling new_game(seed) and applying its moves; the
+recorded dice let a replay check it rolled the same numbers. Only seeded
+games can be recorded. random.Random seeds an int by its absolute value,
+so the header stores abs(seed), which must fit in 64 bits. result is 1
+for a USA win, -1 for a USSR win and 0 for a draw or an unfinished game.
+
+GameRecordWriter buffers one game at a time and writes it when the game
+ends. GameRecordReader memory-maps the file and decodes games lazily, so
+files with millions of games can be scanned without loading them.
+"""
+
+import mmap
+import struct
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Sequence, Tuple, Union
+
+from .actions.actions_manager import ActionType, Move
+from .game import RULES_VERSION
+from .game_sets.constants import Superpower
+from .state_managers.game_state import GameState
+
+MAGIC = b"TSGR"
+FORMAT_VERSION = 1
+
+FILE_HEADER = struct.Struct("<4sH")
+GAME_HEADER = struct.Struct("<QHIbb")
+MAX_TARGETS = 6
+MAX_DICE = 2
+ACTION_RECORD = struct.Struct("<BB%ds%ds" % (MAX_TARGETS, MAX_DICE))
+MAX_SEED = (1 << 64) - 1
+
+NO_TARGET = 0xFF
+
+ACTION_TYPES: Tuple[ActionType, ...] = tuple(ActionType)
+ACTION_TYPE_CODE = {action_type: i for i, action_type in enumerate(ACTION_TYPES)}
+
+# a recorded move and the dice it rolled
+RecordedMove = Tuple[Move, Tuple[int, ...]]
+
+
+def encode_action(move:Move, dice:Sequence[int] = (), out:Optional[bytearray] = None) -> bytearray:
+    """Append one action record for move to out (a new bytearray by default)."""
+    if len(move.targets) > MAX_TARGETS:
+        raise ValueError("Move has %d targets, records hold at most %d" % (len(move.targets), MAX_TARGETS))
+    if len(dice) > MAX_DICE:
+        raise ValueError("Move rolled %d dice, records hold at most %d" % (len(dice), MAX_DICE))
+    out = bytearray() if out is None else out
+    targets = bytes(move.targets) + bytes([NO_TARGET]) * (MAX_TARGETS - len(move.targets))
+    out += ACTION_RECORD.pack(ACTION_TYPE_CODE[move.action_type], move.card, targets, bytes(dice))
+    return out
+
+
+def decode_action(buf, offset:int = 0) -> RecordedMove:
+    code, card, targets, dice = ACTION_RECORD.unpack_from(buf, offset)
+    return (Move(ACTION_TYPES[code], card, tuple(t for t in targets if t != NO_TARGET)),
+            tuple(d for d in dice if d))
+
+
+def game_result(gamestate:GameState) -> int:
+    if not gamestate.game_over or gamestate.winner is None:
+        return 0
+    return 1 if gamestate.winner == Superpower.USA else -1
+
+
+@dataclass
+class GameRecord:
+    """One game in a record file. actions is a view into the file; decode with moves()."""
+
+    seed: int
+    rules_version: int
+    result: int
+    vp: int
+    actions: memoryview
+
+    def __len__(self) -> int:
+        return len(self.actions) // ACTION_RECORD.size
+
+    def moves(self) -> Iterator[RecordedMove]:
+        for offset in range(0, len(self.actions), ACTION_RECORD.size):
+            yield decode_action(self.actions, offset)
+
+    def move(self, i:int) -> RecordedMove:
+        return decode_action(self.actions, i * ACTION_RECORD.size)
+
+
+class GameRecordWriter:
+    """Streams games into a record file.
+
+        with GameRecordWriter("games.tsgr") as writer:
+            writer.begin_game(seed)
+            ...
+            writer.record(move, apply_move(gamestate, move))
+            ...
+            writer.end_game(gamestate)
+    """
+
+    def __init__(self, path:Union[str, Path], append:bool = False):
+        path = Path(path)
+        exists = append and path.exists() and path.stat().st_size > 0
+        self.file: BinaryIO = open(path, "ab" if exists else "wb")
+        if not exists:
+            self.file.write(FILE_HEADER.pack(MAGIC, FORMAT_VERSION))
+        self.seed: Optional[int] = None
+        self.buffer = bytearray()
+        self.n_actions = 0
+        self.games = 0
+
+    def __enter__(self) -> "GameRecordWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def begin_game(self, seed:int):
+        if seed is None:
+            raise ValueError("Cannot record a game without a seed, it could not be replayed; pass new_game a seed")
+        # the same game: random.Random(-n) and random.Random(n) are seeded alike
+        seed = abs(seed)
+        if seed > MAX_SEED:
+            raise ValueError("Seed %d does not fit in a record's 64-bit seed field" % seed)
+        self.seed = seed
+        del self.buffer[:]
+        self.n_actions = 0
+
+    def record(self, move:Move, dice:Sequence[int] = ()):
+        encode_action(move, dice, self.buffer)
+        self.n_actions += 1
+
+    def end_game(self, gamestate:Optional[GameState] = None):
+        """Write the buffered game. Pass the final state to store its result and vps."""
+        if self.seed is None:
+            raise ValueError("end_game called before begin_game")
+        result = game_result(gamestate) if gamestate is not None else 0
+        vp = max(-128, min(127, gamestate.vp_track)) if gamestate is not None else 0
+        self.file.write(GAME_HEADER.pack(self.seed, RULES_VERSION, self.n_actions, result, vp))
+        self.file.write(self.buffer)
+        self.seed = None
+        self.games += 1
+
+    def close(self):
+        self.file.close()
+
+
+class GameRecordReader:
+    """Memory-mapped access to a record file.
+
+    Iterating yields GameRecords whose actions are views into the mapping,
+    so nothing is copied until moves are decoded. Release every record (or
+    stop using it) before close().
+    """
+
+    def __init__(self, path:Union[str, Path]):
+        self.file = open(path, "rb")
+        self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mmap)
+        magic, version = FILE_HEADER.unpack_from(self.view, 0)
+        if magic != MAGIC:
+            raise ValueError("%s is not a game record file" % path)
+        if version != FORMAT_VERSION:
+            raise ValueError("Unsupported record format version %d" % version)
+        self._offsets: Optional[array] = None
+
+    def __enter__(self) -> "GameRecordReader":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        offset = FILE_HEADER.size
+        end = len(self.view)
+        while offset < end:
+            record = self._read(offset)
+            yield record
+            offset += GAME_HEADER.size + len(record.actions)
+
+    def _read(self, offset:int) -> GameRecord:
+        seed, rules_version, n_actions, result, vp = GAME_HEADER.unpack_from(self.view, offset)
+        start = offset + GAME_HEADER.size
+        actions = self.view[start:start + n_actions * ACTION_RECORD.size]
+        return GameRecord(seed, rules_version, result, vp, actions)
+
+    def offsets(self) -> array:
+        """File offset of every game, found by hopping over the game headers once."""
+        if self._offsets is None:
+            offsets = array("Q")
+            offset = FILE_HEADER.size
+            end = len(self.view)
+            while offset < end:
+                offsets.append(offset)
+                n_actions = GAME_HEADER.unpack_from(self.view, offset)[2]
+                offset += GAME_HEADER.size + n_actions * ACTION_RECORD.size
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets())
+
+    def __getitem__(self, i:int) -> GameRecord:
+        return self._read(self.offsets()[i])
+
+    def close(self):
+        self.file.close()
+        try:
+            self.view.release()
+            self.mmap.close()
+        except BufferError:
+            # records still hold views into the mapping; it is unmapped once they are gone
+            pass
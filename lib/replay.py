@@ -0,0 +1,114 @@
+"""Deterministic replay of recorded games, with seeking.
+
+A game is fully determined by its seed and its moves: new_game(seed)
+seeds the one rng that shuffles the deck and rolls the dice, and every
+move is applied with apply_move, exactly as in live play.
+
+Replay keeps a cursor game and, as the cursor passes every
+snapshot_every moves, a byte snapshot of the game plus its rng state.
+Seeking forward plays on from the cursor; seeking backward restores the
+nearest snapshot at or before the target and plays forward from there, so
+no seek replays more than snapshot_every moves unless the target has
+never been reached.
+"""
+
+import random
+from typing import List, Optional, Sequence, Tuple
+
+from .actions.actions_manager import Move
+from .game import RULES_VERSION, apply_move, new_game
+from .records import GameRecord
+from .state_managers.game_state import GameState
+
+
+class Replay:
+    """Seekable replay of one game.
+
+    state(i) is the game after the first i moves; state(0) is the game
+    right after setup. If dice are given (one tuple per move), each replayed
+    move must roll the same numbers or a ValueError is raised.
+    """
+
+    def __init__(self, seed:int, moves:Sequence[Move], dice:Optional[Sequence[Tuple[int, ...]]] = None,
+                 snapshot_every:int = 64):
+        if snapshot_every <= 0:
+            raise ValueError("snapshot_every must be positive")
+        self.seed = seed
+        self.moves = moves
+        self.dice = dice
+        self.snapshot_every = snapshot_every
+        # snapshots[k] is the game after k * snapshot_every moves
+        self.snapshots: List[Tuple[bytes, tuple]] = []
+        self.gamestate = new_game(seed)
+        self.position = 0
+        self._snapshot()
+
+    @classmethod
+    def from_record(cls, record:GameRecord, snapshot_every:int = 64) -> "Replay":
+        if record.rules_version != RULES_VERSION:
+            raise ValueError("Game was recorded under rules version %d, this engine is version %d"
+                             % (record.rules_version, RULES_VERSION))
+        moves, dice = [], []
+        for move, rolls in record.moves():
+            moves.append(move)
+            dice.append(rolls)
+        return cls(record.seed, moves, dice, snapshot_every)
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    def seek(self, index:int) -> GameState:
+        """Move the cursor to the game after index moves and return it.
+
+        The returned game is the replay's own cursor: read it, or fork it
+        before changing it.
+        """
+        if not 0 <= index <= len(self.moves):
+            raise IndexError("Replay has %d moves, cannot seek to %d" % (len(self.moves), index))
+        if index < self.position or index - self.position > self.snapshot_every:
+            k = min(index // self.snapshot_every, len(self.snapshots) - 1)
+            if k * self.snapshot_every > self.position or index < self.position:
+                self._restore(k)
+        while self.position < index:
+            self._step()
+        return self.gamestate
+
+    def state(self, index:int) -> GameState:
+        """An independent copy of the game after index moves, rng state included.
+
+        Unlike fork(), the copy rolls the same dice the recorded game did.
+        """
+        gamestate = self.seek(index)
+        rng = random.Random()
+        rng.setstate(gamestate.rng.getstate())
+        return GameState.from_bytes(gamestate.to_bytes(), rng=rng)
+
+    def _step(self):
+        i = self.position
+        try:
+            rolls = apply_move(self.gamestate, self.moves[i])
+            if self.dice is not None and tuple(rolls) != tuple(self.dice[i]):
+                raise ValueError("Replay diverged at move %d: rolled %s, recorded %s" % (i, rolls, self.dice[i]))
+        except Exception:
+            # rare: rebuild the game before move i from the nearest snapshot so the cursor stays put
+            self._restore(min(i // self.snapshot_every, len(self.snapshots) - 1))
+            while self.position < i:
+                apply_move(self.gamestate, self.moves[self.position])
+                self.position += 1
+            raise
+        self.position = i + 1
+        if self.position % self.snapshot_every == 0 and self.position // self.snapshot_every == len(self.snapshots):
+            self._snapshot()
+
+    def _snapshot(self):
+        self.snapshots.append((bytes(self.gamestate.to_bytes()), self.gamestate.rng.getstate()))
+
+    def _restore(self, k:int):
+        self.gamestate = _unpack(*self.snapshots[k])
+        self.position = k * self.snapshot_every
+
+
+def _unpack(data:bytes, rng_state:tuple) -> GameState:
+    rng = random.Random()
+    rng.setstate(rng_state)
+    return GameState.from_bytes(data, rng=rng)
@@ -1,34 +1,198 @@
 import json
 import random
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
-from ..game_sets.cards import Card, CARDS, CardType, Side, get_cards_by_era, get_scoring_cards
+from array import array
+from ..game_sets.cards import Card, CARDS, ERA_CARDS, N_CARDS, CardType, Side, card_array, get_cards_by_era, get_scoring_cards
+from ..game_sets.constants import Superpower
+from ..game_sets.zobrist import CARD_ZONE_KEYS
+from ..instrumentation import timed
+
+# card location codes, see Deck.location
+NOT_IN_GAME, DRAW_PILE, DISCARD_PILE, REMOVED_PILE, USA_HAND, USSR_HAND = range(6)
+N_ZONES = 6
+
+HAND_ZONE = {Superpower.USA: USA_HAND, Superpower.USSR: USSR_HAND}
 
 class Deck:
-    def __init__(self):
-        self.draw_pile:List[str] = []
-        self.discard_pile:List[str] = []
-        self.removed_pile:List[str] = []
+    """Tracks where every card is.
+
+    location[card] holds the card's zone code and zones[code] is a bitmask
+    of the card ids in that zone, so "where is card X" and "which cards are
+    in zone Z" are both O(1). Only the draw pile keeps an order, the
+    shuffled draw_pile array that cards are popped from.
+
+    Shuffles use the deck's own rng; pass a seeded random.Random for
+    reproducible games.
+
+    hash is the zobrist hash of the card locations (not the draw order),
+    updated on every move.
+    """
+
+    def __init__(self, rng:Optional[random.Random] = None):
+        self.rng = rng if rng is not None else random.Random()
+        self.location = bytearray(N_CARDS)
+        self.zones: List[int] = [0] * N_ZONES
+        self.zones[NOT_IN_GAME] = (1 << N_CARDS) - 1
+        # draw order: cards are drawn from the end
+        self.draw_pile:array = card_array()
+        self.eras: List[str] = []
+        self.hash = 0
+        self._shared = False
         self._add_era()
 
+    def fork(self, copy_on_write:bool = False, rng:Optional[random.Random] = None) -> "Deck":
+        """Copy the deck, or share its location tables until the next deck operation."""
+        deck = Deck.__new__(Deck)
+        deck.rng = rng if rng is not None else self.rng
+        deck.zones = self.zones[:]
+        deck.eras = self.eras[:]
+        deck.hash = self.hash
+        if copy_on_write:
+            deck.location = self.location
+            deck.draw_pile = self.draw_pile
+            deck._shared = self._shared = True
+        else:
+            deck.location = self.location[:]
+            deck.draw_pile = self.draw_pile[:]
+            deck._shared = False
+        return deck
+
+    def copy_from(self, other:"Deck"):
+        """Overwrite this deck with other, reusing this deck's tables. The rng is kept."""
+        if self._shared:
+            self.location = other.location[:]
+            self.draw_pile = other.draw_pile[:]
+            self._shared = False
+        else:
+            self.location[:] = other.location
+            self.draw_pile[:] = other.draw_pile
+        self.zones[:] = other.zones
+        self.eras[:] = other.eras
+        self.hash = other.hash
+
+    def _own(self):
+        # take private copies of shared tables before the first write
+        if self._shared:
+            self.location = self.location[:]
+            self.draw_pile = self.draw_pile[:]
+            self._shared = False
+
+    # -- location queries --
+
+    def where(self, card:int) -> int:
+        return self.location[card]
+
+    def zone_cards(self, zone:int) -> Iterator[int]:
+        """Yield the ids of the cards in a zone, lowest first."""
+        mask = self.zones[zone]
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    @property
+    def discard_pile(self) -> List[int]:
+        return list(self.zone_cards(DISCARD_PILE))
+
+    @property
+    def removed_pile(self) -> List[int]:
+        return list(self.zone_cards(REMOVED_PILE))
+
+    def move(self, card:int, zone:int):
+        """Move a card to a zone. Use draw and reshuffle for the draw pile."""
+        self._own()
+        self._relocate(card, zone)
+
+    def _relocate(self, card:int, zone:int):
+        # move one card between zones, keeping the masks and hash in step
+        bit = 1 << card
+        old = self.location[card]
+        self.zones[old] &= ~bit
+        self.zones[zone] |= bit
+        self.location[card] = zone
+        key = card * N_ZONES
+        self.hash ^= CARD_ZONE_KEYS[key + old] ^ CARD_ZONE_KEYS[key + zone]
+
+    def discard(self, card:int):
+        self.move(card, DISCARD_PILE)
+
+    def remove(self, card:int):
+        self.move(card, REMOVED_PILE)
+
+    def redeal(self, player:Superpower, hand_cards:Iterable[int], draw_cards:array):
+        """Put hand_cards in player's hand zone and make draw_cards (a card array) the draw pile, in that order.
+
+        For determinizing hidden information: the caller swaps cards between
+        a hand and the draw pile and keeps the hand array itself in step.
+        """
+        self._own()
+        zone = HAND_ZONE[player]
+        location = self.location
+        for card in hand_cards:
+            if location[card] != zone:
+                self._relocate(card, zone)
+        self.draw_pile[:] = draw_cards
+        for card in draw_cards:
+            if location[card] != DRAW_PILE:
+                self._relocate(card, DRAW_PILE)
+
+    # -- drawing --
+
+    @timed("deck.add_era")
     def _add_era(self, era:str = "Early War"):
-        card_names = [name for name, card in CARDS.items() if card.era == era]
-        self.draw_pile.extend(card_names)
-        random.shuffle(self.draw_pile)
+        self._own()
+        for card in ERA_CARDS[era]:
+            self._relocate(card, DRAW_PILE)
+        self.draw_pile.extend(ERA_CARDS[era])
+        self.rng.shuffle(self.draw_pile)
+        self.eras.append(era)
 
-    def fill_hand(self, player_hand:List[str], n_cards:int = 8):
-        while len(player_hand) < n_cards: 
-            card_id = self._draw_card()
-            player_hand.append(card_id)
+    @timed("deck.fill_hand")
+    def fill_hand(self, player:Superpower, player_hand:array, n_cards:int = 8):
+        # _draw_card inlined: each card goes straight from the draw pile to the hand zone
+        self._own()
+        zone = HAND_ZONE[player]
+        relocate = self._relocate
+        while len(player_hand) < n_cards:
+            if not self.draw_pile:
+                self._reshuffle()
+                if not self.draw_pile:
+                    raise Exception("Not enough draw pile cards!")
+            card = self.draw_pile.pop()
+            relocate(card, zone)
+            player_hand.append(card)
+        if not self.draw_pile:
+            self._reshuffle()
 
-    def _draw_card(self):
+    @timed("deck.draw_card")
+    def _draw_card(self) -> int:
+        self._own()
+        if len(self.draw_pile) <= 0:
+            self._reshuffle()
         if len(self.draw_pile) <= 0:
             raise Exception("Not enough draw pile cards!")
         card = self.draw_pile.pop()
+        self._relocate(card, NOT_IN_GAME)
         if len(self.draw_pile) == 0:
-            self.discard_pile, self.draw_pile = self.draw_pile, self.discard_pile 
-            random.shuffle(self.draw_pile)
-        return card 
+            self._reshuffle()
+        return card
 
+    @timed("deck.reshuffle")
+    def _reshuffle(self):
+        # the discard pile becomes the new draw pile
+        self._own()
+        cards = card_array(self.zone_cards(DISCARD_PILE))
+        location = self.location
+        h = self.hash
+        for card in cards:
+            location[card] = DRAW_PILE
+            key = card * N_ZONES
+            h ^= CARD_ZONE_KEYS[key + DISCARD_PILE] ^ CARD_ZONE_KEYS[key + DRAW_PILE]
+        self.hash = h
+        self.zones[DRAW_PILE] |= self.zones[DISCARD_PILE]
+        self.zones[DISCARD_PILE] = 0
+        self.rng.shuffle(cards)
+        self.draw_pile = cards
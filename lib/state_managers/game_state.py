@@ -1,15 +1,20 @@
 import json
 import random
+from array import array
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 
-from ..game_sets.countries import Country, COUNTRIES, Region, Superpower, calculate_region_control, InfluenceChange
-from ..game_sets.cards import Card, CARDS, CardType, Side, get_cards_by_era, get_scoring_cards
+from ..game_sets.countries import Board, Country, COUNTRIES, COUNTRY_INDEX, Region, Superpower, calculate_region_control, InfluenceChange
+from ..game_sets.cards import Card, CARDS, N_CARDS, CardType, Side, card_array, get_cards_by_era, get_scoring_cards
 from ..game_sets.constants import GamePhase, Superpower 
 from .space_race import SpaceRace
+from .observation import OBSERVATION_ENCODER
+from .snapshot import SNAPSHOT_SIZE, pack_state, unpack_state
 from .deck import Deck
+from ..game_sets.zobrist import (AR_KEYS, CHOOSER_KEYS, DEFCON_KEYS, MILOPS_KEYS, MILOPS_MAX, PHASE_KEYS, PLAYER_AR_KEYS,
+                                 TURN_KEYS, US_HEADLINE_KEYS, USSR_HEADLINE_KEYS, VP_KEYS, VP_OFFSET)
 
 
 # Todo - common subroutines (usa_choosecard, triggers chooser to be usa and options to be usa hand, China card parameter as flag etc)
@@ -21,75 +26,145 @@ class GameState:
     action_round:int = 1 
     player_ar: Optional[Superpower] = None 
 
-    space_race = SpaceRace()
+    space_race: SpaceRace = field(default_factory=SpaceRace)
 
     # chooser is player making decision
     chooser: Superpower = Superpower.USA
 
     vp_track: int = 0 # positive = USA! USA! USA! 
 
-    # hands have card ids? 
-    usa_hand: List[str] = []
-    ussr_hand: List[str] = []
+    # hands hold card ids
+    usa_hand: array = field(default_factory=card_array)
+    ussr_hand: array = field(default_factory=card_array)
 
     # visible cards 
-    usa_hand_visible: List[str] = []
-    ussr_hand_visible: List[str] = []
+    usa_hand_visible: array = field(default_factory=card_array)
+    ussr_hand_visible: array = field(default_factory=card_array)
 
-    deck:Deck = Deck()
+    deck:Deck = field(default_factory=Deck)
     defcon_level:int = 0
 
-    def __post_init__(self):
-        if not self.countries:
-            # Deep copy countries to avoid modifying the original
-            self.countries = {name: Country(
-                name=country.name,
-                region=country.region,
-                stability=country.stability,
-                battleground=country.battleground,
-                adjacent_countries=country.adjacent_countries.copy(),
-                us_influence=country.us_influence,
-                ussr_influence=country.ussr_influence
-            ) for name, country in COUNTRIES.items()}
-
-    def _fill_hands(self):
-        self.deck.fill_hand(self.usa_hand)
-        self.deck.fill_hand(self.ussr_hand)
+    # influence arrays for every country on the map
+    board: Board = field(default_factory=Board)
+
+    # military operations conducted this turn
+    usa_milops:int = 0
+    ussr_milops:int = 0
+
+    # headline cards chosen this turn
+    usa_headline: Optional[int] = None
+    ussr_headline: Optional[int] = None
+
+    winner: Optional[Superpower] = None
+
+    # dice rolls; per game so forks and seeded games replay identically
+    rng: random.Random = field(default_factory=random.Random, repr=False)
+
+    # name -> Country view, backed by the board
+    @property
+    def countries(self) -> Board:
+        return self.board
+
+    def fork(self, copy_on_write:bool = False, rng:Optional[random.Random] = None,
+             exact_rng:bool = False) -> "GameState":
+        """Branch the game for search or rollouts.
+
+        Only mutable state is copied: the board, hands, deck locations and
+        space race. Card and country tables are shared. With copy_on_write the
+        board and deck tables stay shared until either game writes to them.
+
+        By default the clone's rng is seeded from one draw of this game's rng.
+        Pass rng to give the clone a generator without touching this game's,
+        or exact_rng to copy the full rng state (slow) so the clone rolls the
+        same dice this game would.
+        """
+        clone = GameState.__new__(GameState)
+        clone.__dict__.update(self.__dict__)
+        clone.board = self.board.fork(copy_on_write)
+        clone.space_race = self.space_race.fork()
+        clone.usa_hand = self.usa_hand[:]
+        clone.ussr_hand = self.ussr_hand[:]
+        clone.usa_hand_visible = self.usa_hand_visible[:]
+        clone.ussr_hand_visible = self.ussr_hand_visible[:]
+        if rng is None:
+            if exact_rng:
+                rng = random.Random()
+                rng.setstate(self.rng.getstate())
+            else:
+                rng = random.Random(self.rng.getrandbits(64))
+        clone.rng = rng
+        clone.deck = self.deck.fork(copy_on_write, clone.rng)
+        return clone
+
+    def copy_from(self, other:"GameState"):
+        """Overwrite this game with other in place, reusing this game's arrays.
+
+        Unlike fork this allocates almost nothing, for callers that rebuild
+        the same scratch games many times. This game keeps its own rng.
+        """
+        board, deck, space_race, rng = self.board, self.deck, self.space_race, self.rng
+        hands = (self.usa_hand, self.ussr_hand, self.usa_hand_visible, self.ussr_hand_visible)
+        self.__dict__.update(other.__dict__)
+        self.board, self.deck, self.space_race, self.rng = board, deck, space_race, rng
+        self.usa_hand, self.ussr_hand, self.usa_hand_visible, self.ussr_hand_visible = hands
+        board.copy_from(other.board)
+        deck.copy_from(other.deck)
+        space_race.copy_from(other.space_race)
+        hands[0][:] = other.usa_hand
+        hands[1][:] = other.ussr_hand
+        hands[2][:] = other.usa_hand_visible
+        hands[3][:] = other.ussr_hand_visible
+
+    # -- flat snapshots, see snapshot.py for the layout --
+
+    def to_bytes(self, out=None, offset:int = 0) -> bytearray:
+        """Pack the game into SNAPSHOT_SIZE bytes, into out at offset if given."""
+        return pack_state(self, out, offset)
+
+    @classmethod
+    def from_bytes(cls, data, offset:int = 0, rng:Optional[random.Random] = None) -> "GameState":
+        """Restore a game packed by to_bytes. The rng is not stored; pass one to keep dice reproducible."""
+        return unpack_state(data, cls.__new__(cls), offset, rng)
+
+    @property
+    def zobrist_hash(self) -> int:
+        """64-bit hash of the position for transposition tables.
+
+        The board, deck and space race keep their hashes up to date as they
+        change; only the scalars are folded in here.
+        """
+        return (self.board.hash ^ self.deck.hash ^ self.space_race.hash
+                ^ DEFCON_KEYS[self.defcon_level] ^ VP_KEYS[self.vp_track + VP_OFFSET]
+                ^ TURN_KEYS[self.turn] ^ AR_KEYS[self.action_round]
+                ^ PHASE_KEYS[self.phase] ^ CHOOSER_KEYS[self.chooser] ^ PLAYER_AR_KEYS[self.player_ar]
+                ^ MILOPS_KEYS[min(self.usa_milops, MILOPS_MAX)] ^ MILOPS_KEYS[MILOPS_MAX + 1 + min(self.ussr_milops, MILOPS_MAX)]
+                ^ US_HEADLINE_KEYS[N_CARDS if self.usa_headline is None else self.usa_headline]
+                ^ USSR_HEADLINE_KEYS[N_CARDS if self.ussr_headline is None else self.ussr_headline])
+
+    def _fill_hands(self, n_cards:int = 8):
+        self.deck.fill_hand(Superpower.USA, self.usa_hand, n_cards)
+        self.deck.fill_hand(Superpower.USSR, self.ussr_hand, n_cards)
+
+    def hand(self, player:Superpower) -> array:
+        return self.usa_hand if player == Superpower.USA else self.ussr_hand
+
+    @property
+    def game_over(self) -> bool:
+        return self.phase == GamePhase.GAME_OVER
 
     def _apply_influence_changes(self, changes:List[InfluenceChange]):
         for (country_name, usa_change, ussr_change) in changes:
-            self.countries[country_name]._change_influence(usa_change, ussr_change)
+            self.board.change_influence(COUNTRY_INDEX[country_name], usa_change, ussr_change)
 
-    # -- observation array converter and helpers -- 
-
-    # deck to observation
-    def _deck_to_obs(self, player:Superpower):
-        deck_obs = []
-        # [in_hand, in_discard, is_removed, drawpile_or_opphand, in_opphand, not_in_game]
-        playerhand = self.usa_hand if player == Superpower.USA else self.ussr_hand
-        opphand = self.ussr_hand if player == Superpower.USA else self.usa_hand
-        oppvisible = self.ussr_hand_visible if player == Superpower.USA else self.usa_hand_visible
-        
-        for key, value in CARDS.items():
-            card_ob = [0, 0, 0, 0, 0, 0]
-            if key in playerhand:
-                card_ob[0] = 1 
-            if key in self.deck.discard_pile:
-                card_ob[1] = 1 
-            if key in self.deck.removed_pile:
-                card_ob[2] = 1 
-            if key in self.deck.draw_pile or key in opphand:
-                card_ob[3] = 1 
-            if key in oppvisible:
-                card_ob[4] = 1 
-            if key not in self.deck.added_list:
-                card_ob[5] = 1 
-            deck_obs.extend(card_ob)
-        return deck_obs
-            
-            
-
-            
+    def region_control(self, region:Region) -> Dict[str, int]:
+        return calculate_region_control(region, self.board)
 
+    # -- observation array converter and helpers -- 
 
+    # location code of every card, indexed by card id
+    def card_locations(self) -> bytearray:
+        return self.deck.location
 
+    # full observation for player, see observation.py for the layout
+    def _to_obs(self, player:Superpower, out:Optional[array] = None, offset:int = 0) -> array:
+        return OBSERVATION_ENCODER.encode(self, player, out, offset)
@@ -0,0 +1,104 @@
+"""Observation encoder: writes a whole game position into one float32 buffer.
+
+Layout (offsets relative to the start of the observation, N_CARDS cards in
+card id order, N_COUNTRIES countries in COUNTRY_NAMES order):
+
+    offset                      size            contents
+    CARD_PLANES_OFFSET          6 * N_CARDS     card planes, plane-major:
+                                                  0 in_hand        in the observer's hand
+                                                  1 in_discard     in the discard pile
+                                                  2 is_removed     removed from the game
+                                                  3 unknown        in the draw pile or the opponent's hand
+                                                  4 opp_visible    known to be in the opponent's hand
+                                                  5 not_in_game    not dealt into the game yet
+    US_INFLUENCE_OFFSET         N_COUNTRIES     US influence per country
+    USSR_INFLUENCE_OFFSET       N_COUNTRIES     USSR influence per country
+    SPACE_RACE_OFFSET           4               usa_token, ussr_token, usa_missions, ussr_missions
+    SCALARS_OFFSET              5               defcon_level, vp_track, turn, action_round, observer_is_usa
+
+All values are raw counts; card planes and the observer flag are 0/1.
+"""
+
+from array import array
+from typing import TYPE_CHECKING, Optional
+
+from ..game_sets.cards import N_CARDS
+from ..game_sets.constants import Superpower
+from ..game_sets.countries import N_COUNTRIES
+from ..instrumentation import timed
+from .deck import NOT_IN_GAME, DRAW_PILE, DISCARD_PILE, REMOVED_PILE, USA_HAND, USSR_HAND
+
+if TYPE_CHECKING:
+    from .game_state import GameState
+
+N_CARD_PLANES = 6
+CARD_PLANES_OFFSET = 0
+US_INFLUENCE_OFFSET = CARD_PLANES_OFFSET + N_CARD_PLANES * N_CARDS
+USSR_INFLUENCE_OFFSET = US_INFLUENCE_OFFSET + N_COUNTRIES
+SPACE_RACE_OFFSET = USSR_INFLUENCE_OFFSET + N_COUNTRIES
+SCALARS_OFFSET = SPACE_RACE_OFFSET + 4
+OBS_SIZE = SCALARS_OFFSET + 5
+
+# card planes set by each location code, from each observer's point of view
+_LOCATION_PLANES = {
+    Superpower.USA: {NOT_IN_GAME: (5,), DRAW_PILE: (3,), DISCARD_PILE: (1,), REMOVED_PILE: (2,), USA_HAND: (0,), USSR_HAND: (3,)},
+    Superpower.USSR: {NOT_IN_GAME: (5,), DRAW_PILE: (3,), DISCARD_PILE: (1,), REMOVED_PILE: (2,), USA_HAND: (3,), USSR_HAND: (0,)},
+}
+
+
+class ObservationEncoder:
+    """Encodes GameStates into preallocated float32 arrays of OBS_SIZE values."""
+
+    size = OBS_SIZE
+
+    def __init__(self):
+        self._zeros = array("f", bytes(4 * OBS_SIZE))
+        # flat offset of (location, card) within the card planes, per observer
+        self._card_offsets = {
+            player: [[[plane * N_CARDS + card for plane in planes[location]] for card in range(N_CARDS)]
+                     for location in range(len(planes))]
+            for player, planes in _LOCATION_PLANES.items()
+        }
+
+    def new_buffer(self, n:int = 1) -> array:
+        """Allocate a zeroed buffer for n observations."""
+        return array("f", bytes(4 * OBS_SIZE * n))
+
+    @timed("observation.encode")
+    def encode(self, gamestate:"GameState", player:Superpower, out:Optional[array] = None, offset:int = 0) -> array:
+        """Write player's observation of gamestate into out at offset, allocating out if needed."""
+        if out is None:
+            out = self.new_buffer()
+        end = offset + OBS_SIZE
+        out[offset:end] = self._zeros
+
+        card_offsets = self._card_offsets[player]
+        base = offset + CARD_PLANES_OFFSET
+        for card, location in enumerate(gamestate.card_locations()):
+            for i in card_offsets[location][card]:
+                out[base + i] = 1.0
+        visible = gamestate.ussr_hand_visible if player == Superpower.USA else gamestate.usa_hand_visible
+        for card in visible:
+            out[base + 4 * N_CARDS + card] = 1.0
+
+        board = gamestate.board
+        out[offset + US_INFLUENCE_OFFSET:offset + USSR_INFLUENCE_OFFSET] = array("f", board.us_influence)
+        out[offset + USSR_INFLUENCE_OFFSET:offset + SPACE_RACE_OFFSET] = array("f", board.ussr_influence)
+
+        space_race = gamestate.space_race
+        i = offset + SPACE_RACE_OFFSET
+        out[i] = space_race.usa_token
+        out[i + 1] = space_race.ussr_token
+        out[i + 2] = space_race.usa_missions
+        out[i + 3] = space_race.ussr_missions
+
+        i = offset + SCALARS_OFFSET
+        out[i] = gamestate.defcon_level
+        out[i + 1] = gamestate.vp_track
+        out[i + 2] = gamestate.turn
+        out[i + 3] = gamestate.action_round
+        out[i + 4] = 1.0 if player == Superpower.USA else 0.0
+        return out
+
+
+OBSERVATION_ENCODER = ObservationEncoder()
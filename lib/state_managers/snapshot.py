@@ -0,0 +1,192 @@
+"""Fixed-size binary snapshots of a GameState.
+
+Layout (byte offsets from the start of the snapshot):
+
+    offset              size                    contents
+    0                   HEADER.size             scalars, see HEADER below
+    BOARD_OFFSET        5 * N_COUNTRIES         int8 us/ussr influence, control, uint8 us/ussr access counts
+    REGIONS_OFFSET      REGION_COUNTS_SIZE      uint16 region counts (Board.region_counts)
+    FRONTIER_OFFSET     2 * MASK_BYTES          us and ussr frontier bitmasks
+    LOCATION_OFFSET     N_CARDS                 deck location code per card
+    ZONES_OFFSET        N_ZONES * MASK_BYTES    deck zone bitmasks
+    DRAW_PILE_OFFSET    N_CARDS                 draw pile in draw order, first draw_pile_len used
+    HANDS_OFFSET        4 * HAND_SLOTS          usa hand, ussr hand, usa visible, ussr visible
+
+Derived board tables (control, region counts, access, frontiers) and the
+zobrist hashes are stored too, so restoring is a handful of slice copies
+with no recomputation and no Country objects. Bitmasks are little-endian.
+
+The dice rng is not part of a snapshot: a restored game gets a fresh
+generator unless one is passed in.
+"""
+
+import random
+import struct
+from array import array
+from typing import TYPE_CHECKING, Optional
+
+from ..game_sets.cards import ERAS, N_CARDS, card_array
+from ..game_sets.constants import GamePhase, Superpower
+from ..game_sets.countries import REGIONS, Board, N_COUNTRIES
+from .deck import N_ZONES, Deck
+from .space_race import SpaceRace
+
+if TYPE_CHECKING:
+    from .game_state import GameState
+
+SNAPSHOT_VERSION = 1
+
+HEADER = struct.Struct(
+    "<H"        # snapshot version
+    "BBBBBB"    # turn, phase, action_round, player_ar, chooser, winner
+    "hB"        # vp_track, defcon_level
+    "BB"        # usa_milops, ussr_milops
+    "BB"        # usa_headline, ussr_headline
+    "BBBB"      # space race: usa_token, ussr_token, usa_missions, ussr_missions
+    "BBBBB"     # lengths: usa_hand, ussr_hand, usa_hand_visible, ussr_hand_visible, draw_pile
+    "B"         # eras in the deck, bit per ERAS entry
+    "QQQ"       # board, deck and space race zobrist hashes
+)
+
+MASK_BYTES = 16
+HAND_SLOTS = 32
+REGION_COUNTS_SIZE = 4 * len(REGIONS) * 2
+
+BOARD_OFFSET = HEADER.size
+REGIONS_OFFSET = BOARD_OFFSET + 5 * N_COUNTRIES
+FRONTIER_OFFSET = REGIONS_OFFSET + REGION_COUNTS_SIZE
+LOCATION_OFFSET = FRONTIER_OFFSET + 2 * MASK_BYTES
+ZONES_OFFSET = LOCATION_OFFSET + N_CARDS
+DRAW_PILE_OFFSET = ZONES_OFFSET + N_ZONES * MASK_BYTES
+HANDS_OFFSET = DRAW_PILE_OFFSET + N_CARDS
+SNAPSHOT_SIZE = HANDS_OFFSET + 4 * HAND_SLOTS
+
+PHASES = tuple(GamePhase)
+PHASE_CODE = {phase: i for i, phase in enumerate(PHASES)}
+# 0 is None for player_ar and winner
+PLAYERS = (None, Superpower.USA, Superpower.USSR)
+PLAYER_CODE = {player: i for i, player in enumerate(PLAYERS)}
+NO_CARD = 0xFF
+
+
+def pack_state(gamestate:"GameState", out=None, offset:int = 0) -> bytearray:
+    """Write gamestate into out at offset (a new SNAPSHOT_SIZE bytearray by default)."""
+    if out is None:
+        out = bytearray(SNAPSHOT_SIZE)
+        offset = 0
+    view = memoryview(out).cast("B")
+    board, deck, space_race = gamestate.board, gamestate.deck, gamestate.space_race
+    hands = (gamestate.usa_hand, gamestate.ussr_hand, gamestate.usa_hand_visible, gamestate.ussr_hand_visible)
+    for hand in hands:
+        if len(hand) > HAND_SLOTS:
+            raise ValueError("Hand of %d cards does not fit in a snapshot" % len(hand))
+    HEADER.pack_into(
+        view, offset, SNAPSHOT_VERSION,
+        gamestate.turn, PHASE_CODE[gamestate.phase], gamestate.action_round,
+        PLAYER_CODE[gamestate.player_ar], PLAYER_CODE[gamestate.chooser], PLAYER_CODE[gamestate.winner],
+        gamestate.vp_track, gamestate.defcon_level, gamestate.usa_milops, gamestate.ussr_milops,
+        NO_CARD if gamestate.usa_headline is None else gamestate.usa_headline,
+        NO_CARD if gamestate.ussr_headline is None else gamestate.ussr_headline,
+        space_race.usa_token, space_race.ussr_token, space_race.usa_missions, space_race.ussr_missions,
+        *(len(hand) for hand in hands), len(deck.draw_pile),
+        sum(1 << ERAS.index(era) for era in deck.eras),
+        board.hash, deck.hash, space_race.hash,
+    )
+
+    i = offset + BOARD_OFFSET
+    for table in (board.us_influence, board.ussr_influence, board.control, board.us_access, board.ussr_access):
+        view[i:i + N_COUNTRIES] = memoryview(table).cast("B")
+        i += N_COUNTRIES
+    view[i:i + REGION_COUNTS_SIZE] = memoryview(board.region_counts).cast("B")
+    i += REGION_COUNTS_SIZE
+    for mask in (board.us_frontier, board.ussr_frontier):
+        view[i:i + MASK_BYTES] = mask.to_bytes(MASK_BYTES, "little")
+        i += MASK_BYTES
+
+    view[i:i + N_CARDS] = deck.location
+    i += N_CARDS
+    for mask in deck.zones:
+        view[i:i + MASK_BYTES] = mask.to_bytes(MASK_BYTES, "little")
+        i += MASK_BYTES
+    n = len(deck.draw_pile)
+    view[i:i + n] = deck.draw_pile
+    view[i + n:i + N_CARDS] = bytes(N_CARDS - n)
+    i += N_CARDS
+    for hand in hands:
+        n = len(hand)
+        view[i:i + n] = hand
+        view[i + n:i + HAND_SLOTS] = bytes(HAND_SLOTS - n)
+        i += HAND_SLOTS
+    view.release()
+    return out
+
+
+def unpack_state(data, gamestate:"GameState", offset:int = 0, rng:Optional[random.Random] = None) -> "GameState":
+    """Fill gamestate (usually a bare GameState.__new__) from a snapshot written by pack_state."""
+    view = memoryview(data).cast("B")
+    (version, turn, phase, action_round, player_ar, chooser, winner, vp_track, defcon_level,
+     usa_milops, ussr_milops, usa_headline, ussr_headline,
+     usa_token, ussr_token, usa_missions, ussr_missions,
+     n_usa_hand, n_ussr_hand, n_usa_visible, n_ussr_visible, n_draw_pile, eras,
+     board_hash, deck_hash, space_hash) = HEADER.unpack_from(view, offset)
+    if version != SNAPSHOT_VERSION:
+        raise ValueError("Unsupported snapshot version %d" % version)
+
+    board = Board.__new__(Board)
+    i = offset + BOARD_OFFSET
+    tables = []
+    for typecode in "bbbBB":
+        table = array(typecode)
+        table.frombytes(view[i:i + N_COUNTRIES])
+        tables.append(table)
+        i += N_COUNTRIES
+    board.us_influence, board.ussr_influence, board.control, board.us_access, board.ussr_access = tables
+    board.region_counts = array("H")
+    board.region_counts.frombytes(view[i:i + REGION_COUNTS_SIZE])
+    i += REGION_COUNTS_SIZE
+    board.us_frontier = int.from_bytes(view[i:i + MASK_BYTES], "little")
+    board.ussr_frontier = int.from_bytes(view[i + MASK_BYTES:i + 2 * MASK_BYTES], "little")
+    i += 2 * MASK_BYTES
+    board.hash = board_hash
+    board._shared = False
+    board._journal = None
+    board._depth = 0
+
+    rng = rng if rng is not None else random.Random()
+    deck = Deck.__new__(Deck)
+    deck.rng = rng
+    deck.location = bytearray(view[i:i + N_CARDS])
+    i += N_CARDS
+    deck.zones = [int.from_bytes(view[i + z * MASK_BYTES:i + (z + 1) * MASK_BYTES], "little") for z in range(N_ZONES)]
+    i += N_ZONES * MASK_BYTES
+    deck.draw_pile = card_array()
+    deck.draw_pile.frombytes(view[i:i + n_draw_pile])
+    i += N_CARDS
+    deck.eras = [era for e, era in enumerate(ERAS) if eras >> e & 1]
+    deck.hash = deck_hash
+    deck._shared = False
+
+    space_race = SpaceRace.__new__(SpaceRace)
+    space_race.usa_token, space_race.ussr_token = usa_token, ussr_token
+    space_race.usa_missions, space_race.ussr_missions = usa_missions, ussr_missions
+    space_race.hash = space_hash
+
+    hands = []
+    for n in (n_usa_hand, n_ussr_hand, n_usa_visible, n_ussr_visible):
+        hand = card_array()
+        hand.frombytes(view[i:i + n])
+        hands.append(hand)
+        i += HAND_SLOTS
+    view.release()
+
+    gamestate.__dict__.update(
+        turn=turn, phase=PHASES[phase], action_round=action_round, player_ar=PLAYERS[player_ar],
+        space_race=space_race, chooser=PLAYERS[chooser], vp_track=vp_track,
+        usa_hand=hands[0], ussr_hand=hands[1], usa_hand_visible=hands[2], ussr_hand_visible=hands[3],
+        deck=deck, defcon_level=defcon_level, board=board,
+        usa_milops=usa_milops, ussr_milops=ussr_milops,
+        usa_headline=None if usa_headline == NO_CARD else usa_headline,
+        ussr_headline=None if ussr_headline == NO_CARD else ussr_headline,
+        winner=PLAYERS[winner], rng=rng,
+    )
+    return gamestate
@@ -1,33 +1,48 @@
 from ..game_sets.constants import Superpower
 from ..game_sets.cards import Card 
+from ..game_sets.zobrist import US_SPACE_KEYS, USSR_SPACE_KEYS, space_key
 
 # fix deetz for these 
+# roll_max: highest d6 roll that advances onto the square
 space_squares = [
     {
         "ops_required":2,
+        "roll_max":3,
         "vps_gained": [2,0]
     },
     {
         "ops_required":2,
+        "roll_max":4,
         "vps_gained": [0,0]
     },
     {
         "ops_required":2,
+        "roll_max":3,
         "vps_gained": [3,1]
     },
     {
         "ops_required":2,
+        "roll_max":4,
         "vps_gained": [0,0]
     },
     {
         "ops_required":3,
+        "roll_max":3,
         "vps_gained": [3,1]
     },
     {
         "ops_required":2,
+        "roll_max":4,
         "vps_gained": [3,1]
     }
 ]
+
+# the same data as flat tuples, indexed by square
+SPACE_OPS_REQUIRED = tuple(square["ops_required"] for square in space_squares)
+SPACE_ROLL_MAX = tuple(square["roll_max"] for square in space_squares)
+SPACE_VPS = tuple(tuple(square["vps_gained"]) for square in space_squares)
+N_SPACE_SQUARES = len(space_squares)
+
 class SpaceRace:
     def __init__(self):
         self.usa_token: int = 0 
@@ -37,6 +52,17 @@ class SpaceRace:
         self.usa_missions: int = 0 
         self.ussr_missions: int = 0 
 
+        # zobrist hash of the tokens and missions, kept up to date by _advance
+        self.hash: int = 0
+
+    def fork(self) -> "SpaceRace":
+        space_race = SpaceRace.__new__(SpaceRace)
+        space_race.__dict__.update(self.__dict__)
+        return space_race
+
+    def copy_from(self, other:"SpaceRace"):
+        self.__dict__.update(other.__dict__)
+
     @property 
     def usa_max(self):
         if self.usa_token >=2 and self.ussr_token < 2:
@@ -51,15 +77,43 @@ class SpaceRace:
     
     def can_space(self, card_ops:int, player:Superpower):
         if player == Superpower.USA:
-            if self.usa_max >= self.usa_missions: return False
+            if self.usa_missions >= self.usa_max: return False
         if player == Superpower.USSR:
-            if self.ussr_max >= self.ussr_missions: return False 
-        mission_idx = self._get_spacesquare(player) + 1 
-        if mission_idx >= len(space_squares):
+            if self.ussr_missions >= self.ussr_max: return False 
+        # token counts squares already reached, so it is also the index of the next square
+        mission_idx = self._get_spacesquare(player)
+        if mission_idx >= N_SPACE_SQUARES:
             return False 
-        return space_squares[mission_idx]["ops_required"] >= card_ops 
+        return card_ops >= SPACE_OPS_REQUIRED[mission_idx]
          
 
+    # roll for the next square. returns the vps gained, positive for the player
+    def attempt(self, player:Superpower, roll:int) -> int:
+        square = self._get_spacesquare(player)
+        if roll > SPACE_ROLL_MAX[square]:
+            self._advance(player, 0, 1)
+            return 0
+        opp_square = self._get_spacesquare(Superpower.USSR if player == Superpower.USA else Superpower.USA)
+        self._advance(player, 1, 1)
+        # first player onto a square gets the larger award
+        return SPACE_VPS[square][0 if opp_square <= square else 1]
+
+    def _end_turn(self):
+        self._advance(Superpower.USA, 0, -self.usa_missions)
+        self._advance(Superpower.USSR, 0, -self.ussr_missions)
+
+    def _advance(self, player:Superpower, tokens:int, missions:int):
+        if player == Superpower.USA:
+            self.hash ^= space_key(US_SPACE_KEYS, self.usa_token, self.usa_missions)
+            self.usa_token += tokens
+            self.usa_missions += missions
+            self.hash ^= space_key(US_SPACE_KEYS, self.usa_token, self.usa_missions)
+        else:
+            self.hash ^= space_key(USSR_SPACE_KEYS, self.ussr_token, self.ussr_missions)
+            self.ussr_token += tokens
+            self.ussr_missions += missions
+            self.hash ^= space_key(USSR_SPACE_KEYS, self.ussr_token, self.ussr_missions)
+
     def _get_spacesquare(self, player:Superpower):
         return self.usa_token if player == Superpower.USA else self.ussr_token 
 
@@ -1,6 +1,44 @@
-def main():
-    print("Hello from twi-cli!")
+import argparse
+import sys
+
+from lib.bots.mcts import MCTSAgent, MCTSConfig
+from lib.driver import random_agent, run_games
+from lib.records import GameRecordWriter
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play headless Twilight Struggle games between bots.")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--usa", choices=("random", "mcts"), default="random")
+    parser.add_argument("--ussr", choices=("random", "mcts"), default="random")
+    parser.add_argument("--mcts-time", type=float, default=0.1, help="seconds per mcts move")
+    parser.add_argument("--record", help="write the games to this record file")
+    parser.add_argument("--verbose", action="store_true", help="print every move (slow)")
+    args = parser.parse_args(argv)
+
+    agents, observers, closers = {}, [], []
+    for side, seed in (("usa", args.seed), ("ussr", args.seed + 1)):
+        if getattr(args, side) == "mcts":
+            agent = MCTSAgent(MCTSConfig(time_limit=args.mcts_time), seed=seed)
+            agents[side] = agent.choose_move
+            observers.append(agent.observe)
+            closers.append(agent)
+        else:
+            agents[side] = random_agent(seed)
+
+    writer = GameRecordWriter(args.record) if args.record else None
+    try:
+        stats = run_games(agents["usa"], agents["ussr"], args.games, args.seed, observers,
+                          print if args.verbose else None, writer)
+    finally:
+        if writer is not None:
+            writer.close()
+        for agent in closers:
+            agent.close()
+    print(stats.report())
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""Legal-action masks built from board bitmasks against per-country checks."""
+
+import random
+
+import pytest
+
+from lib.actions.actions_manager import ActionType
+from lib.actions.move_generator import MoveGenerator
+from lib.bots.mcts import random_move
+from lib.env.action_space import ACTION_SIZE, headline_action, play_action, write_legal_mask
+from lib.game import apply_move, new_game
+from lib.game_sets.cards import CARD_OPS, CARD_SCORING
+from lib.game_sets.constants import GamePhase
+from lib.game_sets.countries import N_COUNTRIES
+
+GENERATOR = MoveGenerator()
+
+
+def reference_actions(gamestate):
+    # the slow way: Country views for coups, move enumeration for influence
+    player = gamestate.chooser
+    hand = gamestate.hand(player)
+    if gamestate.phase == GamePhase.HEADLINE:
+        return {headline_action(card) for card in hand}
+    board = gamestate.board
+    can_coup = any(board.country(i).can_coup_or_realign(gamestate.defcon_level, player) for i in range(N_COUNTRIES))
+    actions = set()
+    for card in hand:
+        actions.add(play_action(card, ActionType.EVENT))
+        ops = CARD_OPS[card]
+        if CARD_SCORING[card] or ops == 0:
+            continue
+        if gamestate.space_race.can_space(ops, player):
+            actions.add(play_action(card, ActionType.SPACE_RACE))
+        if next(GENERATOR.influence_placements(gamestate, player, ops), None) is not None:
+            actions.add(play_action(card, ActionType.INFLUENCE))
+        if can_coup:
+            actions.add(play_action(card, ActionType.COUP))
+            actions.add(play_action(card, ActionType.REALIGNMENT))
+    return actions
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_mask_matches_per_country_checks(seed):
+    gamestate = new_game(seed)
+    rng = random.Random(seed)
+    mask = bytearray(ACTION_SIZE)
+    while not gamestate.game_over:
+        write_legal_mask(gamestate, mask)
+        assert {i for i, legal in enumerate(mask) if legal} == reference_actions(gamestate)
+        apply_move(gamestate, random_move(gamestate, rng))
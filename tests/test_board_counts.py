@@ -0,0 +1,85 @@
+"""Board control and region counts, kept incrementally, against a full recompute."""
+
+import random
+
+import pytest
+
+from lib.bots.mcts import random_move
+from lib.game import apply_move, new_game
+from lib.game_sets.constants import Superpower
+from lib.game_sets.countries import (COUNTRY_BATTLEGROUND, COUNTRY_REGION, COUNTRY_STABILITY, N_COUNTRIES, NO_CONTROL,
+                                     REGIONS, US_CONTROL, USSR_CONTROL, calculate_region_control,
+                                     get_controlled_countries)
+
+
+def recompute_control(board):
+    control = []
+    for i in range(N_COUNTRIES):
+        margin = board.us_influence[i] - board.ussr_influence[i]
+        if margin >= COUNTRY_STABILITY[i]:
+            control.append(US_CONTROL)
+        elif -margin >= COUNTRY_STABILITY[i]:
+            control.append(USSR_CONTROL)
+        else:
+            control.append(NO_CONTROL)
+    return control
+
+
+def recompute_region_counts(board, control):
+    counts = {region: [0, 0, 0, 0] for region in REGIONS}
+    for i in range(N_COUNTRIES):
+        if control[i] == NO_CONTROL:
+            continue
+        side = 0 if control[i] == US_CONTROL else 1
+        region_counts = counts[REGIONS[COUNTRY_REGION[i]]]
+        region_counts[side] += 1
+        if COUNTRY_BATTLEGROUND[i]:
+            region_counts[2 + side] += 1
+    return counts
+
+
+def assert_counts_match(board):
+    control = recompute_control(board)
+    assert list(board.control) == control
+    counts = recompute_region_counts(board, control)
+    for region in REGIONS:
+        assert list(board.region_control(region)) == counts[region]
+        result = calculate_region_control(region, board)
+        assert [result["us_countries"], result["ussr_countries"], result["us_battlegrounds"],
+                result["ussr_battlegrounds"]] == counts[region]
+    for player, code in ((Superpower.USA, US_CONTROL), (Superpower.USSR, USSR_CONTROL)):
+        expected = [i for i in range(N_COUNTRIES) if control[i] == code]
+        assert [country.index for country in get_controlled_countries(player, board)] == expected
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_counts_match_recompute_over_random_games(seed):
+    gamestate = new_game(seed)
+    rng = random.Random(seed)
+    assert_counts_match(gamestate.board)
+    while not gamestate.game_over:
+        apply_move(gamestate, random_move(gamestate, rng))
+        assert_counts_match(gamestate.board)
+
+
+def test_counts_survive_rolled_back_transactions():
+    gamestate = new_game(1)
+    board = gamestate.board
+    before = (list(board.control), list(board.region_counts))
+    with board.transaction():
+        for i in range(N_COUNTRIES):
+            board.change_influence(i, 3, 1)
+        assert_counts_match(board)
+    assert_counts_match(board)
+    assert (list(board.control), list(board.region_counts)) == before
+
+
+@pytest.mark.parametrize("copy_on_write", [False, True])
+def test_forks_keep_their_own_counts(copy_on_write):
+    gamestate = new_game(2)
+    fork = gamestate.fork(copy_on_write, rng=random.Random(0))
+    for i in range(0, N_COUNTRIES, 3):
+        fork.board.change_influence(i, 4, 0)
+    assert_counts_match(fork.board)
+    assert_counts_match(gamestate.board)
+    assert list(fork.board.region_counts) != list(gamestate.board.region_counts)
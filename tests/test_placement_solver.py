@@ -0,0 +1,55 @@
+"""best_placements against brute force over MoveGenerator.influence_placements."""
+
+import pickle
+import random
+from collections import Counter
+
+import pytest
+
+from lib.actions.move_generator import MoveGenerator
+from lib.actions.placement_solver import battleground_delta, best_placements, control_delta, weighted_control
+from lib.bots.mcts import random_move
+from lib.game import apply_move, new_game
+from lib.game_sets.constants import Superpower
+from lib.game_sets.countries import Region
+
+OBJECTIVES = {
+    "control_delta": control_delta,
+    "battleground_delta": battleground_delta,
+    "weighted_control": weighted_control({Region.EUROPE: 3.0, Region.ASIA: 2.0}, 1.5),
+}
+
+
+def position(seed:int, moves:int):
+    gamestate = new_game(seed)
+    rng = random.Random(seed)
+    for _ in range(moves):
+        if gamestate.game_over:
+            break
+        apply_move(gamestate, random_move(gamestate, rng))
+    return gamestate
+
+
+def score(gamestate, player, targets, objective) -> float:
+    return sum(objective(gamestate, player, index, count) for index, count in Counter(targets).items())
+
+
+@pytest.mark.parametrize("seed,moves", [(0, 0), (1, 12), (2, 30)])
+@pytest.mark.parametrize("objective", list(OBJECTIVES), ids=str)
+def test_matches_brute_force(seed, moves, objective):
+    gamestate = position(seed, moves)
+    objective = OBJECTIVES[objective]
+    generator = MoveGenerator()
+    for player in Superpower:
+        for ops in (1, 2, 3):
+            placements = {targets: score(gamestate, player, targets, objective)
+                          for targets in generator.influence_placements(gamestate, player, ops)}
+            best = best_placements(gamestate, player, ops, objective, k=5)
+            assert [placement.value for placement in best] == sorted(placements.values(), reverse=True)[:5]
+            assert all(placement.targets in placements for placement in best)
+            assert len({placement.targets for placement in best}) == len(best)
+
+
+def test_weighted_control_pickles():
+    objective = OBJECTIVES["weighted_control"]
+    assert pickle.loads(pickle.dumps(objective)) == objective
@@ -0,0 +1,86 @@
+"""Incremental Zobrist hashes against a full recompute."""
+
+import random
+
+import pytest
+
+from lib.bots.mcts import random_move
+from lib.game import apply_move, new_game
+from lib.game_sets.countries import INFLUENCE_MASK, INFLUENCE_VALUES, N_COUNTRIES, US_INFLUENCE_KEYS, USSR_INFLUENCE_KEYS
+from lib.game_sets.zobrist import CARD_ZONE_KEYS, N_CARD_ZONES, US_SPACE_KEYS, USSR_SPACE_KEYS, space_key
+from lib.state_managers.game_state import GameState
+
+
+def board_hash(board) -> int:
+    h = 0
+    for i in range(N_COUNTRIES):
+        key = i * INFLUENCE_VALUES
+        h ^= US_INFLUENCE_KEYS[key + (board.us_influence[i] & INFLUENCE_MASK)]
+        h ^= USSR_INFLUENCE_KEYS[key + (board.ussr_influence[i] & INFLUENCE_MASK)]
+    return h
+
+
+def deck_hash(deck) -> int:
+    h = 0
+    for card, zone in enumerate(deck.location):
+        h ^= CARD_ZONE_KEYS[card * N_CARD_ZONES + zone]
+    return h
+
+
+def space_hash(space_race) -> int:
+    return (space_key(US_SPACE_KEYS, space_race.usa_token, space_race.usa_missions)
+            ^ space_key(USSR_SPACE_KEYS, space_race.ussr_token, space_race.ussr_missions))
+
+
+def assert_hashes_match(gamestate):
+    assert gamestate.board.hash == board_hash(gamestate.board)
+    assert gamestate.deck.hash == deck_hash(gamestate.deck)
+    assert gamestate.space_race.hash == space_hash(gamestate.space_race)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_hashes_match_recompute_over_random_games(seed):
+    gamestate = new_game(seed)
+    rng = random.Random(seed)
+    assert_hashes_match(gamestate)
+    while not gamestate.game_over:
+        apply_move(gamestate, random_move(gamestate, rng))
+        assert_hashes_match(gamestate)
+
+
+@pytest.mark.parametrize("copy_on_write", [False, True])
+def test_fork_and_snapshot_keep_the_hash(copy_on_write):
+    gamestate = new_game(3)
+    rng = random.Random(3)
+    for _ in range(10):
+        if gamestate.game_over:
+            break
+        apply_move(gamestate, random_move(gamestate, rng))
+    fork = gamestate.fork(copy_on_write, rng=random.Random(0))
+    assert fork.zobrist_hash == gamestate.zobrist_hash
+    assert GameState.from_bytes(gamestate.to_bytes()).zobrist_hash == gamestate.zobrist_hash
+    fork.board.change_influence(5, 1, 0)
+    assert fork.zobrist_hash != gamestate.zobrist_hash
+    assert_hashes_match(fork)
+    assert_hashes_match(gamestate)
+
+
+def test_rolled_back_transaction_restores_the_hash():
+    gamestate = new_game(1)
+    before = gamestate.zobrist_hash
+    with gamestate.board.transaction():
+        gamestate.board.change_influence(3, 2, 1)
+        assert gamestate.zobrist_hash != before
+    assert gamestate.zobrist_hash == before
+
+
+def test_transpositions_hash_alike():
+    gamestate = new_game(1)
+    a = gamestate.fork(rng=random.Random(0))
+    b = gamestate.fork(rng=random.Random(0))
+    a.board.change_influence(5, 1, 0)
+    a.board.change_influence(9, 2, 0)
+    b.board.change_influence(9, 1, 0)
+    b.board.change_influence(5, 1, 0)
+    b.board.change_influence(9, 1, 0)
+    assert a.zobrist_hash == b.zobrist_hash != gamestate.zobrist_hash